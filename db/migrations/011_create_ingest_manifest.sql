@@ -0,0 +1,27 @@
+-- Track which workbooks have been ingested so re-runs can skip unchanged files.
+
+CREATE SEQUENCE IF NOT EXISTS ingest_manifest_seq;
+
+CREATE TABLE IF NOT EXISTS ingest_manifest (
+  file_path         TEXT PRIMARY KEY,
+  file_size         BIGINT NOT NULL,
+  file_mtime        DOUBLE PRECISION NOT NULL,
+  sha256            TEXT NOT NULL,
+  round_external_id TEXT,
+  status            TEXT NOT NULL CHECK (status IN ('loaded', 'updated', 'skipped', 'failed')),
+  parse_seconds     NUMERIC(10,3),
+  load_seconds      NUMERIC(10,3),
+  manifest_seq      BIGINT NOT NULL DEFAULT nextval('ingest_manifest_seq'),
+  recorded_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE ingest_manifest IS 'One row per ingested workbook, used to skip unchanged files.';
+COMMENT ON COLUMN ingest_manifest.file_path IS 'Workbook path as seen by the ingestion script.';
+COMMENT ON COLUMN ingest_manifest.file_size IS 'File size in bytes at load time.';
+COMMENT ON COLUMN ingest_manifest.file_mtime IS 'File modification time (epoch seconds) at load time.';
+COMMENT ON COLUMN ingest_manifest.sha256 IS 'SHA-256 of the file contents at load time.';
+COMMENT ON COLUMN ingest_manifest.round_external_id IS 'Round loaded from the file.';
+COMMENT ON COLUMN ingest_manifest.status IS 'loaded, updated (re-ingested after a change), skipped (round already existed), or failed.';
+COMMENT ON COLUMN ingest_manifest.parse_seconds IS 'Time spent reading and validating the workbook.';
+COMMENT ON COLUMN ingest_manifest.load_seconds IS 'Time spent writing the round to the database.';
+COMMENT ON COLUMN ingest_manifest.manifest_seq IS 'Increases on every write; usable as a data-version token.';
@@ -0,0 +1,38 @@
+-- Track when rounds and hole stats were loaded and last changed so dbt can
+-- build the marts incrementally.
+
+ALTER TABLE rounds
+ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+ALTER TABLE hole_stats
+ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS rounds_set_updated_at ON rounds;
+CREATE TRIGGER rounds_set_updated_at
+  BEFORE UPDATE ON rounds
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS hole_stats_set_updated_at ON hole_stats;
+CREATE TRIGGER hole_stats_set_updated_at
+  BEFORE UPDATE ON hole_stats
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_rounds_updated_at
+  ON rounds(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_hole_stats_updated_at
+  ON hole_stats(updated_at);
+
+COMMENT ON COLUMN rounds.loaded_at IS 'When the round was first inserted.';
+COMMENT ON COLUMN rounds.updated_at IS 'When the round was last inserted or updated (high-water mark for dbt).';
+COMMENT ON COLUMN hole_stats.loaded_at IS 'When the hole row was first inserted.';
+COMMENT ON COLUMN hole_stats.updated_at IS 'When the hole row was last inserted or updated (high-water mark for dbt).';
@@ -0,0 +1,21 @@
+-- Record every refresh of the marts when they are deployed as materialized
+-- views, so the dashboard can show how fresh its data is.
+
+CREATE TABLE IF NOT EXISTS mart_refresh_log (
+  refresh_id        BIGSERIAL PRIMARY KEY,
+  view_name         TEXT NOT NULL,
+  started_at        TIMESTAMPTZ NOT NULL,
+  finished_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+  duration_ms       NUMERIC(12,1) NOT NULL,
+  source_updated_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_mart_refresh_log_view_finished
+  ON mart_refresh_log(view_name, finished_at DESC);
+
+COMMENT ON TABLE mart_refresh_log IS 'One row per REFRESH MATERIALIZED VIEW of a mart.';
+COMMENT ON COLUMN mart_refresh_log.view_name IS 'Materialized view that was refreshed.';
+COMMENT ON COLUMN mart_refresh_log.started_at IS 'When the refresh started.';
+COMMENT ON COLUMN mart_refresh_log.finished_at IS 'When the refresh committed.';
+COMMENT ON COLUMN mart_refresh_log.duration_ms IS 'Wall-clock duration of the refresh.';
+COMMENT ON COLUMN mart_refresh_log.source_updated_at IS 'Latest rounds/hole_stats updated_at when the refresh started; the view contains every change up to it.';
@@ -0,0 +1,24 @@
+-- One row per run of an ETL script, with its timing report.
+
+CREATE TABLE IF NOT EXISTS etl_runs (
+  run_id           BIGSERIAL PRIMARY KEY,
+  script           TEXT NOT NULL,
+  status           TEXT NOT NULL CHECK (status IN ('succeeded', 'failed')),
+  started_at       TIMESTAMPTZ NOT NULL,
+  finished_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+  duration_seconds NUMERIC(12,3) NOT NULL,
+  files_total      INT NOT NULL,
+  rows_written     BIGINT NOT NULL,
+  report           JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_etl_runs_script_started
+  ON etl_runs(script, started_at DESC);
+
+COMMENT ON TABLE etl_runs IS 'One row per ETL script run, with per-stage and per-file timings.';
+COMMENT ON COLUMN etl_runs.script IS 'Script that ran (ingest_excel, import_course_excel, ...).';
+COMMENT ON COLUMN etl_runs.status IS 'succeeded, or failed when the run raised.';
+COMMENT ON COLUMN etl_runs.duration_seconds IS 'Wall-clock duration of the run.';
+COMMENT ON COLUMN etl_runs.files_total IS 'Input files the run looked at (after manifest skips).';
+COMMENT ON COLUMN etl_runs.rows_written IS 'Rows inserted or replaced across all tables.';
+COMMENT ON COLUMN etl_runs.report IS 'Full run report: stages, counters and per-file records.';
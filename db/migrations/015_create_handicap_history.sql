@@ -0,0 +1,28 @@
+-- Handicap index history: one row per round, maintained by golf_stats.handicap.
+
+CREATE TABLE IF NOT EXISTS handicap_history (
+  round_id             INT PRIMARY KEY,
+  date_played          DATE NOT NULL,
+  gross_score          INT NOT NULL,
+  adjusted_gross_score INT,
+  course_handicap      INT,
+  net_score            INT,
+  score_differential   NUMERIC(5,1),
+  index_before         NUMERIC(4,1),
+  handicap_index       NUMERIC(4,1),
+  computed_at          TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_handicap_history_date_round
+  ON handicap_history(date_played, round_id);
+
+COMMENT ON TABLE handicap_history IS 'World Handicap System results per round, recomputed incrementally from the earliest changed round.';
+COMMENT ON COLUMN handicap_history.round_id IS 'Round scored (no foreign key: rows of deleted rounds are how the recompute window is found).';
+COMMENT ON COLUMN handicap_history.gross_score IS 'Sum of strokes on the holes tracked.';
+COMMENT ON COLUMN handicap_history.adjusted_gross_score IS 'Gross score with each hole capped at net double bogey; NULL if the round does not count.';
+COMMENT ON COLUMN handicap_history.course_handicap IS 'Course handicap from the index going into the round.';
+COMMENT ON COLUMN handicap_history.net_score IS 'Gross score minus course handicap.';
+COMMENT ON COLUMN handicap_history.score_differential IS '113 / slope * (adjusted gross - course rating); NULL if the round does not count.';
+COMMENT ON COLUMN handicap_history.index_before IS 'Handicap index going into the round.';
+COMMENT ON COLUMN handicap_history.handicap_index IS 'Handicap index after the round (best 8 of the last 20 differentials).';
+COMMENT ON COLUMN handicap_history.computed_at IS 'When the row was computed; rounds updated later are recomputed.';
@@ -0,0 +1,150 @@
+-- Serve many players from one database: every round belongs to a player, and
+-- rounds and hole_stats are hash-partitioned by player_id so per-player
+-- queries only touch that player's partition.
+--
+-- Both tables use the same 16 hash partitions, so a player's rounds and holes
+-- sit in partitions with the same remainder and joins on
+-- (player_id, round_id) can run partition by partition. Existing rounds are
+-- assigned to the 'Default' player (player_id 1).
+--
+-- The tables are rebuilt, which drops the dbt views that read them: run
+-- `dbt run --full-refresh` after applying this migration.
+
+CREATE TABLE IF NOT EXISTS players (
+  player_id   SERIAL PRIMARY KEY,
+  player_name TEXT NOT NULL,
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_players_player_name
+  ON players(player_name);
+
+INSERT INTO players (player_id, player_name)
+VALUES (1, 'Default')
+ON CONFLICT DO NOTHING;
+
+SELECT setval(
+  pg_get_serial_sequence('players', 'player_id'),
+  (SELECT max(player_id) FROM players)
+);
+
+COMMENT ON TABLE players IS 'Golfers whose rounds are tracked; rounds and hole_stats are partitioned by player.';
+COMMENT ON COLUMN players.player_name IS 'Unique display name, used to match the player_name column of ingested files.';
+
+DO $$
+DECLARE
+  remainder INT;
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'rounds'::regclass
+  ) THEN
+    RETURN;
+  END IF;
+
+  ALTER TABLE hole_stats RENAME TO hole_stats_unpartitioned;
+  ALTER TABLE rounds RENAME TO rounds_unpartitioned;
+  -- Keep the id sequences (and so existing ids) for the new tables.
+  ALTER SEQUENCE rounds_round_id_seq OWNED BY NONE;
+  ALTER SEQUENCE hole_stats_hole_stat_id_seq OWNED BY NONE;
+
+  CREATE TABLE rounds (
+    player_id INT NOT NULL REFERENCES players(player_id) ON DELETE RESTRICT,
+    LIKE rounds_unpartitioned
+      INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS
+  ) PARTITION BY HASH (player_id);
+
+  CREATE TABLE hole_stats (
+    player_id INT NOT NULL,
+    LIKE hole_stats_unpartitioned
+      INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS
+  ) PARTITION BY HASH (player_id);
+
+  FOR remainder IN 0..15 LOOP
+    EXECUTE format(
+      'CREATE TABLE rounds_p%s PARTITION OF rounds '
+      'FOR VALUES WITH (MODULUS 16, REMAINDER %s)',
+      remainder, remainder
+    );
+    EXECUTE format(
+      'CREATE TABLE hole_stats_p%s PARTITION OF hole_stats '
+      'FOR VALUES WITH (MODULUS 16, REMAINDER %s)',
+      remainder, remainder
+    );
+  END LOOP;
+
+  INSERT INTO rounds SELECT 1, r.* FROM rounds_unpartitioned r;
+  INSERT INTO hole_stats SELECT 1, h.* FROM hole_stats_unpartitioned h;
+
+  DROP TABLE hole_stats_unpartitioned, rounds_unpartitioned CASCADE;
+  -- Primary keys must include the partition key.
+  ALTER TABLE rounds ADD PRIMARY KEY (player_id, round_id);
+  ALTER TABLE hole_stats ADD PRIMARY KEY (player_id, hole_stat_id);
+  ALTER SEQUENCE rounds_round_id_seq OWNED BY rounds.round_id;
+  ALTER SEQUENCE hole_stats_hole_stat_id_seq OWNED BY hole_stats.hole_stat_id;
+END;
+$$;
+
+ALTER TABLE rounds
+DROP CONSTRAINT IF EXISTS rounds_course_id_fkey,
+DROP CONSTRAINT IF EXISTS rounds_tee_id_fkey;
+
+ALTER TABLE rounds
+ADD CONSTRAINT rounds_course_id_fkey
+  FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE RESTRICT,
+ADD CONSTRAINT rounds_tee_id_fkey
+  FOREIGN KEY (tee_id) REFERENCES tees(tee_id) ON DELETE SET NULL;
+
+ALTER TABLE hole_stats
+DROP CONSTRAINT IF EXISTS hole_stats_round_fkey;
+
+ALTER TABLE hole_stats
+ADD CONSTRAINT hole_stats_round_fkey
+  FOREIGN KEY (player_id, round_id) REFERENCES rounds(player_id, round_id)
+  ON DELETE CASCADE;
+
+-- Unique keys on a partitioned table must include the partition key, so the
+-- business keys are now per player.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rounds_external_id
+  ON rounds(player_id, round_external_id)
+  WHERE round_external_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_rounds_player_date
+  ON rounds(player_id, date_played, round_id);
+
+CREATE INDEX IF NOT EXISTS idx_rounds_updated_at
+  ON rounds(updated_at);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_hole_stats_round_hole
+  ON hole_stats(player_id, round_id, hole_number);
+
+CREATE INDEX IF NOT EXISTS idx_hole_stats_updated_at
+  ON hole_stats(updated_at);
+
+DROP TRIGGER IF EXISTS rounds_set_updated_at ON rounds;
+CREATE TRIGGER rounds_set_updated_at
+  BEFORE UPDATE ON rounds
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS hole_stats_set_updated_at ON hole_stats;
+CREATE TRIGGER hole_stats_set_updated_at
+  BEFORE UPDATE ON hole_stats
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Handicaps are computed per player.
+ALTER TABLE handicap_history
+ADD COLUMN IF NOT EXISTS player_id INT NOT NULL DEFAULT 1;
+
+ALTER TABLE handicap_history
+ALTER COLUMN player_id DROP DEFAULT;
+
+DROP INDEX IF EXISTS idx_handicap_history_date_round;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_handicap_history_player_date_round
+  ON handicap_history(player_id, date_played, round_id);
+
+COMMENT ON TABLE rounds IS 'Round-level facts for each time a player plays; hash-partitioned by player_id.';
+COMMENT ON COLUMN rounds.player_id IS 'Player who played the round (partition key).';
+COMMENT ON COLUMN rounds.round_external_id IS 'Unique ID (per player) from Excel to link round + hole stats.';
+COMMENT ON TABLE hole_stats IS 'Hole-level performance for a specific round; hash-partitioned by player_id like rounds.';
+COMMENT ON COLUMN hole_stats.player_id IS 'Player of the round (partition key, same as rounds.player_id).';
+COMMENT ON COLUMN handicap_history.player_id IS 'Player of the round; each player has their own index history.';
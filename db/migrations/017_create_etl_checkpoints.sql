@@ -0,0 +1,26 @@
+-- Per-file progress of ETL runs, so an interrupted run can be resumed.
+
+-- Checkpointed runs insert their etl_runs row when they start.
+ALTER TABLE etl_runs DROP CONSTRAINT IF EXISTS etl_runs_status_check;
+ALTER TABLE etl_runs ADD CONSTRAINT etl_runs_status_check
+  CHECK (status IN ('running', 'succeeded', 'failed'));
+
+CREATE TABLE IF NOT EXISTS etl_checkpoints (
+  run_id      BIGINT NOT NULL REFERENCES etl_runs(run_id) ON DELETE CASCADE,
+  script      TEXT NOT NULL,
+  file_path   TEXT NOT NULL,
+  status      TEXT NOT NULL CHECK (status IN (
+    'loaded', 'updated', 'skipped', 'unchanged', 'quarantined', 'failed'
+  )),
+  reason      TEXT,
+  recorded_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (run_id, file_path)
+);
+
+COMMENT ON COLUMN etl_runs.status IS 'running (a checkpointed run that has not finished, or died), succeeded, or failed when the run raised.';
+COMMENT ON TABLE etl_checkpoints IS 'One row per file an ETL run finished, written in the transaction that committed the file.';
+COMMENT ON COLUMN etl_checkpoints.run_id IS 'etl_runs.run_id of the run; the row is inserted as running when the run starts.';
+COMMENT ON COLUMN etl_checkpoints.script IS 'Script that ran (ingest_excel, import_course_excel).';
+COMMENT ON COLUMN etl_checkpoints.file_path IS 'Input file path as seen by the script.';
+COMMENT ON COLUMN etl_checkpoints.status IS 'loaded, updated, skipped (already in the database), unchanged (manifest skip), quarantined, or failed (stopped the run; retried on resume).';
+COMMENT ON COLUMN etl_checkpoints.reason IS 'Why the file was skipped, quarantined or failed.';
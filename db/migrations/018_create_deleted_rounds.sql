@@ -0,0 +1,33 @@
+-- Log deleted rounds so the incremental marts can drop them by round_id
+-- instead of scanning the whole mart for rounds that no longer exist.
+-- Rounds deleted before this migration are only dropped from the marts by
+-- `dbt run --full-refresh`.
+
+CREATE TABLE IF NOT EXISTS deleted_rounds (
+  round_id   INT NOT NULL,
+  player_id  INT NOT NULL,
+  deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_rounds_deleted_at
+  ON deleted_rounds(deleted_at);
+
+CREATE OR REPLACE FUNCTION log_deleted_rounds() RETURNS trigger AS $$
+BEGIN
+  INSERT INTO deleted_rounds (round_id, player_id)
+  SELECT round_id, player_id FROM old_rounds;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One insert per DELETE statement, so bulk deletes stay set-based.
+DROP TRIGGER IF EXISTS rounds_log_deleted ON rounds;
+CREATE TRIGGER rounds_log_deleted
+  AFTER DELETE ON rounds
+  REFERENCING OLD TABLE AS old_rounds
+  FOR EACH STATEMENT EXECUTE FUNCTION log_deleted_rounds();
+
+COMMENT ON TABLE deleted_rounds IS 'One row per deleted round; incremental marts drop rounds logged since their high-water mark. Rows older than every mart''s high-water mark can be removed.';
+COMMENT ON COLUMN deleted_rounds.round_id IS 'round_id of the deleted round.';
+COMMENT ON COLUMN deleted_rounds.player_id IS 'Player of the deleted round.';
+COMMENT ON COLUMN deleted_rounds.deleted_at IS 'Start of the transaction that deleted the round.';
@@ -0,0 +1,11 @@
+-- Player names are matched case-insensitively (golf_stats.reference), so make
+-- them unique the same way: 'Alex' and 'alex' would otherwise be two players
+-- that ingestion cannot tell apart. Fails if such duplicates already exist;
+-- merge them first.
+
+DROP INDEX IF EXISTS idx_players_player_name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_players_lower_player_name
+  ON players(lower(player_name));
+
+COMMENT ON COLUMN players.player_name IS 'Display name, unique ignoring case, used to match the player_name column of ingested files.';
@@ -0,0 +1,29 @@
+{#
+  Latest updated_at already present in an incremental model, minus a small
+  lookback so rows committed by transactions that started before the previous
+  run are not missed. Re-processing a round is harmless because the marts use
+  delete+insert on round_id.
+#}
+{% macro high_water_mark(column='updated_at') -%}
+(
+  select coalesce(max({{ column }}), '-infinity'::timestamptz)
+         - interval '{{ var("incremental_lookback") }}'
+  from {{ this }}
+)
+{%- endmacro %}
+
+{#
+  Incremental tables never see deletes from the source, so drop the rounds
+  logged in deleted_rounds (migration 018) since the high-water mark. Each
+  mart is indexed on round_id, so this touches only the deleted rounds. Runs
+  as a pre-hook, before the new rows move the mark past the deletions.
+#}
+{% macro delete_removed_rounds(deleted_relation) -%}
+{% if is_incremental() -%}
+delete from {{ this }}
+where round_id in (
+  select round_id from {{ deleted_relation }}
+  where deleted_at > {{ high_water_mark() }}
+)
+{%- endif %}
+{%- endmacro %}
@@ -0,0 +1,39 @@
+{% set matview = var('mart_materialization') == 'materialized_view' %}
+{{
+  config(
+    materialized='materialized_view' if matview else 'table',
+    indexes=[
+      {
+        'columns': ['player_id', 'course_id', 'tee_id', 'month', 'hole_number'],
+        'unique': True,
+      },
+      {'columns': ['player_id', 'month', 'course_name', 'tee_name']},
+    ]
+  )
+}}
+
+-- Additive per-hole partials (sums and counts, never averages) so the
+-- dashboard can re-aggregate any combination of months, courses and tees.
+-- Rebuilt in full each run: it has at most one row per player, course, tee,
+-- hole and month, so its size does not grow with the number of rounds.
+select
+  r.player_id,
+  r.course_id,
+  r.course_name,
+  r.tee_id,
+  r.tee_name,
+  date_trunc('month', r.date_played)::date as month,
+  hs.hole_number,
+  count(*) as holes_tracked,
+  sum(hs.strokes) as total_strokes,
+  sum(hs.putts) as total_putts,
+  sum(hs.par) as total_par,
+  sum(case when hs.tee_shot = 'Fairway' then 1 else 0 end) as fairways_hit,
+  sum(case when hs.approach = 'Green' then 1 else 0 end) as greens_in_reg,
+  sum(hs.out_of_bounds_count) as out_of_bounds_total,
+  max(hs.updated_at) as updated_at
+from {{ ref('fact_hole_stats') }} hs
+join {{ ref('fact_rounds') }} r
+  on r.player_id = hs.player_id
+ and r.round_id = hs.round_id
+group by 1,2,3,4,5,6,7
@@ -1,5 +1,21 @@
+{% set matview = var('mart_materialization') == 'materialized_view' %}
+{{
+  config(
+    materialized='materialized_view' if matview else 'incremental',
+    unique_key='round_id',
+    incremental_strategy='delete+insert',
+    indexes=[
+      {'columns': ['round_id'], 'unique': True},
+      {'columns': ['player_id', 'date_played']},
+      {'columns': ['updated_at']},
+    ],
+    pre_hook=[] if matview else ["{{ delete_removed_rounds(ref('stg_deleted_rounds')) }}"]
+  )
+}}
+
 select
   r.round_id,
+  r.player_id,
   r.round_external_id,
   r.date_played,
   r.course_name,
@@ -10,7 +26,14 @@ select
   avg(hs.putts::numeric) as avg_putts_per_hole,
   sum(case when hs.tee_shot = 'Fairway' then 1 else 0 end) as fairways_hit,
   sum(case when hs.approach = 'Green' then 1 else 0 end) as greens_in_reg,
-  sum(hs.out_of_bounds_count) as out_of_bounds_total
+  sum(hs.out_of_bounds_count) as out_of_bounds_total,
+  max(greatest(r.updated_at, hs.updated_at)) as updated_at
 from {{ ref('fact_rounds') }} r
 join {{ ref('fact_hole_stats') }} hs on r.round_id = hs.round_id
-group by 1,2,3,4,5
+{% if is_incremental() %}
+where r.round_id in (
+  select round_id from {{ ref('fact_hole_stats') }}
+  where updated_at > {{ high_water_mark() }}
+)
+{% endif %}
+group by 1,2,3,4,5,6
@@ -1,5 +1,22 @@
+{% set matview = var('mart_materialization') == 'materialized_view' %}
+{{
+  config(
+    materialized='materialized_view' if matview else 'incremental',
+    unique_key='round_id',
+    incremental_strategy='delete+insert',
+    indexes=[
+      {'columns': ['hole_stat_id'], 'unique': True},
+      {'columns': ['round_id']},
+      {'columns': ['updated_at']},
+      {'columns': ['player_id', 'date_played', 'round_id', 'hole_number']},
+    ],
+    pre_hook=[] if matview else ["{{ delete_removed_rounds(ref('stg_deleted_rounds')) }}"]
+  )
+}}
+
 select
   hs.hole_stat_id,
+  hs.player_id,
   hs.round_id,
   r.round_external_id,
   r.date_played,
@@ -15,12 +32,26 @@ select
   hs.tee_club,
   hs.approach_club,
   hs.bunker_found,
-  hs.out_of_bounds_count
+  hs.out_of_bounds_count,
+  greatest(r.updated_at, hs.updated_at) as updated_at
 from {{ ref('stg_hole_stats') }} hs
-join {{ ref('stg_rounds') }} r on hs.round_id = r.round_id
+join {{ ref('stg_rounds') }} r
+  on hs.player_id = r.player_id
+ and hs.round_id = r.round_id
 left join {{ ref('stg_holes') }} h
   on r.course_id = h.course_id
  and hs.hole_number = h.hole_number
 left join {{ ref('stg_tee_holes') }} th
   on r.tee_id = th.tee_id
  and hs.hole_number = th.hole_number
+{% if is_incremental() %}
+-- Rebuild every hole of a round touched since the last run, so holes deleted
+-- when a round is re-ingested disappear too.
+where hs.round_id in (
+  select round_id from {{ ref('stg_rounds') }}
+  where updated_at > {{ high_water_mark() }}
+  union
+  select round_id from {{ ref('stg_hole_stats') }}
+  where updated_at > {{ high_water_mark() }}
+)
+{% endif %}
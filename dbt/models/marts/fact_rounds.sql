@@ -1,5 +1,22 @@
+{% set matview = var('mart_materialization') == 'materialized_view' %}
+{{
+  config(
+    materialized='materialized_view' if matview else 'incremental',
+    unique_key='round_id',
+    incremental_strategy='delete+insert',
+    indexes=[
+      {'columns': ['round_id'], 'unique': True},
+      {'columns': ['player_id', 'date_played']},
+      {'columns': ['updated_at']},
+    ],
+    pre_hook=[] if matview else ["{{ delete_removed_rounds(ref('stg_deleted_rounds')) }}"]
+  )
+}}
+
 select
   r.round_id,
+  r.player_id,
+  p.player_name,
   r.round_external_id,
   r.date_played,
   r.holes_played,
@@ -13,7 +30,13 @@ select
   t.tee_name,
   t.course_rating,
   t.slope_rating,
-  t.yardage as tee_yardage
+  t.yardage as tee_yardage,
+  r.loaded_at,
+  r.updated_at
 from {{ ref('stg_rounds') }} r
+join {{ ref('stg_players') }} p on r.player_id = p.player_id
 join {{ ref('stg_courses') }} c on r.course_id = c.course_id
 left join {{ ref('stg_tees') }} t on r.tee_id = t.tee_id
+{% if is_incremental() %}
+where r.updated_at > {{ high_water_mark() }}
+{% endif %}
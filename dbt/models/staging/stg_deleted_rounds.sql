@@ -0,0 +1,5 @@
+select
+  round_id,
+  player_id,
+  deleted_at
+from deleted_rounds
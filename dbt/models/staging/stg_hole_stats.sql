@@ -1,5 +1,6 @@
 select
   hole_stat_id,
+  player_id,
   round_id,
   hole_number,
   strokes,
@@ -9,5 +10,7 @@ select
   tee_club,
   approach_club,
   bunker_found,
-  out_of_bounds_count
+  out_of_bounds_count,
+  loaded_at,
+  updated_at
 from hole_stats
@@ -0,0 +1,4 @@
+select
+  player_id,
+  player_name
+from players
@@ -1,5 +1,6 @@
 select
   round_id,
+  player_id,
   course_id,
   tee_id,
   date_played,
@@ -8,5 +9,7 @@ select
   round_type,
   round_format,
   notes,
-  round_external_id
+  round_external_id,
+  loaded_at,
+  updated_at
 from rounds
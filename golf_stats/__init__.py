@@ -0,0 +1 @@
+"""Shared code for the golf stats scripts and Streamlit app."""
@@ -0,0 +1,142 @@
+"""Per-file checkpoints so an interrupted ETL run can be resumed.
+
+Every run gets an ID when it starts: its `etl_runs` row is inserted as
+"running" and completed by `RunMetrics.record_run` at the end. Each file's
+outcome goes into `etl_checkpoints` (migration 017) in the same transaction
+that commits the file, so after a crash the checkpoints describe exactly the
+work that survived. `--resume RUN_ID` accepts a running or failed run of
+the same script (a ValueError otherwise) and reads its checkpoints into a
+dict once and drops every finished file with one lookup, without opening or
+stat-ing it; files that failed are tried again. At the end `reconcile`
+counts the run's files by outcome across all of its attempts.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import psycopg
+
+from golf_stats.metrics import RunMetrics
+
+# Outcomes in summary order. All but "failed" are final and skipped on resume.
+OUTCOMES = ("loaded", "updated", "skipped", "unchanged", "quarantined", "failed")
+FINISHED = set(OUTCOMES) - {"failed"}
+
+
+def insert_run(conn: psycopg.Connection, metrics: RunMetrics) -> int:
+    """Insert the run's etl_runs row as running; returns its run_id."""
+    row = conn.execute(
+        """
+        insert into etl_runs (
+            script, status, started_at, duration_seconds,
+            files_total, rows_written, report
+        )
+        values (%s, 'running', %s, 0, 0, 0, '{}')
+        returning run_id
+        """,
+        (metrics.script, metrics.started_at),
+    ).fetchone()
+    conn.commit()
+    return row[0]
+
+
+def check_resumable(conn: psycopg.Connection, run_id: int, script: str) -> None:
+    """ValueError unless run_id is an unfinished run of `script`."""
+    row = conn.execute(
+        "select script, status from etl_runs where run_id = %s", (run_id,)
+    ).fetchone()
+    conn.commit()
+    if row is None:
+        raise ValueError(f"Run {run_id} does not exist.")
+    if row[0] != script:
+        raise ValueError(f"Run {run_id} is a {row[0]} run, not {script}.")
+    if row[1] == "succeeded":
+        raise ValueError(f"Run {run_id} already succeeded; nothing to resume.")
+
+
+def load_checkpoints(conn: psycopg.Connection, run_id: int) -> dict[str, str]:
+    """{file_path: status} of a run."""
+    rows = conn.execute(
+        "select file_path, status from etl_checkpoints where run_id = %s",
+        (run_id,),
+    ).fetchall()
+    conn.commit()
+    return dict(rows)
+
+
+def start_run(
+    conn: psycopg.Connection,
+    metrics: RunMetrics,
+    files: list[Path],
+    resume: int | None = None,
+) -> list[Path]:
+    """Give the run its ID, or take over `resume`; returns the files left to do.
+
+    Call it before `metrics.recorded`, so a rejected --resume records no run.
+    """
+    if resume is None:
+        metrics.run_id = insert_run(conn, metrics)
+        print(f"Run {metrics.run_id} (if interrupted: --resume {metrics.run_id}).")
+        return files
+
+    check_resumable(conn, resume, metrics.script)
+    metrics.run_id = resume
+    done = load_checkpoints(conn, resume)
+    remaining = [path for path in files if done.get(str(path)) not in FINISHED]
+    print(
+        f"Resuming run {resume}: {len(files) - len(remaining)} file(s) already "
+        f"finished, {len(remaining)} to go."
+    )
+    return remaining
+
+
+def checkpoint(
+    conn: psycopg.Connection,
+    metrics: RunMetrics,
+    outcomes: Iterable[tuple[Path | str, str, str | None]],
+) -> None:
+    """Record (file, status, reason) for the run. Does not commit.
+
+    Call it in the transaction that wrote the files. A no-op for runs
+    without an ID.
+    """
+    if metrics.run_id is None:
+        return
+    with conn.cursor() as cur:
+        cur.executemany(
+            """
+            insert into etl_checkpoints (run_id, script, file_path, status, reason)
+            values (%s, %s, %s, %s, %s)
+            on conflict (run_id, file_path) do update set
+                status = excluded.status,
+                reason = excluded.reason,
+                recorded_at = now()
+            """,
+            [
+                (metrics.run_id, metrics.script, str(path), status, reason)
+                for path, status, reason in outcomes
+            ],
+        )
+
+
+def reconcile(conn: psycopg.Connection, run_id: int) -> Counter[str]:
+    """Files per outcome over every attempt of a run."""
+    rows = conn.execute(
+        """
+        select status, count(*) from etl_checkpoints
+        where run_id = %s
+        group by status
+        """,
+        (run_id,),
+    ).fetchall()
+    conn.commit()
+    return Counter(dict(rows))
+
+
+def print_reconciliation(conn: psycopg.Connection, run_id: int) -> None:
+    counts = reconcile(conn, run_id)
+    outcomes = ", ".join(f"{counts[status]} {status}" for status in OUTCOMES)
+    print(f"Run {run_id}: {outcomes} ({sum(counts.values())} files).")
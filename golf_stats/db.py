@@ -0,0 +1,125 @@
+"""PostgreSQL connections: settings from the environment and a shared pool.
+
+Scripts that hold one connection for a whole run use `get_conn()`. Long-lived
+processes (the Streamlit app) borrow from a process-wide `ConnectionPool`
+through `connection()`, which also records how long callers waited for a
+connection.
+
+Environment:
+- DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD
+- DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE: pool bounds (default 1 / 5)
+- DB_STATEMENT_TIMEOUT_MS: statement_timeout for pooled connections
+  (default 30000, 0 disables)
+- DB_PREPARE_THRESHOLD: executions before psycopg server-side prepares a
+  query on a connection (default 2); pooled connections keep them prepared
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+
+def connect_kwargs(statement_timeout_ms: int = 0) -> dict:
+    kwargs = {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": os.getenv("DB_PORT", "5432"),
+        "dbname": os.getenv("DB_NAME", "golf_stats"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD", "postgres"),
+    }
+    if statement_timeout_ms:
+        kwargs["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    return kwargs
+
+
+def get_conn() -> psycopg.Connection:
+    return psycopg.connect(**connect_kwargs())
+
+
+class WaitMetrics:
+    """Time spent waiting for a pooled connection, across all callers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "avg_wait_ms": (
+                    1000 * self.total_wait_seconds / self.requests
+                    if self.requests
+                    else 0.0
+                ),
+                "max_wait_ms": 1000 * self.max_wait_seconds,
+            }
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+wait_metrics = WaitMetrics()
+
+
+def _configure(conn: psycopg.Connection) -> None:
+    conn.prepare_threshold = int(os.getenv("DB_PREPARE_THRESHOLD", "2"))
+
+
+def create_pool(
+    min_size: int | None = None, max_size: int | None = None
+) -> ConnectionPool:
+    return ConnectionPool(
+        kwargs=connect_kwargs(int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))),
+        min_size=min_size or int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        max_size=max_size or int(os.getenv("DB_POOL_MAX_SIZE", "5")),
+        configure=_configure,
+        check=ConnectionPool.check_connection,
+        name="golf_stats",
+        open=True,
+    )
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = create_pool()
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+@contextmanager
+def connection(pool: ConnectionPool | None = None) -> Iterator[psycopg.Connection]:
+    """Borrow a pooled connection; commits on success, rolls back on error."""
+    pool = pool or get_pool()
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        wait_metrics.record(time.perf_counter() - started)
+        yield conn
+
+
+def pool_stats(pool: ConnectionPool | None = None) -> dict:
+    pool = pool or get_pool()
+    return {**pool.get_stats(), **wait_metrics.snapshot()}
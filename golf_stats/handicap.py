@@ -0,0 +1,332 @@
+"""World Handicap System score differentials and handicap index history.
+
+For each round, in (date_played, round_id) order:
+- course handicap = index * slope / 113 + (course rating - par), using the
+  index before the round
+- adjusted gross score caps every hole at net double bogey (par + 2 + the
+  handicap strokes received on the hole by its stroke index), or par + 5
+  while there is no index yet
+- score differential = 113 / slope * (adjusted gross - course rating)
+- the handicap index after the round averages the best differentials of the
+  most recent 20 (best 8 of 20, fewer with fewer rounds, per the WHS table)
+
+Only complete 18-hole stroke or match play rounds on a tee with a course and
+slope rating produce a differential; other rounds are recorded with the
+index carried forward. 9-hole rounds are not combined, and the playing
+conditions calculation and the soft/hard caps are not applied.
+
+Results live in `handicap_history` (migration 015), one row per round, and
+each player has their own history. `update_handicaps` only recomputes each
+player from their earliest round that is new, changed (rounds.updated_at
+after the row was computed) or deleted, seeded with the 19 differentials
+before it. Edits to tee ratings, pars or stroke indexes
+do not touch rounds, so run it with `full=True` after those.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Sequence
+
+import psycopg
+
+# Number of most recent differentials -> (how many of the lowest to average,
+# adjustment), for fewer than 20.
+DIFFERENTIALS_USED = {
+    3: (1, -2.0),
+    4: (1, -1.0),
+    5: (1, 0.0),
+    6: (2, -1.0),
+    7: (2, 0.0),
+    8: (2, 0.0),
+    9: (3, 0.0),
+    10: (3, 0.0),
+    11: (3, 0.0),
+    12: (4, 0.0),
+    13: (4, 0.0),
+    14: (4, 0.0),
+    15: (5, 0.0),
+    16: (5, 0.0),
+    17: (6, 0.0),
+    18: (6, 0.0),
+    19: (7, 0.0),
+}
+WINDOW = 20
+BEST_OF_WINDOW = 8
+MAX_INDEX = 54.0
+NO_INDEX_MAX_OVER_PAR = 5
+COUNTING_FORMATS = {"Stroke", "Match"}
+
+# Each player's earliest round whose handicap row is missing, stale or
+# orphaned.
+DIRTY_FROM = """
+select distinct on (player_id) player_id, date_played, round_id from (
+  -- A re-dated round also invalidates everything after its old date.
+  select r.player_id, least(r.date_played, h.date_played) as date_played, r.round_id
+  from rounds r
+  left join handicap_history h on h.round_id = r.round_id
+  where h.round_id is null or r.updated_at > h.computed_at
+  union all
+  select h.player_id, h.date_played, h.round_id
+  from handicap_history h
+  where not exists (
+    select 1 from rounds r
+    where r.player_id = h.player_id and r.round_id = h.round_id
+  )
+) dirty
+order by player_id, date_played, round_id
+"""
+
+SEED = """
+select score_differential
+from handicap_history
+where player_id = %s
+  and (date_played, round_id) < (%s, %s)
+  and score_differential is not null
+order by date_played desc, round_id desc
+limit %s
+"""
+
+WINDOW_ROUNDS = """
+select
+  r.round_id, r.date_played, r.holes_played, r.round_format,
+  t.course_rating, t.slope_rating
+from rounds r
+left join tees t on t.tee_id = r.tee_id
+where r.player_id = %(player_id)s
+  and (r.date_played, r.round_id) >= (%(date_played)s, %(round_id)s)
+order by r.date_played, r.round_id
+"""
+
+# hs.player_id is repeated so both tables are pruned to the player's partition.
+WINDOW_HOLES = """
+select hs.round_id, hs.strokes, h.par, h.hole_handicap_index, hs.hole_number
+from hole_stats hs
+join rounds r on r.player_id = hs.player_id and r.round_id = hs.round_id
+left join holes h on h.course_id = r.course_id and h.hole_number = hs.hole_number
+where hs.player_id = %(player_id)s
+  and r.player_id = %(player_id)s
+  and (r.date_played, r.round_id) >= (%(date_played)s, %(round_id)s)
+"""
+
+
+@dataclass
+class HoleScore:
+    strokes: int
+    par: int | None
+    stroke_index: int | None
+    hole_number: int
+
+
+@dataclass
+class HandicapRow:
+    round_id: int
+    date_played: date
+    gross_score: int
+    adjusted_gross_score: int | None
+    course_handicap: int | None
+    net_score: int | None
+    score_differential: float | None
+    index_before: float | None
+    handicap_index: float | None
+
+
+def handicap_index(differentials: Sequence[float]) -> float | None:
+    """Index from the most recent differentials (newest last); None if < 3."""
+    recent = sorted(differentials[-WINDOW:])
+    if len(recent) < 3:
+        return None
+    used, adjustment = DIFFERENTIALS_USED.get(len(recent), (BEST_OF_WINDOW, 0.0))
+    index = sum(recent[:used]) / used + adjustment
+    return min(round(index, 1), MAX_INDEX)
+
+
+def course_handicap(
+    index: float, slope_rating: float, course_rating: float, par: int
+) -> int:
+    return round(index * slope_rating / 113 + (course_rating - par))
+
+
+def strokes_received(course_hcp: int, stroke_index: int) -> int:
+    """Handicap strokes on a hole; negative for plus handicaps."""
+    base, extra = divmod(course_hcp, 18)
+    return base + (1 if stroke_index <= extra else 0)
+
+
+def adjusted_gross(holes: Sequence[HoleScore], course_hcp: int | None) -> int:
+    """Gross score with every hole capped at net double bogey."""
+    # Holes without a stroke index take the unused indexes in hole order.
+    missing = sorted(hole.hole_number for hole in holes if hole.stroke_index is None)
+    free = sorted(set(range(1, 19)) - {hole.stroke_index for hole in holes})
+    fallback = dict(zip(missing, free))
+    total = 0
+    for hole in holes:
+        if course_hcp is None:
+            cap = hole.par + NO_INDEX_MAX_OVER_PAR
+        else:
+            index = hole.stroke_index or fallback[hole.hole_number]
+            cap = hole.par + 2 + strokes_received(course_hcp, index)
+        total += min(hole.strokes, cap)
+    return total
+
+
+def score_differential(
+    adjusted_gross_score: int, course_rating: float, slope_rating: float
+) -> float:
+    return round(113 / slope_rating * (adjusted_gross_score - course_rating), 1)
+
+
+def score_round(
+    round_id: int,
+    date_played: date,
+    holes: Sequence[HoleScore],
+    counts: bool,
+    course_rating: float | None,
+    slope_rating: float | None,
+    index_before: float | None,
+) -> HandicapRow:
+    """Score one round given the index going into it."""
+    gross = sum(hole.strokes for hole in holes)
+    if not counts:
+        return HandicapRow(
+            round_id, date_played, gross, None, None, None, None, index_before, None
+        )
+    par = sum(hole.par for hole in holes)
+    course_hcp = (
+        None
+        if index_before is None
+        else course_handicap(index_before, slope_rating, course_rating, par)
+    )
+    adjusted = adjusted_gross(holes, course_hcp)
+    return HandicapRow(
+        round_id=round_id,
+        date_played=date_played,
+        gross_score=gross,
+        adjusted_gross_score=adjusted,
+        course_handicap=course_hcp,
+        net_score=None if course_hcp is None else gross - course_hcp,
+        score_differential=score_differential(adjusted, course_rating, slope_rating),
+        index_before=index_before,
+        handicap_index=None,
+    )
+
+
+def recompute(
+    rounds: Sequence[tuple],
+    holes_by_round: dict[int, list[HoleScore]],
+    seed: list[float],
+) -> list[HandicapRow]:
+    """Handicap rows for rounds in order, continuing from seed differentials."""
+    differentials = list(seed)
+    index = handicap_index(differentials)
+    rows = []
+    for round_id, played, holes_played, round_format, rating, slope in rounds:
+        holes = holes_by_round.get(round_id, [])
+        counts = (
+            holes_played == "18"
+            and round_format in COUNTING_FORMATS
+            and rating is not None
+            and slope is not None
+            and len(holes) == 18
+            and all(hole.par is not None for hole in holes)
+        )
+        row = score_round(
+            round_id,
+            played,
+            holes,
+            counts,
+            None if rating is None else float(rating),
+            None if slope is None else float(slope),
+            index,
+        )
+        if row.score_differential is not None:
+            differentials = [*differentials, row.score_differential][-WINDOW:]
+            index = handicap_index(differentials)
+        row.handicap_index = index
+        rows.append(row)
+    return rows
+
+
+def update_player(
+    cur: psycopg.Cursor, player_id: int, start: tuple[date, int]
+) -> int:
+    """Recompute one player's rows from `start` (date_played, round_id)."""
+    window = {"player_id": player_id, "date_played": start[0], "round_id": start[1]}
+    cur.execute(SEED, (player_id, *start, WINDOW - 1))
+    seed = [float(row[0]) for row in reversed(cur.fetchall())]
+    cur.execute(WINDOW_ROUNDS, window)
+    rounds = cur.fetchall()
+    cur.execute(WINDOW_HOLES, window)
+    holes_by_round: dict[int, list[HoleScore]] = {}
+    for round_id, strokes, par, stroke_index, hole_number in cur.fetchall():
+        holes_by_round.setdefault(round_id, []).append(
+            HoleScore(strokes, par, stroke_index, hole_number)
+        )
+
+    rows = recompute(rounds, holes_by_round, seed)
+    cur.execute(
+        """
+        delete from handicap_history
+        where player_id = %s and (date_played, round_id) >= (%s, %s)
+        """,
+        (player_id, *start),
+    )
+    with cur.copy(
+        """
+        copy handicap_history (
+          player_id, round_id, date_played, gross_score, adjusted_gross_score,
+          course_handicap, net_score, score_differential, index_before,
+          handicap_index
+        ) from stdin
+        """
+    ) as copy:
+        for row in rows:
+            copy.write_row(
+                (
+                    player_id,
+                    row.round_id,
+                    row.date_played,
+                    row.gross_score,
+                    row.adjusted_gross_score,
+                    row.course_handicap,
+                    row.net_score,
+                    row.score_differential,
+                    row.index_before,
+                    row.handicap_index,
+                )
+            )
+    return len(rows)
+
+
+def update_handicaps(conn: psycopg.Connection, full: bool = False) -> int:
+    """Recompute handicap_history from each player's earliest dirty round.
+
+    Returns the number of rows written, over all players.
+    """
+    with conn.cursor() as cur:
+        if full:
+            cur.execute("select player_id from players order by player_id")
+            starts = [(player_id, date.min, 0) for (player_id,) in cur.fetchall()]
+        else:
+            cur.execute(DIRTY_FROM)
+            starts = cur.fetchall()
+        written = sum(
+            update_player(cur, player_id, (date_played, round_id))
+            for player_id, date_played, round_id in starts
+        )
+    conn.commit()
+    return written
+
+
+def current_index(conn: psycopg.Connection, player_id: int) -> float | None:
+    row = conn.execute(
+        """
+        select handicap_index from handicap_history
+        where player_id = %s
+        order by date_played desc, round_id desc
+        limit 1
+        """,
+        (player_id,),
+    ).fetchone()
+    return None if row is None or row[0] is None else float(row[0])
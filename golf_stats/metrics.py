@@ -0,0 +1,206 @@
+"""Per-run timings and counters for the ETL scripts.
+
+A `RunMetrics` collects stage durations (`with metrics.stage("parse"):` or
+`metrics.add_time(...)` for time measured elsewhere, e.g. in a worker),
+counters (rows written, skip reasons) and one record per input file. At the
+end of a run it is written as a JSON report and a row in `etl_runs`
+(migration 014). Wrap the run in `metrics.recorded(conn)` so both are
+written, with the right status, even when the run fails. Runs that checkpoint
+their files (golf_stats.checkpoint) insert their row as running and set
+`run_id` up front; the end of the run, or of a resumed attempt, completes it,
+adding the attempt's counts and files to those already recorded.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+import psycopg
+from psycopg.types.json import Jsonb
+
+REPORT_DIR = Path("data/reports")
+
+
+def merge_reports(previous: dict, current: dict) -> dict:
+    """Combine the reports of two attempts of one run.
+
+    Durations, stage timings and counters add up; a file's record from the
+    later attempt replaces the earlier one (it was retried).
+    """
+    if not previous:
+        return current
+    counters = Counter(previous["counters"])
+    counters.update(current["counters"])
+    stages = {name: dict(stage) for name, stage in previous["stages"].items()}
+    for name, stage in current["stages"].items():
+        total = stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        total["seconds"] = round(total["seconds"] + stage["seconds"], 3)
+        total["calls"] += stage["calls"]
+    return {
+        **current,
+        "started_at": previous["started_at"],
+        "duration_seconds": round(
+            previous["duration_seconds"] + current["duration_seconds"], 3
+        ),
+        "attempts": previous.get("attempts", 1) + 1,
+        "stages": stages,
+        "counters": dict(counters),
+        "files": {**previous["files"], **current["files"]},
+    }
+
+
+class RunMetrics:
+    def __init__(self, script: str) -> None:
+        self.script = script
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.stage_seconds: dict[str, float] = defaultdict(float)
+        self.stage_calls: Counter[str] = Counter()
+        self.counters: Counter[str] = Counter()
+        self.files: dict[str, dict] = {}
+        self.run_id: int | None = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.stage_seconds[name] += seconds
+        self.stage_calls[name] += 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def file(self, path: Path | str, **fields) -> None:
+        """Add fields to a file's record; numeric *_seconds fields accumulate."""
+        record = self.files.setdefault(str(path), {})
+        for key, value in fields.items():
+            if key.endswith("_seconds") and key in record:
+                record[key] += value
+            else:
+                record[key] = value
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def slowest_file(self) -> str | None:
+        if not self.files:
+            return None
+        return max(
+            self.files,
+            key=lambda path: sum(
+                value
+                for key, value in self.files[path].items()
+                if key.endswith("_seconds")
+            ),
+        )
+
+    def report(self) -> dict:
+        return {
+            "script": self.script,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(self.elapsed(), 3),
+            "stages": {
+                name: {
+                    "seconds": round(seconds, 3),
+                    "calls": self.stage_calls[name],
+                }
+                for name, seconds in self.stage_seconds.items()
+            },
+            "counters": dict(self.counters),
+            "files": {
+                path: {
+                    key: round(value, 3) if key.endswith("_seconds") else value
+                    for key, value in record.items()
+                }
+                for path, record in self.files.items()
+            },
+        }
+
+    def summary(self) -> str:
+        stages = ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.stage_seconds.items()
+        )
+        return f"{self.elapsed():.2f}s total ({stages})"
+
+    def write_json(self, path: Path | None = None) -> Path:
+        if path is None:
+            stamp = self.started_at.strftime("%Y%m%dT%H%M%SZ")
+            path = REPORT_DIR / f"{self.script}-{stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2, default=str))
+        return path
+
+    @contextmanager
+    def recorded(
+        self, conn: psycopg.Connection, report_path: Path | None = None
+    ) -> Iterator["RunMetrics"]:
+        status = "failed"
+        try:
+            yield self
+            status = "succeeded"
+        finally:
+            print(f"Run report: {self.write_json(report_path)} ({self.summary()})")
+            try:
+                if status == "failed":
+                    conn.rollback()
+                self.record_run(conn, status)
+            except psycopg.Error as exc:
+                print(f"Could not record run in etl_runs: {exc}")
+                if not conn.closed:
+                    conn.rollback()
+
+    def record_run(self, conn: psycopg.Connection, status: str = "succeeded") -> None:
+        """Write the run's etl_runs row.
+
+        A run with a `run_id` completes its row; after a --resume the row
+        covers every attempt (see merge_reports), not just the last one.
+        """
+        report = self.report()
+        if self.run_id is not None:
+            row = conn.execute(
+                "select report from etl_runs where run_id = %s for update",
+                (self.run_id,),
+            ).fetchone()
+            if row is not None:
+                report = merge_reports(row[0], report)
+        conn.execute(
+            """
+            insert into etl_runs (
+                run_id, script, status, started_at, duration_seconds,
+                files_total, rows_written, report
+            )
+            values (
+                coalesce(%s, nextval(pg_get_serial_sequence('etl_runs', 'run_id'))),
+                %s, %s, %s, %s, %s, %s, %s
+            )
+            on conflict (run_id) do update set
+                status = excluded.status,
+                finished_at = excluded.finished_at,
+                duration_seconds = excluded.duration_seconds,
+                files_total = excluded.files_total,
+                rows_written = excluded.rows_written,
+                report = excluded.report
+            """,
+            (
+                self.run_id,
+                self.script,
+                status,
+                self.started_at,
+                report["duration_seconds"],
+                len(report["files"]),
+                report["counters"].get("rows_written", 0),
+                Jsonb(report),
+            ),
+        )
+        conn.commit()
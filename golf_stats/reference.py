@@ -0,0 +1,115 @@
+"""In-process cache of players, courses, tees and holes for resolving rounds.
+
+Loaded with one query per table and keyed by normalized name (case and
+whitespace insensitive), so resolving a round's course and tee costs no
+round trip. A lookup that misses re-checks a cheap version token and reloads
+when the reference tables changed, which picks up courses added by
+`import_course_excel` (or players added in the app) while a long ingestion run
+is in progress.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import psycopg
+
+VERSION_QUERY = """
+select
+  (select count(*) || ':' || coalesce(max(course_id), 0) from courses),
+  (select count(*) || ':' || coalesce(max(tee_id), 0) from tees),
+  (select count(*) || ':' || coalesce(max(hole_id), 0) from holes),
+  (select count(*) || ':' || coalesce(max(player_id), 0) from players)
+"""
+
+# Player of rounds whose file or form does not name one (migration 016).
+DEFAULT_PLAYER = "Default"
+
+
+def normalize(name) -> str:
+    return " ".join(str(name).split()).casefold()
+
+
+@dataclass
+class Course:
+    course_id: int
+    course_name: str
+    tees: dict[str, int] = field(default_factory=dict)
+    pars: dict[int, int] = field(default_factory=dict)
+
+
+class ReferenceCache:
+    def __init__(self, conn: psycopg.Connection) -> None:
+        self.conn = conn
+        self.courses: dict[str, Course] = {}
+        self.by_id: dict[int, Course] = {}
+        self.players: dict[str, int] = {}
+        self.version: tuple | None = None
+        self.loads = 0
+        self.load()
+
+    def load(self) -> None:
+        courses: dict[str, Course] = {}
+        players: dict[str, int] = {}
+        with self.conn.cursor() as cur:
+            cur.execute(VERSION_QUERY)
+            version = cur.fetchone()
+            cur.execute("select course_id, course_name from courses")
+            for course_id, course_name in cur.fetchall():
+                courses[normalize(course_name)] = Course(course_id, course_name)
+            by_id = {course.course_id: course for course in courses.values()}
+            cur.execute("select course_id, tee_name, tee_id from tees")
+            for course_id, tee_name, tee_id in cur.fetchall():
+                by_id[course_id].tees[normalize(tee_name)] = tee_id
+            cur.execute("select course_id, hole_number, par from holes")
+            for course_id, hole_number, par in cur.fetchall():
+                by_id[course_id].pars[hole_number] = par
+            cur.execute("select player_id, player_name from players")
+            for player_id, player_name in cur.fetchall():
+                players[normalize(player_name)] = player_id
+        self.courses, self.by_id, self.version = courses, by_id, version
+        self.players = players
+        self.loads += 1
+
+    def refresh_if_changed(self) -> bool:
+        """Reload when the reference tables changed since the last load."""
+        with self.conn.cursor() as cur:
+            cur.execute(VERSION_QUERY)
+            changed = cur.fetchone() != self.version
+        if changed:
+            self.load()
+        return changed
+
+    def lookup(self, course_name, tee_name) -> tuple[Course | None, int | None]:
+        course = self.courses.get(normalize(course_name))
+        tee_id = course.tees.get(normalize(tee_name)) if course else None
+        return course, tee_id
+
+    def resolve(self, course_name, tee_name) -> tuple[int, int]:
+        """(course_id, tee_id) for a round; raises ValueError if unknown."""
+        course, tee_id = self.lookup(course_name, tee_name)
+        if tee_id is None and self.refresh_if_changed():
+            course, tee_id = self.lookup(course_name, tee_name)
+        if course is None:
+            raise ValueError(f"Course not found: {course_name}")
+        if tee_id is None:
+            raise ValueError(f"Tee not found: {tee_name} for course {course_name}")
+        return course.course_id, tee_id
+
+    def resolve_player(self, player_name) -> int:
+        """player_id for a player name; raises ValueError if unknown."""
+        player_id = self.players.get(normalize(player_name))
+        if player_id is None and self.refresh_if_changed():
+            player_id = self.players.get(normalize(player_name))
+        if player_id is None:
+            raise ValueError(f"Player not found: {player_name}")
+        return player_id
+
+    def missing_holes(self, course_id: int, hole_numbers) -> list[int]:
+        """Hole numbers with no `holes` row (and so no par) for the course."""
+        pars = self.by_id[course_id].pars
+        missing = sorted({int(n) for n in hole_numbers} - pars.keys())
+        if missing and self.refresh_if_changed():
+            pars = self.by_id[course_id].pars
+            missing = sorted({int(n) for n in hole_numbers} - pars.keys())
+        return missing
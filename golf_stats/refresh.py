@@ -0,0 +1,113 @@
+"""Refresh marts deployed as materialized views and report their freshness.
+
+With the dbt var `mart_materialization: materialized_view` the marts are
+built as PostgreSQL materialized views with unique indexes. They are then
+refreshed here with REFRESH MATERIALIZED VIEW CONCURRENTLY, which lets
+dashboard readers keep querying the old contents while the refresh runs.
+Marts built as ordinary tables are left to `dbt run` and skipped.
+
+Each refresh is logged in `mart_refresh_log` (migration 013).
+"""
+
+from __future__ import annotations
+
+import time
+
+import psycopg
+from psycopg import sql
+
+# Dependency order: later views read from earlier ones.
+MARTS = (
+    "fact_rounds",
+    "fact_hole_stats",
+    "agg_round_kpis",
+    "agg_hole_by_course_tee_month",
+)
+
+SOURCE_UPDATED_AT = """
+select greatest(
+  (select max(updated_at) from rounds),
+  (select max(updated_at) from hole_stats)
+)
+"""
+
+
+def materialized_marts(conn: psycopg.Connection) -> list[str]:
+    rows = conn.execute(
+        """
+        select matviewname from pg_matviews
+        where schemaname = any(current_schemas(false))
+          and matviewname = any(%s)
+        """,
+        (list(MARTS),),
+    ).fetchall()
+    found = {row[0] for row in rows}
+    return [name for name in MARTS if name in found]
+
+
+def refresh_marts(conn: psycopg.Connection) -> list[dict]:
+    """Refresh every mart that is a materialized view; one commit per view."""
+    results = []
+    for name in materialized_marts(conn):
+        with conn.cursor() as cur:
+            cur.execute("select now()")
+            started_at = cur.fetchone()[0]
+            cur.execute(SOURCE_UPDATED_AT)
+            source_updated_at = cur.fetchone()[0]
+            started = time.perf_counter()
+            cur.execute(
+                sql.SQL("refresh materialized view concurrently {}").format(
+                    sql.Identifier(name)
+                )
+            )
+            duration_ms = 1000 * (time.perf_counter() - started)
+            cur.execute(
+                """
+                insert into mart_refresh_log
+                  (view_name, started_at, duration_ms, source_updated_at)
+                values (%s, %s, %s, %s)
+                """,
+                (name, started_at, round(duration_ms, 1), source_updated_at),
+            )
+        conn.commit()
+        results.append({"view_name": name, "duration_ms": duration_ms})
+    return results
+
+
+def print_refreshes(results: list[dict]) -> None:
+    for result in results:
+        print(f"Refreshed {result['view_name']} in {result['duration_ms']:.0f} ms.")
+
+
+def freshness(conn: psycopg.Connection) -> dict | None:
+    """Last refresh of the dashboard's KPI mart and how far behind it is.
+
+    Returns None when the marts are not materialized views (or were never
+    refreshed). `stale_seconds` is how much newer the latest source change is
+    than the data captured by the last refresh (0 when up to date).
+    """
+    if "agg_round_kpis" not in materialized_marts(conn):
+        return None
+    row = conn.execute(
+        f"""
+        select
+          l.finished_at,
+          l.duration_ms,
+          l.source_updated_at,
+          extract(epoch from greatest(
+            ({SOURCE_UPDATED_AT}) - l.source_updated_at, interval '0'
+          ))
+        from mart_refresh_log l
+        where l.view_name = 'agg_round_kpis'
+        order by l.finished_at desc
+        limit 1
+        """
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        "refreshed_at": row[0],
+        "duration_ms": float(row[1]),
+        "source_updated_at": row[2],
+        "stale_seconds": float(row[3] or 0),
+    }
@@ -0,0 +1,214 @@
+"""Set-based saves for the Streamlit forms.
+
+A course (with its tees, hole pars and per-tee yardages) or a round (with its
+hole stats) is written by one statement: data-modifying CTEs insert the parent
+row and feed its id to multi-row `INSERT ... SELECT FROM unnest(...)` for the
+children. Saving is one round trip plus the commit, however many tees or holes
+the form has.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Sequence
+
+import psycopg
+
+
+@dataclass
+class SaveResult:
+    row_id: int | None  # None when the business key already existed
+    round_trips: int
+    elapsed_ms: float
+
+
+@dataclass
+class TeeInput:
+    tee_name: str
+    course_rating: float | None = None
+    slope_rating: float | None = None
+    yardage: int | None = None
+
+
+@dataclass
+class HoleStatInput:
+    hole_number: int
+    strokes: int
+    putts: int
+    tee_shot: str | None = None
+    approach: str | None = None
+    tee_club: str | None = None
+    approach_club: str | None = None
+    bunker_found: int = 0
+    out_of_bounds_count: int = 0
+
+
+SAVE_COURSE = """
+with course as (
+  insert into courses (course_name, location, notes)
+  values (%(course_name)s, %(location)s, %(notes)s)
+  on conflict (course_name) do nothing
+  returning course_id
+),
+new_tees as (
+  insert into tees (course_id, tee_name, course_rating, slope_rating, yardage)
+  select c.course_id, t.tee_name, t.course_rating, t.slope_rating, t.yardage
+  from course c,
+       unnest(%(tee_names)s::text[], %(course_ratings)s::numeric[],
+              %(slope_ratings)s::numeric[], %(tee_yardages)s::int[])
+         as t(tee_name, course_rating, slope_rating, yardage)
+  returning tee_id, tee_name
+),
+new_holes as (
+  insert into holes (course_id, hole_number, par)
+  select c.course_id, h.hole_number, h.par
+  from course c,
+       unnest(%(hole_numbers)s::int[], %(pars)s::int[]) as h(hole_number, par)
+),
+new_tee_holes as (
+  insert into tee_holes (tee_id, hole_number, yardage)
+  select t.tee_id, y.hole_number, y.yardage
+  from unnest(%(yardage_tees)s::text[], %(yardage_holes)s::int[],
+              %(yardages)s::int[]) as y(tee_name, hole_number, yardage)
+  join new_tees t on t.tee_name = y.tee_name
+)
+select course_id from course
+"""
+
+SAVE_PLAYER = """
+insert into players (player_name)
+values (%(player_name)s)
+on conflict (lower(player_name)) do nothing
+returning player_id
+"""
+
+SAVE_ROUND = """
+with new_round as (
+  insert into rounds (
+    player_id, course_id, tee_id, date_played, holes_played,
+    conditions, round_type, round_format, notes,
+    round_external_id
+  )
+  values (
+    %(player_id)s, %(course_id)s, %(tee_id)s, %(date_played)s, %(holes_played)s,
+    %(conditions)s, %(round_type)s, %(round_format)s, %(notes)s,
+    %(round_external_id)s
+  )
+  on conflict (player_id, round_external_id) where round_external_id is not null
+  do nothing
+  returning player_id, round_id
+),
+new_holes as (
+  insert into hole_stats (
+    player_id, round_id, hole_number, strokes, putts,
+    tee_shot, approach, tee_club, approach_club,
+    bunker_found, out_of_bounds_count
+  )
+  select r.player_id, r.round_id, h.*
+  from new_round r,
+       unnest(%(hole_numbers)s::int[], %(strokes)s::int[], %(putts)s::int[],
+              %(tee_shots)s::text[], %(approaches)s::text[],
+              %(tee_clubs)s::text[], %(approach_clubs)s::text[],
+              %(bunker_found)s::int[], %(out_of_bounds)s::int[])
+         as h(hole_number, strokes, putts, tee_shot, approach, tee_club,
+              approach_club, bunker_found, out_of_bounds_count)
+)
+select round_id from new_round
+"""
+
+
+def _execute_one(conn: psycopg.Connection, query: str, params: dict) -> SaveResult:
+    started = time.perf_counter()
+    row = conn.execute(query, params).fetchone()
+    conn.commit()
+    return SaveResult(
+        row_id=row[0] if row else None,
+        round_trips=2,
+        elapsed_ms=1000 * (time.perf_counter() - started),
+    )
+
+
+def save_course(
+    conn: psycopg.Connection,
+    course_name: str,
+    location: str | None,
+    notes: str | None,
+    tees: Sequence[TeeInput],
+    pars: dict[int, int],
+    yardages: Sequence[tuple[str, int, int]],
+) -> SaveResult:
+    """Insert a course with its tees, pars and (tee_name, hole, yardage) rows.
+
+    Nothing is written, and row_id is None, if the course name already exists.
+    """
+    return _execute_one(
+        conn,
+        SAVE_COURSE,
+        {
+            "course_name": course_name,
+            "location": location,
+            "notes": notes,
+            "tee_names": [tee.tee_name for tee in tees],
+            "course_ratings": [tee.course_rating for tee in tees],
+            "slope_ratings": [tee.slope_rating for tee in tees],
+            "tee_yardages": [tee.yardage for tee in tees],
+            "hole_numbers": list(pars),
+            "pars": list(pars.values()),
+            "yardage_tees": [tee_name for tee_name, _, _ in yardages],
+            "yardage_holes": [hole for _, hole, _ in yardages],
+            "yardages": [yardage for _, _, yardage in yardages],
+        },
+    )
+
+
+def save_player(conn: psycopg.Connection, player_name: str) -> SaveResult:
+    """Insert a player; row_id is None if the name is taken, ignoring case."""
+    return _execute_one(conn, SAVE_PLAYER, {"player_name": player_name})
+
+
+def save_round(
+    conn: psycopg.Connection,
+    player_id: int,
+    course_id: int,
+    tee_id: int,
+    date_played: date,
+    holes_played: str,
+    round_type: str,
+    round_format: str,
+    round_external_id: str,
+    holes: Sequence[HoleStatInput],
+    conditions: str | None = None,
+    notes: str | None = None,
+) -> SaveResult:
+    """Insert a round and its hole stats for a player.
+
+    Nothing is written, and row_id is None, if the player already has a round
+    with this round_external_id.
+    """
+    return _execute_one(
+        conn,
+        SAVE_ROUND,
+        {
+            "player_id": player_id,
+            "course_id": course_id,
+            "tee_id": tee_id,
+            "date_played": date_played,
+            "holes_played": holes_played,
+            "conditions": conditions,
+            "round_type": round_type,
+            "round_format": round_format,
+            "notes": notes,
+            "round_external_id": round_external_id,
+            "hole_numbers": [hole.hole_number for hole in holes],
+            "strokes": [hole.strokes for hole in holes],
+            "putts": [hole.putts for hole in holes],
+            "tee_shots": [hole.tee_shot for hole in holes],
+            "approaches": [hole.approach for hole in holes],
+            "tee_clubs": [hole.tee_club for hole in holes],
+            "approach_clubs": [hole.approach_club for hole in holes],
+            "bunker_found": [hole.bunker_found for hole in holes],
+            "out_of_bounds": [hole.out_of_bounds_count for hole in holes],
+        },
+    )
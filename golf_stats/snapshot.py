@@ -0,0 +1,183 @@
+"""Parquet snapshots of the dashboard marts, for serving without a database.
+
+`export_snapshot` (run after `dbt run`, see scripts/export_snapshot.py)
+writes one Parquet file per table in SNAPSHOT_TABLES into a new
+`<directory>/<timestamp>/` folder, then points `<directory>/manifest.json` at
+it. The manifest is replaced atomically, so readers always see a complete
+snapshot; the previous folder is kept for readers still using it and older
+ones are removed.
+
+Files are sorted by player_id then date, in row groups of ROW_GROUP_SIZE
+rows, so a filtered `read_table` on one player only decodes the row groups
+whose min/max statistics can match.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import psycopg
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from psycopg.postgres import types as pg_types
+from psycopg.types.numeric import FloatLoader
+
+MANIFEST = "manifest.json"
+ROW_GROUP_SIZE = 64_000
+FETCH_SIZE = 50_000
+
+SNAPSHOT_TABLES = {
+    "players": "select player_id, player_name from players order by player_id",
+    "round_kpis": "select * from agg_round_kpis order by player_id, date_played",
+    # Course and tee names are denormalized so hole queries need no join.
+    "hole_stats": """
+        select
+          hs.player_id, hs.date_played, hs.round_id, hs.hole_number,
+          r.course_name, r.tee_name, hs.round_external_id, hs.par, hs.yardage,
+          hs.strokes, hs.putts, hs.tee_shot, hs.approach, hs.tee_club,
+          hs.approach_club, hs.bunker_found, hs.out_of_bounds_count
+        from fact_hole_stats hs
+        join fact_rounds r on r.player_id = hs.player_id and r.round_id = hs.round_id
+        order by hs.player_id, hs.date_played, hs.round_id, hs.hole_number
+    """,
+    "hole_months": """
+        select * from agg_hole_by_course_tee_month
+        order by player_id, month, hole_number
+    """,
+    "handicap_history": """
+        select player_id, round_id, date_played, gross_score, net_score,
+               score_differential, handicap_index
+        from handicap_history
+        order by player_id, date_played, round_id
+    """,
+}
+
+# PostgreSQL type name -> Arrow type; anything else is stored as a string.
+ARROW_TYPES = {
+    "int2": pa.int64(),
+    "int4": pa.int64(),
+    "int8": pa.int64(),
+    "float4": pa.float64(),
+    "float8": pa.float64(),
+    "numeric": pa.float64(),
+    "bool": pa.bool_(),
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("us"),
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+}
+
+
+def arrow_schema(description) -> pa.Schema:
+    fields = []
+    for column in description:
+        info = pg_types.get(column.type_code)
+        arrow_type = ARROW_TYPES.get(info.name if info else "", pa.string())
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def export_table(conn: psycopg.Connection, query: str, path: Path) -> int:
+    """Stream a query into a Parquet file through a server-side cursor."""
+    rows_written = 0
+    with conn.cursor(name=f"snapshot_{path.stem}") as cur:
+        # numeric columns (averages, ratings) are stored as doubles.
+        cur.adapters.register_loader("numeric", FloatLoader)
+        cur.itersize = FETCH_SIZE
+        cur.execute(query)
+        rows = cur.fetchmany(FETCH_SIZE)
+        schema = arrow_schema(cur.description)
+        with pq.ParquetWriter(path, schema) as writer:
+            while rows:
+                columns = list(zip(*rows))
+                writer.write_table(
+                    pa.Table.from_arrays(
+                        [
+                            pa.array(values, type=field.type)
+                            for values, field in zip(columns, schema)
+                        ],
+                        schema=schema,
+                    ),
+                    row_group_size=ROW_GROUP_SIZE,
+                )
+                rows_written += len(rows)
+                rows = cur.fetchmany(FETCH_SIZE)
+    return rows_written
+
+
+def export_snapshot(conn: psycopg.Connection, directory: Path) -> dict:
+    """Export SNAPSHOT_TABLES and publish them in the manifest; returns it.
+
+    Everything is read in one REPEATABLE READ transaction so the files are
+    consistent with each other and with the recorded data version.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    exported_at = datetime.now(timezone.utc)
+    folder = exported_at.strftime("%Y%m%dT%H%M%S%fZ")
+    (directory / folder).mkdir()
+
+    tables = {}
+    with conn.transaction():
+        conn.execute("set transaction isolation level repeatable read")
+        count, updated_at = conn.execute(
+            "select count(*), max(updated_at) from agg_round_kpis"
+        ).fetchone()
+        for name, query in SNAPSHOT_TABLES.items():
+            started = time.perf_counter()
+            path = directory / folder / f"{name}.parquet"
+            rows = export_table(conn, query, path)
+            tables[name] = {
+                "rows": rows,
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+
+    manifest = {
+        "folder": folder,
+        "exported_at": exported_at.isoformat(),
+        "data_version": [count, updated_at.isoformat() if updated_at else None],
+        "tables": tables,
+    }
+    temp = directory / f"{MANIFEST}.tmp"
+    temp.write_text(json.dumps(manifest, indent=2))
+    previous = read_manifest(directory)
+    os.replace(temp, directory / MANIFEST)
+
+    keep = {folder}
+    if previous is not None:
+        keep.add(previous["folder"])
+    for path in directory.iterdir():
+        if path.is_dir() and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(directory: Path) -> dict | None:
+    path = directory / MANIFEST
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text())
+    manifest["directory"] = str(directory)
+    return manifest
+
+
+def snapshot_age_seconds(manifest: dict) -> float:
+    exported_at = datetime.fromisoformat(manifest["exported_at"])
+    return (datetime.now(timezone.utc) - exported_at).total_seconds()
+
+
+def read_table(
+    manifest: dict,
+    name: str,
+    filters: pc.Expression | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """One snapshot table as a DataFrame, memory-mapped and filtered by Arrow."""
+    path = Path(manifest["directory"]) / manifest["folder"] / f"{name}.parquet"
+    table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    return table.to_pandas()
@@ -0,0 +1,153 @@
+"""Strokes-gained style breakdown of hole stats against a scratch baseline.
+
+Shot distances are not tracked, only outcome categories (tee_shot, approach)
+and each hole's yardage, so expected strokes come from baseline tables:
+- from the tee, by hole yardage
+- after the tee shot on par 4/5, from the fairway at the yardage left after
+  a typical drive, plus a penalty for the lie the tee shot found (out of
+  bounds means replaying from the tee with a penalty stroke)
+- after the shot that reaches the green area, by where it finished
+
+Each hole's strokes gained (expected from the tee minus strokes taken) is
+split into off the tee, approach (the regulation shots to the green), around
+the green and putting, which add up to the hole total. Holes with a missing
+outcome still count in the total; segments that need it are NaN.
+
+Everything runs as column operations over the whole hole frame.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Expected strokes to hole out from the tee by hole yardage.
+TEE_YARDS = [100, 150, 200, 250, 300, 350, 400, 450, 500, 550, 600]
+TEE_EXPECTED = [2.92, 2.99, 3.19, 3.45, 3.71, 3.86, 3.99, 4.17, 4.53, 4.75, 4.95]
+# Expected strokes from the fairway by distance to the hole.
+FAIRWAY_YARDS = [20, 50, 100, 150, 200, 250, 300, 350]
+FAIRWAY_EXPECTED = [2.40, 2.60, 2.80, 2.98, 3.19, 3.45, 3.71, 3.90]
+# Yardage assumed when tee_holes has none for the tee.
+DEFAULT_YARDAGE = {3: 165, 4: 400, 5: 520}
+DRIVE_YARDS = 240
+
+# Extra expected strokes for the lie a par 4/5 tee shot found.
+TEE_LIE_PENALTY = {
+    "Fairway": 0.0,
+    "Left": 0.2,
+    "Right": 0.2,
+    "Short": 0.1,
+    "Long": 0.15,
+    "Bunker Left": 0.35,
+    "Bunker Right": 0.35,
+    "Bunker Short": 0.35,
+    "Bunker Long": 0.35,
+}
+OUT_OF_BOUNDS = {"Out Left", "Out Right", "Out Short", "Out Long"}
+
+# Expected strokes left once the shot into the green has finished.
+PUTTS_FROM_GREEN = 1.9
+AROUND_GREEN_EXPECTED = {
+    "Green": PUTTS_FROM_GREEN,
+    "Left": 2.6,
+    "Right": 2.6,
+    "Short": 2.55,
+    "Long": 2.7,
+    "Bunker Left": 3.0,
+    "Bunker Right": 3.0,
+    "Bunker Short": 3.0,
+    "Bunker Long": 3.0,
+    # Stroke penalty, then a shot from near the green.
+    "Out Left": 3.6,
+    "Out Right": 3.6,
+    "Out Short": 3.6,
+    "Out Long": 3.6,
+}
+# Expected putts once on the green after a missed green (chip or bunker shot).
+PUTTS_AFTER_CHIP = 1.6
+PUTTS_AFTER_BUNKER = 1.7
+
+SEGMENTS = ["sg_off_tee", "sg_approach", "sg_around_green", "sg_putting"]
+
+
+def expected_from_tee(yardage: pd.Series) -> np.ndarray:
+    return np.interp(yardage.to_numpy(dtype=float), TEE_YARDS, TEE_EXPECTED)
+
+
+def strokes_gained(holes: pd.DataFrame) -> pd.DataFrame:
+    """Add expected_strokes, sg_total and the four segment columns.
+
+    Needs par, yardage, strokes, putts, tee_shot and approach columns. Also
+    adds into_green, the outcome of the shot into the green (the tee shot on
+    par 3s). sg_off_tee is NaN on par 3s.
+    """
+    par = holes["par"].to_numpy(dtype=float)
+    strokes = holes["strokes"].to_numpy(dtype=float)
+    putts = holes["putts"].to_numpy(dtype=float)
+    yardage = holes["yardage"].fillna(holes["par"].map(DEFAULT_YARDAGE))
+    e_tee = expected_from_tee(yardage)
+    par3 = par == 3
+
+    # Par 4/5: where the tee shot left the ball.
+    remaining = np.maximum(
+        yardage.to_numpy(dtype=float) - DRIVE_YARDS, FAIRWAY_YARDS[0]
+    )
+    e_fairway = np.interp(remaining, FAIRWAY_YARDS, FAIRWAY_EXPECTED)
+    # object dtype keeps .str usable when a column is entirely empty.
+    tee_shot = holes["tee_shot"].astype(object)
+    e_after_tee = np.where(
+        tee_shot.isin(OUT_OF_BOUNDS).to_numpy(),
+        1 + e_tee,
+        e_fairway + tee_shot.map(TEE_LIE_PENALTY).to_numpy(dtype=float),
+    )
+    drove_green = (tee_shot == "Green").to_numpy()
+    e_after_tee = np.where(drove_green, PUTTS_FROM_GREEN, e_after_tee)
+
+    # The shot into the green: the tee shot on par 3s, the approach otherwise.
+    into_green = holes["approach"].astype(object).where(~par3, tee_shot)
+    e_after_green_shot = into_green.map(AROUND_GREEN_EXPECTED).to_numpy(dtype=float)
+    putts_baseline = np.select(
+        [
+            (into_green == "Green").to_numpy(),
+            into_green.str.startswith("Bunker", na=False).to_numpy(),
+        ],
+        [PUTTS_FROM_GREEN, PUTTS_AFTER_BUNKER],
+        PUTTS_AFTER_CHIP,
+    )
+
+    # Strokes taken after the regulation shots (par - 2 of them).
+    after_regulation = strokes - (par - 2)
+    sg_off_tee = np.where(par3, np.nan, e_tee - 1 - e_after_tee)
+    sg_approach = np.where(
+        par3,
+        e_tee - 1 - e_after_green_shot,
+        e_after_tee - e_after_green_shot - (par - 3),
+    )
+    sg_around_green = e_after_green_shot - putts_baseline - (after_regulation - putts)
+    sg_putting = np.where(np.isnan(e_after_green_shot), np.nan, putts_baseline - putts)
+
+    return holes.assign(
+        into_green=into_green,
+        expected_strokes=e_tee,
+        sg_total=e_tee - strokes,
+        sg_off_tee=sg_off_tee,
+        sg_approach=sg_approach,
+        sg_around_green=sg_around_green,
+        sg_putting=sg_putting,
+    )
+
+
+def per_round(sg: pd.DataFrame) -> pd.DataFrame:
+    """Strokes gained per round, by segment."""
+    return sg.groupby("round_id")[["sg_total", *SEGMENTS]].sum(min_count=1)
+
+
+def by_category(sg: pd.DataFrame, column: str, segment: str) -> pd.DataFrame:
+    """Holes and average strokes gained in `segment` for each `column` value."""
+    return (
+        sg.dropna(subset=[column, segment])
+        .groupby(column)[segment]
+        .agg(holes="count", avg_strokes_gained="mean")
+        .reset_index()
+        .sort_values("avg_strokes_gained")
+    )
@@ -0,0 +1,73 @@
+"""Read the round and course template sheets without pd.read_excel.
+
+pd.read_excel loads each workbook through openpyxl's full object model,
+styles, merged cells and the 500-row data validations
+`create_excel_template.add_validation` puts on every list column included,
+and then parses the cells a second time into a DataFrame. Our templates are
+a header row plus a few populated rows, so this reader opens the workbook
+read-only, streams each requested sheet with `iter_rows(values_only=True)`
+and appends the values straight into one list per named column.
+
+A sheet ends at its first blank row (every named column empty); anything
+below it is ignored. Columns with an empty header are skipped. Values keep
+openpyxl's types (int, float, str, datetime), and each column is typed once
+when the frame is built from the lists, so blanks in a numeric column
+become NaN as with pd.read_excel. Unlike pd.read_excel, text is kept as
+typed: "18" stays the holes_played string the database expects instead of
+becoming an int, and "N/A" (a valid approach value) is not read as blank.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+from zipfile import BadZipFile
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+
+def read_sheet(ws) -> pd.DataFrame:
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, ())
+    positions = [
+        (i, str(name).strip())
+        for i, name in enumerate(header)
+        if name is not None and str(name).strip()
+    ]
+    columns: dict[str, list] = {name: [] for _, name in positions}
+    for row in rows:
+        # Read-only rows stop at their last stored cell, so pad short ones.
+        values = [row[i] if i < len(row) else None for i, _ in positions]
+        if all(value is None for value in values):
+            break
+        for (_, name), value in zip(positions, values):
+            columns[name].append(value)
+    return pd.DataFrame(columns)
+
+
+def read_sheets(path: Path, sheets: Sequence[str]) -> dict[str, pd.DataFrame]:
+    """The named sheets of a workbook as DataFrames.
+
+    Raises ValueError if a sheet is missing or the file is not a readable
+    xlsx (e.g. truncated by an interrupted copy).
+    """
+    try:
+        wb = load_workbook(path, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException) as exc:
+        raise ValueError(f"{path.name} is not a readable workbook: {exc}") from exc
+    try:
+        missing = set(sheets) - set(wb.sheetnames)
+        if missing:
+            raise ValueError(f"{path.name} missing sheets: {sorted(missing)}")
+        frames = {}
+        for sheet in sheets:
+            ws = wb[sheet]
+            # The stored dimensions cover formatted-but-empty cells; read what
+            # is actually there instead.
+            ws.reset_dimensions()
+            frames[sheet] = read_sheet(ws)
+        return frames
+    finally:
+        wb.close()
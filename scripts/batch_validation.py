@@ -0,0 +1,502 @@
+"""Validate many rounds and their hole_stats in one vectorized pass.
+
+The checks mirror the database CHECK constraints and the template rules.
+Instead of raising on the first problem they return an error report with one
+row per problem, so callers can drop or quarantine the offending rounds and
+load the rest.
+
+Rounds are identified by `keys` (default: round_external_id). Callers that
+concatenate several workbooks add a `source` column and pass
+`keys=("source", "round_external_id")`, so the same round appearing in two
+files is reported per file rather than as a duplicate.
+
+`validate_course_batch` does the same for course workbooks (course, tees,
+holes and tee_holes sheets), keyed by `source` alone.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+import pandas as pd
+
+from golf_stats.reference import DEFAULT_PLAYER, ReferenceCache
+
+ALLOWED_HOLES_PLAYED = {"Front 9", "Back 9", "18"}
+ALLOWED_ROUND_TYPE = {"Practice", "Tournament", "Casual"}
+ALLOWED_ROUND_FORMAT = {"Stroke", "Match", "Scramble", "Other"}
+ALLOWED_TEE_SHOT = {
+    "Fairway",
+    "Left",
+    "Right",
+    "Short",
+    "Long",
+    "Out Left",
+    "Out Right",
+    "Out Short",
+    "Out Long",
+    "Bunker Left",
+    "Bunker Right",
+    "Bunker Short",
+    "Bunker Long",
+    "Green",
+}
+ALLOWED_APPROACH = {
+    "Green",
+    "Left",
+    "Right",
+    "Short",
+    "Long",
+    "Out Left",
+    "Out Right",
+    "Out Short",
+    "Out Long",
+    "Bunker Left",
+    "Bunker Right",
+    "Bunker Short",
+    "Bunker Long",
+    "N/A",
+}
+
+REQUIRED_ROUNDS_COLS = {
+    "round_external_id",
+    "date_played",
+    "course_name",
+    "tee_name",
+    "holes_played",
+    "round_type",
+    "round_format",
+}
+
+REQUIRED_HOLE_COLS = {
+    "round_external_id",
+    "hole_number",
+    "strokes",
+    "putts",
+}
+
+# Required rounds columns restricted to a fixed set of values.
+ROUND_VALUES = {
+    "holes_played": ALLOWED_HOLES_PLAYED,
+    "round_type": ALLOWED_ROUND_TYPE,
+    "round_format": ALLOWED_ROUND_FORMAT,
+}
+# Optional hole_stats columns restricted to a fixed set of values.
+HOLE_VALUES = {
+    "tee_shot": ALLOWED_TEE_SHOT,
+    "approach": ALLOWED_APPROACH,
+}
+# Inclusive bounds from the hole_stats CHECK constraints.
+HOLE_RANGES = {
+    "hole_number": (1, 18),
+    "strokes": (1, 15),
+    "putts": (0, 6),
+    "bunker_found": (0, 3),
+    "out_of_bounds_count": (0, 5),
+}
+COURSE_HOLES = range(1, 19)
+PAR_RANGE = (3, 5)
+YARDAGE_RANGE = (50, 800)
+FIRST_HOLE = {"18": 1, "Front 9": 1, "Back 9": 10}
+LAST_HOLE = {"18": 18, "Front 9": 9, "Back 9": 18}
+
+REPORT_COLUMNS = ["sheet", "row", "error"]
+
+
+def external_ids(df: pd.DataFrame) -> pd.Series:
+    return df["round_external_id"].fillna("").astype(str).str.strip()
+
+
+def clean_names(values: pd.Series) -> pd.Series:
+    return values.fillna("").astype(str).str.strip()
+
+
+def player_names(df: pd.DataFrame, default: str = DEFAULT_PLAYER) -> pd.Series:
+    """The optional player_name column, with `default` where it is blank."""
+    if "player_name" not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    names = df["player_name"].fillna("").astype(str).str.strip()
+    return names.where(names != "", default)
+
+
+def not_allowed(values: pd.Series, allowed: set[str]) -> pd.Series:
+    """True where a value is missing or outside `allowed` (categorical codes)."""
+    codes = pd.Categorical(values, categories=sorted(allowed)).codes
+    return pd.Series(codes == -1, index=values.index)
+
+
+class Report:
+    """Collects flagged rows as (sheet, row, error, *keys) frames."""
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        self.keys = list(keys)
+        self.problems: list[pd.DataFrame] = []
+
+    def flag(self, sheet: str, df: pd.DataFrame, mask: pd.Series, error: str) -> None:
+        flagged = df.loc[mask.to_numpy(), self.keys]
+        if len(flagged):
+            self.problems.append(
+                flagged.assign(sheet=sheet, row=flagged.index, error=error)
+            )
+
+    def missing_columns(self, sheet: str, df: pd.DataFrame, required: set[str]) -> bool:
+        missing = sorted((required | set(self.keys)) - set(df.columns))
+        if missing:
+            error = f"{sheet} sheet missing columns: {missing}"
+            self.problems.append(pd.DataFrame([{"sheet": sheet, "error": error}]))
+        return bool(missing)
+
+    def extend(self, other: pd.DataFrame) -> None:
+        if len(other):
+            self.problems.append(other)
+
+    def frame(self) -> pd.DataFrame:
+        columns = [*REPORT_COLUMNS, *self.keys]
+        if not self.problems:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(self.problems, ignore_index=True).reindex(columns=columns)
+
+
+def validate_rounds_frame(
+    rounds_df: pd.DataFrame, keys: Sequence[str] = ("round_external_id",)
+) -> pd.DataFrame:
+    """Report problems in a rounds frame that can be seen without its holes."""
+    report = Report(keys)
+    if report.missing_columns("rounds", rounds_df, REQUIRED_ROUNDS_COLS):
+        return report.frame()
+
+    rounds = rounds_df.assign(round_external_id=external_ids(rounds_df))
+    empty_id = rounds["round_external_id"] == ""
+    report.flag("rounds", rounds, empty_id, "round_external_id is required")
+    duplicated = rounds.duplicated(report.keys)
+    report.flag("rounds", rounds, duplicated, "duplicate round_external_id")
+    for column, allowed in ROUND_VALUES.items():
+        invalid = not_allowed(rounds[column], allowed)
+        report.flag("rounds", rounds, invalid, f"invalid {column} value")
+    dates = pd.to_datetime(rounds["date_played"], errors="coerce", format="mixed")
+    report.flag("rounds", rounds, dates.isna(), "date_played must be a date")
+    return report.frame()
+
+
+def validate_holes_frame(
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    keys: Sequence[str] = ("round_external_id",),
+) -> pd.DataFrame:
+    """Report problems in hole_stats rows and in each round's set of holes.
+
+    Per-round problems (wrong hole set for holes_played, no holes at all) are
+    reported against the round's row in rounds_df.
+    """
+    report = Report(keys)
+    keys = report.keys
+    missing = report.missing_columns("hole_stats", holes_df, REQUIRED_HOLE_COLS)
+    missing |= report.missing_columns("rounds", rounds_df, {"holes_played"})
+    if missing:
+        return report.frame()
+
+    rounds = rounds_df.assign(round_external_id=external_ids(rounds_df))
+    holes = holes_df.assign(round_external_id=external_ids(holes_df))
+
+    empty_id = holes["round_external_id"] == ""
+    report.flag("hole_stats", holes, empty_id, "round_external_id cannot be empty")
+    known = holes[keys].merge(
+        rounds[keys].drop_duplicates(), how="left", on=keys, indicator=True
+    )
+    unknown = known["_merge"] == "left_only"
+    report.flag("hole_stats", holes, unknown, "round_external_id not in rounds sheet")
+
+    for column, (low, high) in HOLE_RANGES.items():
+        if column not in holes.columns:
+            continue
+        values = pd.to_numeric(holes[column], errors="coerce")
+        if column in REQUIRED_HOLE_COLS:
+            report.flag(
+                "hole_stats", holes, values.isna(), f"{column} must be a number"
+            )
+        out_of_range = (values < low) | (values > high)
+        report.flag(
+            "hole_stats",
+            holes,
+            out_of_range,
+            f"{column} must be between {low} and {high}",
+        )
+        # Loaders cast with int(), which would silently truncate 4.5 to 4.
+        fractional = values.notna() & (values != values.round())
+        report.flag(
+            "hole_stats", holes, fractional, f"{column} must be a whole number"
+        )
+        holes[column] = values
+
+    for column, allowed in HOLE_VALUES.items():
+        if column in holes.columns:
+            invalid = holes[column].notna() & not_allowed(holes[column], allowed)
+            report.flag("hole_stats", holes, invalid, f"invalid {column} value")
+
+    duplicated = holes.duplicated([*keys, "hole_number"])
+    report.flag(
+        "hole_stats", holes, duplicated, "hole_number must be unique within a round"
+    )
+
+    # Unique hole numbers spanning first..last with last-first+1 of them are
+    # exactly the set holes_played asks for.
+    per_round = (
+        holes.groupby(keys)["hole_number"].agg(["nunique", "min", "max"]).reset_index()
+    )
+    matched = rounds[[*keys, "holes_played"]].merge(per_round, how="left", on=keys)
+    matched.index = rounds.index
+    first = matched["holes_played"].map(FIRST_HOLE)
+    last = matched["holes_played"].map(LAST_HOLE)
+    no_holes = matched["nunique"].isna()
+    report.flag("rounds", rounds, no_holes, "no hole_stats rows for round")
+    wrong_set = ~no_holes & (
+        (matched["min"] != first)
+        | (matched["max"] != last)
+        | (matched["nunique"] != last - first + 1)
+    )
+    report.flag(
+        "rounds", rounds, wrong_set, "hole_number values do not match holes_played"
+    )
+    return report.frame()
+
+
+def validate_batch(
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    keys: Sequence[str] = ("round_external_id",),
+) -> pd.DataFrame:
+    """Validate a multi-round batch; returns an empty report when it is clean."""
+    report = Report(keys)
+    report.extend(validate_rounds_frame(rounds_df, keys))
+    report.extend(validate_holes_frame(rounds_df, holes_df, keys))
+    return report.frame()
+
+
+def validate_references(
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    reference: ReferenceCache,
+    keys: Sequence[str] = ("round_external_id",),
+) -> pd.DataFrame:
+    """Check players, courses, tees and hole numbers against the reference cache.
+
+    Run after validate_batch; expects the required columns to be present.
+    Rounds without a player_name are checked against the default player.
+    """
+    report = Report(keys)
+    keys = report.keys
+    rounds = rounds_df.assign(round_external_id=external_ids(rounds_df))
+    holes = holes_df.assign(round_external_id=external_ids(holes_df))
+
+    players = player_names(rounds)
+    for player_name in players.unique():
+        try:
+            reference.resolve_player(player_name)
+        except ValueError as exc:
+            report.flag("rounds", rounds, players == player_name, str(exc))
+
+    pairs = pd.Series(
+        list(zip(rounds["course_name"].fillna(""), rounds["tee_name"].fillna(""))),
+        index=rounds.index,
+    )
+    course_ids: dict[tuple, int] = {}
+    errors: dict[tuple, str] = {}
+    for pair in pairs.unique():
+        try:
+            course_ids[pair] = reference.resolve(*pair)[0]
+        except ValueError as exc:
+            errors[pair] = str(exc)
+    for pair, error in errors.items():
+        report.flag("rounds", rounds, pairs.map(lambda p: p == pair), error)
+    rounds["course_id"] = pairs.map(lambda pair: course_ids.get(pair))
+
+    holes = holes.merge(
+        rounds[[*keys, "course_id"]].drop_duplicates(keys), how="left", on=keys
+    ).set_index(holes.index)
+    holes["hole_number"] = pd.to_numeric(holes["hole_number"], errors="coerce")
+    # missing_holes reloads the cache once if holes were added since it loaded.
+    undefined = pd.DataFrame(
+        [
+            (course_id, hole_number)
+            for course_id, numbers in holes.groupby("course_id")["hole_number"]
+            for hole_number in reference.missing_holes(
+                int(course_id), numbers.dropna()
+            )
+        ],
+        columns=["course_id", "hole_number"],
+    ).assign(undefined=True)
+    checked = holes[["course_id", "hole_number"]].merge(
+        undefined, how="left", on=["course_id", "hole_number"]
+    )
+    report.flag(
+        "hole_stats",
+        holes,
+        checked["undefined"].notna(),
+        "hole_number not defined for course",
+    )
+    return report.frame()
+
+
+def numeric_column(
+    report: Report,
+    sheet: str,
+    df: pd.DataFrame,
+    column: str,
+    bounds: tuple[int, int] | None = None,
+    required: bool = True,
+) -> pd.Series:
+    """Flag non-numeric (and out-of-range) values; returns the numeric column."""
+    if column not in df.columns:
+        return pd.Series(float("nan"), index=df.index)
+    values = pd.to_numeric(df[column], errors="coerce")
+    not_numeric = values.isna() if required else df[column].notna() & values.isna()
+    report.flag(sheet, df, not_numeric, f"{column} must be a number")
+    if bounds is not None:
+        low, high = bounds
+        out_of_range = (values < low) | (values > high)
+        report.flag(
+            sheet, df, out_of_range, f"{column} must be between {low} and {high}"
+        )
+    return values
+
+
+def validate_course_batch(
+    course_df: pd.DataFrame,
+    tees_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    tee_holes_df: pd.DataFrame,
+    keys: Sequence[str] = ("source",),
+) -> pd.DataFrame:
+    """Validate a batch of course workbooks, each identified by `keys`.
+
+    Each workbook needs one course row whose name is not repeated in the
+    batch, uniquely named tees, holes 1-18 with a par of 3-5 and (where
+    given) distinct handicap indexes 1-18, and a yardage of 50-800 for every
+    tee on every hole. Problems with a whole sheet are reported against the
+    workbook with no row number.
+    """
+    report = Report(keys)
+    keys = report.keys
+    missing = report.missing_columns("course", course_df, {"course_name"})
+    missing |= report.missing_columns("tees", tees_df, {"tee_name"})
+    missing |= report.missing_columns("holes", holes_df, {"hole_number", "par"})
+    missing |= report.missing_columns(
+        "tee_holes", tee_holes_df, {"tee_name", "hole_number", "yardage"}
+    )
+    if missing:
+        return report.frame()
+
+    def flag_files(sheet: str, files: pd.DataFrame, error: str) -> None:
+        report.extend(files[keys].drop_duplicates().assign(sheet=sheet, error=error))
+
+    workbooks = pd.concat(
+        [df[keys] for df in (course_df, tees_df, holes_df, tee_holes_df)]
+    ).drop_duplicates()
+
+    courses = course_df.assign(course_name=clean_names(course_df["course_name"]))
+    counts = workbooks.merge(
+        courses.groupby(keys).size().rename("rows").reset_index(), how="left", on=keys
+    )
+    flag_files(
+        "course",
+        counts[counts["rows"].fillna(0) != 1],
+        "course sheet must have exactly one row",
+    )
+    empty_name = courses["course_name"] == ""
+    report.flag("course", courses, empty_name, "course_name is required")
+    repeated = courses.duplicated("course_name") & ~courses.duplicated(keys)
+    report.flag("course", courses, repeated, "course_name repeated in this batch")
+
+    tees = tees_df.assign(tee_name=clean_names(tees_df["tee_name"]))
+    report.flag("tees", tees, tees["tee_name"] == "", "tee_name cannot be empty")
+    report.flag(
+        "tees", tees, tees.duplicated([*keys, "tee_name"]), "duplicate tee_name"
+    )
+    for column in ("course_rating", "slope_rating", "yardage_total"):
+        numeric_column(report, "tees", tees, column, required=False)
+
+    holes = holes_df.copy()
+    holes["hole_number"] = numeric_column(
+        report, "holes", holes, "hole_number", (1, 18)
+    ).to_numpy()
+    numeric_column(report, "holes", holes, "par", PAR_RANGE)
+    report.flag(
+        "holes",
+        holes,
+        holes.duplicated([*keys, "hole_number"]),
+        "duplicate hole_number",
+    )
+    per_course = holes.groupby(keys)["hole_number"].agg(["nunique", "min", "max"])
+    per_course = workbooks.merge(per_course.reset_index(), how="left", on=keys)
+    incomplete = (
+        (per_course["nunique"] != len(COURSE_HOLES))
+        | (per_course["min"] != COURSE_HOLES[0])
+        | (per_course["max"] != COURSE_HOLES[-1])
+    )
+    flag_files("holes", per_course[incomplete], "holes sheet must define holes 1-18")
+    if "hole_handicap_index" in holes.columns:
+        index = numeric_column(
+            report, "holes", holes, "hole_handicap_index", (1, 18), required=False
+        )
+        repeated = index.notna() & holes.assign(
+            hole_handicap_index=index.to_numpy()
+        ).duplicated([*keys, "hole_handicap_index"])
+        report.flag(
+            "holes",
+            holes,
+            repeated,
+            "hole_handicap_index must be unique within a course",
+        )
+
+    tee_holes = tee_holes_df.assign(tee_name=clean_names(tee_holes_df["tee_name"]))
+    tee_holes["hole_number"] = numeric_column(
+        report, "tee_holes", tee_holes, "hole_number", (1, 18)
+    ).to_numpy()
+    numeric_column(report, "tee_holes", tee_holes, "yardage", YARDAGE_RANGE)
+    known = tee_holes[[*keys, "tee_name"]].merge(
+        tees[[*keys, "tee_name"]].drop_duplicates(),
+        how="left",
+        on=[*keys, "tee_name"],
+        indicator=True,
+    )
+    report.flag(
+        "tee_holes",
+        tee_holes,
+        known["_merge"] == "left_only",
+        "tee_name not in tees sheet",
+    )
+    report.flag(
+        "tee_holes",
+        tee_holes,
+        tee_holes.duplicated([*keys, "tee_name", "hole_number"]),
+        "duplicate yardage for tee and hole",
+    )
+    yardages = (
+        tee_holes[tee_holes["hole_number"].isin(COURSE_HOLES)]
+        .groupby([*keys, "tee_name"])["hole_number"]
+        .nunique()
+        .rename("yardages")
+        .reset_index()
+    )
+    covered = tees[[*keys, "tee_name"]].merge(
+        yardages, how="left", on=[*keys, "tee_name"]
+    )
+    report.flag(
+        "tees",
+        tees,
+        covered["yardages"].fillna(0) != len(COURSE_HOLES),
+        "tee needs a yardage for each of holes 1-18",
+    )
+    return report.frame()
+
+
+def rejected(report_df: pd.DataFrame, keys: Sequence[str]) -> pd.DataFrame:
+    """Distinct key values with at least one problem."""
+    return report_df[list(keys)].dropna(how="all").drop_duplicates()
+
+
+def write_report(report_df: pd.DataFrame, path: Path) -> None:
+    """Append a report to a CSV file, writing the header for a new file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report_df.to_csv(path, mode="a", header=not path.exists(), index=False)
@@ -0,0 +1,167 @@
+"""Compare per-row vs bulk COPY loading of hole_stats on a synthetic corpus.
+
+The per-row path is timed once per --commit-every value (files per
+transaction, each written in its own savepoint as `ingest_excel.py
+--commit-every` does), so the cost of a commit per round shows up next to
+group commits.
+
+Writes to the database configured in .env, so point it at a scratch database.
+Benchmark rounds use the round_external_id prefix "bench-" and are deleted
+(together with the benchmark course) when the run finishes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# ingest_excel puts the repo root on sys.path for golf_stats.
+from ingest_excel import batched, bulk_load, write_round
+from ingest_manifest import PlannedFile
+from golf_stats.db import get_conn
+from golf_stats.reference import ReferenceCache
+
+BENCH_COURSE = "Benchmark Golf Club"
+BENCH_TEE = "Blue"
+TEE_SHOTS = ["Fairway", "Left", "Right", "Bunker Left", "Out Right"]
+APPROACHES = ["Green", "Short", "Long", "Bunker Short", "N/A"]
+
+
+def synthetic_round(
+    round_external_id: str, played: date, rng: random.Random
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rounds_df = pd.DataFrame(
+        [
+            {
+                "round_external_id": round_external_id,
+                "date_played": played,
+                "course_name": BENCH_COURSE,
+                "tee_name": BENCH_TEE,
+                "holes_played": "18",
+                "conditions": None,
+                "round_type": "Practice",
+                "round_format": "Stroke",
+                "notes": None,
+            }
+        ]
+    )
+    holes_df = pd.DataFrame(
+        {
+            "round_external_id": [round_external_id] * 18,
+            "hole_number": list(range(1, 19)),
+            "strokes": [rng.randint(3, 8) for _ in range(18)],
+            "putts": [rng.randint(0, 3) for _ in range(18)],
+            "tee_shot": [rng.choice(TEE_SHOTS) for _ in range(18)],
+            "approach": [rng.choice(APPROACHES) for _ in range(18)],
+            "tee_club": ["Driver"] * 18,
+            "approach_club": ["7i"] * 18,
+            "bunker_found": [0] * 18,
+            "out_of_bounds_count": [0] * 18,
+        }
+    )
+    return rounds_df, holes_df
+
+
+def synthetic_corpus(
+    prefix: str, n_rounds: int, seed: int
+) -> list[tuple[pd.DataFrame, pd.DataFrame]]:
+    rng = random.Random(seed)
+    start = date(2000, 1, 1)
+    return [
+        synthetic_round(f"bench-{prefix}-{i:06d}", start + timedelta(days=i % 9000), rng)
+        for i in range(n_rounds)
+    ]
+
+
+def new_file(rounds_df: pd.DataFrame) -> PlannedFile:
+    """A stand-in manifest plan for a synthetic round's workbook."""
+    name = f"{rounds_df.iloc[0]['round_external_id']}.xlsx"
+    return PlannedFile(Path(name), "new", 0, 0.0, "", None)
+
+
+def ensure_bench_course(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO courses (course_name, notes)
+            VALUES (%s, 'Synthetic course for ingestion benchmarks')
+            ON CONFLICT (course_name) DO NOTHING
+            """,
+            (BENCH_COURSE,),
+        )
+        cur.execute(
+            """
+            INSERT INTO tees (course_id, tee_name)
+            SELECT course_id, %s FROM courses WHERE course_name = %s
+            ON CONFLICT (course_id, tee_name) DO NOTHING
+            """,
+            (BENCH_TEE, BENCH_COURSE),
+        )
+    conn.commit()
+
+
+def cleanup(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM rounds WHERE round_external_id LIKE 'bench-%'")
+        cur.execute("DELETE FROM courses WHERE course_name = %s", (BENCH_COURSE,))
+    conn.commit()
+
+
+def report(label: str, rounds: int, seconds: float) -> None:
+    holes = rounds * 18
+    print(
+        f"{label:<10} {rounds:>8} rounds {holes:>9} holes "
+        f"{seconds:>9.2f}s {holes / seconds:>12,.0f} rows/sec"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        nargs="+",
+        default=[1, 50, 500],
+        help="Per-row runs to time, by files per transaction (default: 1 50 500).",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    load_dotenv()
+
+    with get_conn() as conn:
+        cleanup(conn)
+        ensure_bench_course(conn)
+        reference = ReferenceCache(conn)
+        try:
+            for commit_every in args.commit_every:
+                corpus = synthetic_corpus(f"row{commit_every}", args.rounds, args.seed)
+                started = time.perf_counter()
+                for batch in batched(corpus, commit_every):
+                    for rounds_df, holes_df in batch:
+                        write_round(
+                            conn, new_file(rounds_df), rounds_df, holes_df, reference
+                        )
+                    conn.commit()
+                seconds = time.perf_counter() - started
+                report(f"commit {commit_every}", args.rounds, seconds)
+
+            corpus = synthetic_corpus("bulk", args.rounds, args.seed)
+            started = time.perf_counter()
+            for batch in batched(corpus, args.batch_size):
+                bulk_load(conn, batch, reference)
+                conn.commit()
+            report("bulk", args.rounds, time.perf_counter() - started)
+        finally:
+            cleanup(conn)
+
+
+if __name__ == "__main__":
+    main()
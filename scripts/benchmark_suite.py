@@ -0,0 +1,317 @@
+"""Time the whole pipeline on synthetic data at several scales.
+
+For each scale (default 1k, 10k and 100k rounds) this generates courses and
+rounds with `synthetic_data`, then times:
+- course import: `import_course_excel.py` on generated course workbooks
+- round load: `ingest_excel.py` on one workbook per round (up to
+  --excel-max rounds), `ingest_feed.py` on a CSV feed above that, or a direct
+  set-based load with --load direct
+- `dbt run`
+- the dashboard queries `load_round_kpis` and `load_hole_summary`, for one
+  player when --players spreads the rounds over several
+
+The scripts run as subprocesses in a scratch working directory, so their own
+run reports (data/reports/*.json) are picked up into the results. Results go
+to data/benchmarks/benchmark-<time>.json; pass --compare with an earlier
+file to see the change per stage.
+
+Writes to the database configured in .env, so point it at a scratch
+database. Synthetic rounds and courses are deleted before each scale and at
+the end unless --keep is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from functools import partial
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# ingest_excel (imported by synthetic_data) puts the repo root on sys.path.
+from synthetic_data import (
+    delete_synthetic,
+    load_courses,
+    load_players,
+    load_rounds,
+    synthetic_courses,
+    synthetic_players,
+    synthetic_rounds,
+    write_course_workbooks,
+    write_feed,
+    write_round_workbooks,
+)
+from golf_stats.db import get_conn  # noqa: E402
+from golf_stats.reference import DEFAULT_PLAYER, ReferenceCache  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+RESULTS_DIR = Path("data/benchmarks")
+PREFIX = "bench"
+# A stage slower than baseline by more than this factor is flagged.
+REGRESSION_RATIO = 1.2
+
+
+class Results:
+    def __init__(self) -> None:
+        self.rows: list[dict] = []
+
+    def add(
+        self, scale: int, stage: str, seconds: float, rows: int = 0, **detail
+    ) -> None:
+        self.rows.append(
+            {
+                "scale": scale,
+                "stage": stage,
+                "seconds": round(seconds, 3),
+                "rows": rows,
+                "rows_per_second": round(rows / seconds) if rows and seconds else None,
+                "detail": detail,
+            }
+        )
+        rate = f"{rows / seconds:>12,.0f} rows/s" if rows and seconds else ""
+        print(f"{scale:>8} {stage:<20} {seconds:>9.2f}s {rate}")
+
+
+def run_script(workdir: Path, script: str, *args: str) -> dict:
+    """Run a pipeline script in workdir; returns its newest run report, if any."""
+    log = workdir / "logs" / f"{script}.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    with log.open("a") as handle:
+        completed = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / f"{script}.py"), *args],
+            cwd=workdir,
+            stdout=handle,
+            stderr=subprocess.STDOUT,
+        )
+    if completed.returncode:
+        raise RuntimeError(f"{script} failed (exit {completed.returncode}), see {log}")
+    reports = sorted((workdir / "data" / "reports").glob(f"{script}-*.json"))
+    return json.loads(reports[-1].read_text()) if reports else {}
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def time_dashboard(
+    results: Results, scale: int, repeat: int, player_name: str
+) -> None:
+    """Median uncached time of each dashboard query over the whole date range."""
+    sys.path.insert(0, str(REPO_ROOT / "streamlit_app"))
+    import dashboard_data
+
+    with get_conn() as conn:
+        player_id = ReferenceCache(conn).resolve_player(player_name)
+    start, end = date(2000, 1, 1), date.today()
+    for name in ("load_round_kpis", "load_hole_summary"):
+        query = getattr(dashboard_data, name)
+        timings = []
+        for attempt in range(repeat):
+            # A new version token per call misses st.cache_data every time.
+            df, seconds = timed(
+                query, ("benchmark", scale, attempt), player_id, start, end
+            )
+            timings.append(seconds)
+        results.add(scale, name, statistics.median(timings), len(df), repeat=repeat)
+
+
+def run_scale(args: argparse.Namespace, scale: int, results: Results) -> None:
+    started = time.perf_counter()
+    courses = synthetic_courses(args.courses, args.seed)
+    players = synthetic_players(args.players)
+    rounds_df, holes_df = synthetic_rounds(courses, scale, args.seed, PREFIX, players)
+    results.add(scale, "generate", time.perf_counter() - started, len(holes_df))
+
+    load = args.load
+    if load == "auto":
+        load = "excel" if scale <= args.excel_max else "feed"
+
+    with tempfile.TemporaryDirectory(prefix="golf-bench-") as tmp:
+        workdir = Path(tmp)
+        raw = workdir / "data" / "raw"
+        with get_conn() as conn:
+            delete_synthetic(conn, PREFIX)
+            load_players(conn, players)
+
+            if load == "direct":
+                saved, seconds = timed(load_courses, conn, courses)
+                results.add(scale, "course_import", seconds, saved, path="direct")
+                _, seconds = timed(load_rounds, conn, rounds_df, holes_df)
+                results.add(scale, "round_load", seconds, len(holes_df), path="direct")
+            else:
+                write_course_workbooks(courses, raw)
+                report, seconds = timed(run_script, workdir, "import_course_excel")
+                results.add(
+                    scale,
+                    "course_import",
+                    seconds,
+                    report.get("counters", {}).get("rows_written", 0),
+                    path="excel",
+                    stages=report.get("stages"),
+                )
+
+                if load == "excel":
+                    _, seconds = timed(write_round_workbooks, rounds_df, holes_df, raw)
+                    results.add(scale, "write_xlsx", seconds, len(rounds_df))
+                    ingest_args = ["--no-refresh", *(["--bulk"] if args.bulk else [])]
+                    report, seconds = timed(
+                        run_script, workdir, "ingest_excel", *ingest_args
+                    )
+                    results.add(
+                        scale,
+                        "round_load",
+                        seconds,
+                        report.get("counters", {}).get("rows_written", 0),
+                        path="excel --bulk" if args.bulk else "excel",
+                        stages=report.get("stages"),
+                    )
+                else:
+                    rounds_path, _ = write_feed(rounds_df, holes_df, raw, PREFIX)
+                    _, seconds = timed(
+                        run_script,
+                        workdir,
+                        "ingest_feed",
+                        str(rounds_path),
+                        "--no-refresh",
+                    )
+                    results.add(
+                        scale, "round_load", seconds, len(holes_df), path="feed"
+                    )
+
+        if args.no_dbt or shutil.which("dbt") is None:
+            print(f"{scale:>8} {'dbt_run':<20} skipped")
+        else:
+            dbt = ["dbt", "run", "--project-dir", str(REPO_ROOT / "dbt")]
+            _, seconds = timed(partial(subprocess.run, dbt, check=True))
+            results.add(scale, "dbt_run", seconds, len(holes_df))
+
+    time_dashboard(
+        results, scale, args.repeat, players[0] if players else DEFAULT_PLAYER
+    )
+
+
+def compare(results: list[dict], baseline_path: Path) -> None:
+    baseline = {
+        (row["scale"], row["stage"]): row["seconds"]
+        for row in json.loads(baseline_path.read_text())["results"]
+    }
+    print(f"\nCompared with {baseline_path}:")
+    for row in results:
+        before = baseline.get((row["scale"], row["stage"]))
+        if not before or not row["seconds"]:
+            continue
+        ratio = row["seconds"] / before
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        print(
+            f"{row['scale']:>8} {row['stage']:<20} {before:>9.2f}s -> "
+            f"{row['seconds']:>9.2f}s ({ratio:.2f}x){flag}"
+        )
+
+
+def git_commit() -> str | None:
+    completed = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return completed.stdout.strip() or None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Round counts to benchmark (default: 1000 10000 100000).",
+    )
+    parser.add_argument("--courses", type=int, default=5)
+    parser.add_argument(
+        "--players",
+        type=int,
+        default=0,
+        help="Spread rounds over this many synthetic players (default: 0, all "
+        "for the default player).",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--load",
+        choices=["auto", "excel", "feed", "direct"],
+        default="auto",
+        help="How rounds are loaded (default: workbooks up to --excel-max "
+        "rounds, a CSV feed above).",
+    )
+    parser.add_argument(
+        "--excel-max",
+        type=int,
+        default=10_000,
+        help="Largest scale loaded as one workbook per round (default: 10000).",
+    )
+    parser.add_argument(
+        "--bulk", action="store_true", help="Run ingest_excel.py with --bulk."
+    )
+    parser.add_argument("--no-dbt", action="store_true", help="Skip `dbt run`.")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Calls per dashboard query; the median is reported (default: 5).",
+    )
+    parser.add_argument("--compare", type=Path, help="Earlier results file.")
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Leave the synthetic data of the last scale in the database.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+
+    started_at = datetime.now(timezone.utc)
+    results = Results()
+    try:
+        for scale in args.scales:
+            run_scale(args, scale, results)
+    finally:
+        if not args.keep:
+            with get_conn() as conn:
+                delete_synthetic(conn, PREFIX)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"benchmark-{started_at:%Y%m%dT%H%M%SZ}.json"
+    path.write_text(
+        json.dumps(
+            {
+                "started_at": started_at.isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "args": {k: str(v) for k, v in vars(args).items()},
+                "results": results.rows,
+            },
+            indent=2,
+        )
+    )
+    print(f"Results written to {path}")
+    if args.compare:
+        compare(results.rows, args.compare)
+
+
+if __name__ == "__main__":
+    main()
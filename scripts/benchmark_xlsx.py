@@ -0,0 +1,175 @@
+"""Compare parse time and peak memory of the xlsx readers on real workbooks.
+
+Reads every workbook --repeat times with pd.read_excel (what the ingest
+scripts used before) and with golf_stats.xlsx.read_sheets (what they use
+now), each reader in a fresh process so its peak RSS is its own. Course
+workbooks (`course_*.xlsx`) are read with the course sheets, everything else
+with the rounds and hole_stats sheets. The first cell where the readers
+return different values is shown for each file (the streaming reader keeps
+text such as "18" and "N/A" as typed).
+
+Defaults to the two templates (run create_excel_template.py and
+create_course_import_template.py first) plus any workbooks in data/raw/.
+No database is needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats.xlsx import read_sheets  # noqa: E402
+
+COURSE_SHEETS = ("course", "tees", "holes", "tee_holes")
+ROUND_SHEETS = ("rounds", "hole_stats")
+DEFAULT_FILES = [
+    Path("templates/golf_stats_template.xlsx"),
+    Path("templates/course_import_template.xlsx"),
+]
+
+
+def workbook_sheets(path: Path) -> tuple[str, ...]:
+    return COURSE_SHEETS if path.name.startswith("course_") else ROUND_SHEETS
+
+
+def read_with_pandas(path: Path, sheets: tuple[str, ...]) -> dict[str, pd.DataFrame]:
+    with pd.ExcelFile(path) as xls:
+        return {sheet: pd.read_excel(xls, sheet_name=sheet) for sheet in sheets}
+
+
+READERS = {"pd.read_excel": read_with_pandas, "streaming": read_sheets}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def values(frames: dict[str, pd.DataFrame]) -> dict[str, list]:
+    """Frame contents with blanks as None and whole floats as ints."""
+    return {
+        sheet: [
+            [
+                None
+                if pd.isna(value)
+                else int(value)
+                if isinstance(value, float) and value.is_integer()
+                else value
+                for value in row
+            ]
+            for row in df.astype(object).itertuples(index=False, name=None)
+        ]
+        for sheet, df in frames.items()
+    }
+
+
+def first_difference(expected: dict[str, list], actual: dict[str, list]) -> str | None:
+    for sheet, rows in expected.items():
+        if len(rows) != len(actual[sheet]):
+            return f"{sheet} has {len(rows)} vs {len(actual[sheet])} rows"
+        for i, (row, other) in enumerate(zip(rows, actual[sheet])):
+            for j, (value, other_value) in enumerate(zip(row, other)):
+                if value != other_value:
+                    return (
+                        f"{sheet} row {i + 1} column {j + 1}: "
+                        f"{value!r} vs {other_value!r}"
+                    )
+    return None
+
+
+def run_reader(reader: str, files: list[Path], repeat: int) -> dict:
+    """Runs in a fresh worker process: time one reader over all files."""
+    read = READERS[reader]
+    baseline = peak_rss_mb()
+    per_file = {}
+    contents = {}
+    for path in files:
+        sheets = workbook_sheets(path)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            frames = read(path, sheets)
+        per_file[str(path)] = (time.perf_counter() - started) / repeat
+        contents[str(path)] = values(frames)
+    return {
+        "reader": reader,
+        "seconds": sum(per_file.values()),
+        "per_file": per_file,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+        "contents": contents,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help="Workbooks to read (default: the templates plus data/raw/*.xlsx).",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=20,
+        help="Times each workbook is read per reader (default: 20).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    files = args.files or [
+        path
+        for path in [*DEFAULT_FILES, *sorted(Path("data/raw").glob("*.xlsx"))]
+        if path.exists()
+    ]
+    if not files:
+        raise FileNotFoundError(
+            "No workbooks found. Create the templates or pass workbook paths."
+        )
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for reader in READERS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            job = pool.submit(run_reader, reader, files, args.repeat)
+            results[reader] = job.result()
+
+    print(f"{len(files)} workbook(s), each read {args.repeat} times per reader.")
+    for reader, result in results.items():
+        print(
+            f"{reader:>14}: {1000 * result['seconds']:8.1f} ms per pass, "
+            f"peak RSS {result['peak_rss_mb']:6.1f} MB "
+            f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f} MB "
+            "over the idle worker)"
+        )
+    pandas_result, streaming_result = results.values()
+    print(f"Speedup: {pandas_result['seconds'] / streaming_result['seconds']:.1f}x")
+    for path in files:
+        pandas_ms = 1000 * pandas_result["per_file"][str(path)]
+        streaming_ms = 1000 * streaming_result["per_file"][str(path)]
+        print(f"  {path.name}: {pandas_ms:.1f} ms -> {streaming_ms:.1f} ms")
+
+    print("First differing cell (pandas vs streaming):")
+    for path in files:
+        difference = first_difference(
+            pandas_result["contents"][str(path)],
+            streaming_result["contents"][str(path)],
+        )
+        if difference:
+            print(f"  {path.name}: {difference}")
+
+
+if __name__ == "__main__":
+    main()
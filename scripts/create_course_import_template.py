@@ -42,20 +42,20 @@ def build_tees_sheet(wb: Workbook) -> None:
 
 def build_holes_sheet(wb: Workbook) -> None:
     ws = wb.create_sheet("holes")
-    headers = ["hole_number", "par"]
+    headers = ["hole_number", "par", "hole_handicap_index"]
     style_header(ws, headers)
     for hole in range(1, 19):
-        ws.append([hole, 4])
+        ws.append([hole, 4, hole])
 
 
 def build_tee_holes_sheet(wb: Workbook) -> None:
     ws = wb.create_sheet("tee_holes")
     headers = ["tee_name", "hole_number", "yardage"]
     style_header(ws, headers)
-    ws.append(["Blue", 1, 410])
-    ws.append(["Blue", 2, 390])
-    ws.append(["White", 1, 380])
-    ws.append(["White", 2, 365])
+    # A yardage for every tee on every hole (required by --bulk imports).
+    for tee_name, yardage in [("Blue", 380), ("White", 355), ("Red", 325)]:
+        for hole in range(1, 19):
+            ws.append([tee_name, hole, yardage + 10 * (hole % 4)])
 
 
 def main() -> None:
@@ -71,6 +71,7 @@ def build_rounds_sheet(wb: Workbook, list_ws, list_col_counter: dict[str, int])
         "round_type",
         "round_format",
         "notes",
+        "player_name",
     ]
 
     style_header(ws, headers)
@@ -86,6 +87,7 @@ def build_rounds_sheet(wb: Workbook, list_ws, list_col_counter: dict[str, int])
             7: 14,
             8: 14,
             9: 28,
+            10: 20,
         },
     )
 
@@ -105,6 +107,7 @@ def build_rounds_sheet(wb: Workbook, list_ws, list_col_counter: dict[str, int])
             "Practice",
             "Stroke",
             "Felt good off the tee",
+            "Default",
         ]
     )
 
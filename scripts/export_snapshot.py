@@ -0,0 +1,64 @@
+"""Export the dashboard marts to a Parquet snapshot (run after `dbt run`).
+
+The Streamlit dashboard reads the snapshot instead of PostgreSQL when
+DASHBOARD_SNAPSHOT_DIR points at the same directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats.db import get_conn  # noqa: E402
+from golf_stats.snapshot import export_snapshot  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Snapshot directory (default: $DASHBOARD_SNAPSHOT_DIR or "
+        "data/snapshot).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Seconds between exports; 0 exports once and exits (default).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+    output_dir = args.output_dir or Path(
+        os.getenv("DASHBOARD_SNAPSHOT_DIR", "data/snapshot")
+    )
+
+    while True:
+        started = time.perf_counter()
+        with get_conn() as conn:
+            manifest = export_snapshot(conn, output_dir)
+        for name, table in manifest["tables"].items():
+            print(f"{name}: {table['rows']} rows in {table['seconds']:.2f}s")
+        print(
+            f"Snapshot {manifest['folder']} written to {output_dir} in "
+            f"{time.perf_counter() - started:.2f}s."
+        )
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,444 @@
-"""Import course(s) (with tees, holes, and yardages) from Excel."""
+"""Import course(s) (with tees, holes, and yardages) from Excel.
+
+By default each workbook is inserted row by row in its own transaction and a
+bad workbook stops the run. With --bulk, workbooks are parsed (in --workers
+processes), validated --batch-size at a time in one vectorized pass, and
+each batch is loaded through COPY into staging tables and set-based inserts
+that map course and tee names to their new IDs in SQL. Bad workbooks are
+moved to data/quarantine/ with a `<file>.errors.csv` and the run carries on;
+the run report lists every file as loaded, skipped or failed.
+
+Each file's outcome is checkpointed in the transaction that commits it, so an
+interrupted run can be continued with --resume RUN_ID.
+"""
 
 from __future__ import annotations
 
-import os
+import argparse
+import sys
+import time
 from pathlib import Path
+from typing import Callable
 
 import pandas as pd
 import psycopg
 from dotenv import load_dotenv
 
-REQUIRED_SHEETS = {"course", "tees", "holes", "tee_holes"}
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats.checkpoint import (  # noqa: E402
+    checkpoint,
+    print_reconciliation,
+    start_run,
+)
+from golf_stats.db import get_conn  # noqa: E402
+from golf_stats.metrics import RunMetrics  # noqa: E402
+from golf_stats.refresh import print_refreshes, refresh_marts  # noqa: E402
+from golf_stats.xlsx import read_sheets  # noqa: E402
+from batch_validation import clean_names, validate_course_batch  # noqa: E402
+from ingest_excel import batched, clean_value, iter_parsed, quarantine  # noqa: E402
+
+SHEETS = ("course", "tees", "holes", "tee_holes")
+
+# (path, {sheet: frame}, parse seconds, error); sheets are None on error.
+ParsedCourse = tuple[Path, dict[str, pd.DataFrame] | None, float, str | None]
+
+
+def parse_course_workbook(path: Path) -> ParsedCourse:
+    """Read one workbook; unreadable files come back with an error instead."""
+    started = time.perf_counter()
+    try:
+        sheets = read_sheets(path, SHEETS)
+    except ValueError as exc:
+        return path, None, time.perf_counter() - started, str(exc)
+    return path, sheets, time.perf_counter() - started, None
+
+
+def optional(row: pd.Series, column: str, cast: Callable = int):
+    """An optional numeric cell as `cast`, or None when blank or absent."""
+    value = clean_value(row.get(column))
+    return None if value is None else cast(value)
+
+
+def import_course(
+    conn: psycopg.Connection,
+    input_path: Path,
+    sheets: dict[str, pd.DataFrame],
+    metrics: RunMetrics,
+    processed_dir: Path,
+) -> None:
+    """Insert one course workbook row by row in its own transaction."""
+    started = time.perf_counter()
+    course_df = sheets["course"]
+    tees_df = sheets["tees"]
+    holes_df = sheets["holes"]
+    tee_holes_df = sheets["tee_holes"]
+
+    if len(course_df) != 1:
+        raise ValueError(f"{input_path.name}: course sheet must have exactly one row")
+
+    course_row = course_df.iloc[0]
+    course_name = str(course_row["course_name"]).strip()
+    if not course_name:
+        raise ValueError(f"{input_path.name}: course_name is required")
+
+    with conn.cursor() as cur, metrics.stage("write"):
+        cur.execute(
+            "select course_id from courses where course_name = %s",
+            (course_name,),
+        )
+        if cur.fetchone():
+            print(f"{input_path.name}: course already exists, skipping.")
+            reason = "course already exists"
+            checkpoint(conn, metrics, [(input_path, "skipped", reason)])
+            conn.commit()
+            input_path.rename(processed_dir / input_path.name)
+            metrics.file(input_path, status="skipped", reason=reason)
+            metrics.count("files_skipped")
+            return
+
+        cur.execute(
+            """
+            insert into courses (course_name, location, notes)
+            values (%s, %s, %s)
+            returning course_id
+            """,
+            (
+                course_name,
+                str(course_row.get("location") or "").strip() or None,
+                str(course_row.get("notes") or "").strip() or None,
+            ),
+        )
+        course_id = cur.fetchone()[0]
+
+        tee_id_map = {}
+        for _, row in tees_df.iterrows():
+            tee_name = str(row.get("tee_name") or "").strip()
+            if not tee_name:
+                raise ValueError(f"{input_path.name}: tee_name cannot be empty")
+            cur.execute(
+                """
+                insert into tees (course_id, tee_name, course_rating, slope_rating, yardage)
+                values (%s, %s, %s, %s, %s)
+                returning tee_id
+                """,
+                (
+                    course_id,
+                    tee_name,
+                    row.get("course_rating"),
+                    row.get("slope_rating"),
+                    row.get("yardage_total"),
+                ),
+            )
+            tee_id_map[tee_name] = cur.fetchone()[0]
+
+        for _, row in holes_df.iterrows():
+            cur.execute(
+                """
+                insert into holes (course_id, hole_number, par, hole_handicap_index)
+                values (%s, %s, %s, %s)
+                """,
+                (
+                    course_id,
+                    int(row["hole_number"]),
+                    int(row["par"]),
+                    optional(row, "hole_handicap_index"),
+                ),
+            )
+
+        for _, row in tee_holes_df.iterrows():
+            tee_name = str(row.get("tee_name") or "").strip()
+            if tee_name not in tee_id_map:
+                raise ValueError(f"{input_path.name}: unknown tee_name {tee_name}")
+            cur.execute(
+                """
+                insert into tee_holes (tee_id, hole_number, yardage)
+                values (%s, %s, %s)
+                """,
+                (
+                    tee_id_map[tee_name],
+                    int(row["hole_number"]),
+                    int(row["yardage"]),
+                ),
+            )
+
+        checkpoint(conn, metrics, [(input_path, "loaded", None)])
+        conn.commit()
+    rows = 1 + len(tees_df) + len(holes_df) + len(tee_holes_df)
+    metrics.file(
+        input_path,
+        write_seconds=time.perf_counter() - started,
+        status="loaded",
+        rows_written=rows,
+    )
+    metrics.count("files_loaded")
+    metrics.count("rows_written", rows)
+    print(f"Imported course: {course_name}")
+    input_path.rename(processed_dir / input_path.name)
+
 
+def validate_courses(batch: list[ParsedCourse]) -> pd.DataFrame:
+    """Error report (with a source column) for a batch of parsed workbooks."""
+    reports = [
+        pd.DataFrame([{"error": error, "source": str(path)}])
+        for path, _, _, error in batch
+        if error is not None
+    ]
+    readable = [(path, sheets) for path, sheets, _, error in batch if error is None]
+    if readable:
+        frames = [
+            pd.concat(
+                [sheets[sheet].assign(source=str(path)) for path, sheets in readable]
+            )
+            for sheet in SHEETS
+        ]
+        reports.append(validate_course_batch(*frames))
+    return pd.concat(reports, ignore_index=True)
 
-def get_conn() -> psycopg.Connection:
-    return psycopg.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "golf_stats"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "postgres"),
+
+def course_rows(
+    sheets: dict[str, pd.DataFrame],
+) -> tuple[tuple, list[tuple], list[tuple], list[tuple]]:
+    """Staging tuples for one validated workbook, keyed by course name."""
+    course_row = sheets["course"].iloc[0]
+    course_name = str(course_row["course_name"]).strip()
+    tees_df = sheets["tees"].assign(tee_name=clean_names(sheets["tees"]["tee_name"]))
+    tee_holes_df = sheets["tee_holes"].assign(
+        tee_name=clean_names(sheets["tee_holes"]["tee_name"])
+    )
+    course = (
+        course_name,
+        clean_value(course_row.get("location")),
+        clean_value(course_row.get("notes")),
     )
+    tees = [
+        (
+            course_name,
+            row["tee_name"],
+            optional(row, "course_rating", float),
+            optional(row, "slope_rating", float),
+            optional(row, "yardage_total"),
+        )
+        for _, row in tees_df.iterrows()
+    ]
+    holes = [
+        (
+            course_name,
+            int(row["hole_number"]),
+            int(row["par"]),
+            optional(row, "hole_handicap_index"),
+        )
+        for _, row in sheets["holes"].iterrows()
+    ]
+    tee_holes = [
+        (course_name, row["tee_name"], int(row["hole_number"]), int(row["yardage"]))
+        for _, row in tee_holes_df.iterrows()
+    ]
+    return course, tees, holes, tee_holes
+
+
+def bulk_insert_courses(
+    conn: psycopg.Connection, batch: list[dict[str, pd.DataFrame]]
+) -> dict[str, int]:
+    """COPY a batch of validated workbooks into staging, then insert set-based.
+
+    Returns {course_name: rows inserted} for the courses that were new;
+    courses whose name already exists are skipped with all their rows.
+    Does not commit.
+    """
+    rows = [course_rows(sheets) for sheets in batch]
+    staged = {
+        "stage_courses": [course for course, _, _, _ in rows],
+        "stage_tees": [tee for _, tees, _, _ in rows for tee in tees],
+        "stage_holes": [hole for _, _, holes, _ in rows for hole in holes],
+        "stage_tee_holes": [row for _, _, _, tee_holes in rows for row in tee_holes],
+    }
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TEMP TABLE stage_courses (
+                course_name TEXT, location TEXT, notes TEXT
+            ) ON COMMIT DROP
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE stage_tees (
+                course_name TEXT, tee_name TEXT, course_rating NUMERIC,
+                slope_rating NUMERIC, yardage INT
+            ) ON COMMIT DROP
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE stage_holes (
+                course_name TEXT, hole_number INT, par INT,
+                hole_handicap_index INT
+            ) ON COMMIT DROP
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE stage_tee_holes (
+                course_name TEXT, tee_name TEXT, hole_number INT, yardage INT
+            ) ON COMMIT DROP
+            """
+        )
+        for table, table_rows in staged.items():
+            with cur.copy(f"COPY {table} FROM STDIN") as copy:
+                for row in table_rows:
+                    copy.write_row(row)
+
+        cur.execute(
+            """
+            CREATE TEMP TABLE new_courses ON COMMIT DROP AS
+            WITH inserted AS (
+                INSERT INTO courses (course_name, location, notes)
+                SELECT course_name, location, notes FROM stage_courses
+                ON CONFLICT (course_name) DO NOTHING
+                RETURNING course_id, course_name
+            )
+            SELECT * FROM inserted
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE new_tees ON COMMIT DROP AS
+            WITH inserted AS (
+                INSERT INTO tees (
+                    course_id, tee_name, course_rating, slope_rating, yardage
+                )
+                SELECT c.course_id, s.tee_name, s.course_rating, s.slope_rating,
+                       s.yardage
+                FROM stage_tees s
+                JOIN new_courses c ON c.course_name = s.course_name
+                RETURNING tee_id, course_id, tee_name
+            )
+            SELECT i.tee_id, c.course_name, i.tee_name
+            FROM inserted i
+            JOIN new_courses c ON c.course_id = i.course_id
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO holes (course_id, hole_number, par, hole_handicap_index)
+            SELECT c.course_id, s.hole_number, s.par, s.hole_handicap_index
+            FROM stage_holes s
+            JOIN new_courses c ON c.course_name = s.course_name
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO tee_holes (tee_id, hole_number, yardage)
+            SELECT t.tee_id, s.hole_number, s.yardage
+            FROM stage_tee_holes s
+            JOIN new_tees t
+              ON t.course_name = s.course_name
+             AND t.tee_name = s.tee_name
+            """
+        )
+        cur.execute("SELECT course_name FROM new_courses")
+        new_courses = {row[0] for row in cur.fetchall()}
+
+    return {
+        course[0]: 1 + len(tees) + len(holes) + len(tee_holes)
+        for course, tees, holes, tee_holes in rows
+        if course[0] in new_courses
+    }
+
+
+def bulk_import(
+    conn: psycopg.Connection,
+    files: list[Path],
+    args: argparse.Namespace,
+    metrics: RunMetrics,
+    processed_dir: Path,
+) -> None:
+    parsed = iter_parsed(files, args.workers, parse_course_workbook)
+    for batch in batched(parsed, args.batch_size):
+        for path, _, seconds, _ in batch:
+            metrics.add_time("parse", seconds)
+            metrics.file(path, parse_seconds=seconds)
+        with metrics.stage("validate"):
+            report_df = validate_courses(batch)
+
+        clean = []
+        outcomes = []
+        for path, sheets, _, _ in batch:
+            # Rows without a source are missing columns, which fail every file.
+            file_report = report_df[
+                (report_df["source"] == str(path)) | report_df["source"].isna()
+            ]
+            if len(file_report):
+                reason = file_report["error"].iloc[0]
+                print(f"{path.name}: {reason} (quarantined)")
+                metrics.file(path, status="failed", reason=reason)
+                metrics.count("files_failed")
+                quarantine(path, file_report)
+                outcomes.append((path, "quarantined", reason))
+            else:
+                clean.append((path, sheets))
+        if not clean:
+            checkpoint(conn, metrics, outcomes)
+            conn.commit()
+            continue
 
+        started = time.perf_counter()
+        with metrics.stage("write"):
+            loaded = bulk_insert_courses(conn, [sheets for _, sheets in clean])
+        write_seconds = (time.perf_counter() - started) / len(clean)
+        for path, sheets in clean:
+            course_name = str(sheets["course"].iloc[0]["course_name"]).strip()
+            rows = loaded.get(course_name, 0)
+            status = "loaded" if course_name in loaded else "skipped"
+            metrics.file(
+                path, write_seconds=write_seconds, status=status, rows_written=rows
+            )
+            metrics.count(f"files_{status}")
+            metrics.count("rows_written", rows)
+            if status == "skipped":
+                print(f"{path.name}: course already exists, skipping.")
+                metrics.file(path, reason="course already exists")
+            outcomes.append((path, status, metrics.files[str(path)].get("reason")))
+        checkpoint(conn, metrics, outcomes)
+        conn.commit()
+        for path, _ in clean:
+            path.rename(processed_dir / path.name)
+        print(f"Imported {len(loaded)} of {len(clean)} valid course file(s).")
 
-def main() -> None:
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Validate batches of workbooks together and load them set-based "
+        "through COPY.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Workbooks validated and loaded per transaction with --bulk "
+        "(default: 500).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes parsing workbooks in parallel with --bulk (default: 1).",
+    )
+    parser.add_argument(
+        "--resume",
+        type=int,
+        metavar="RUN_ID",
+        help="Continue an interrupted run, skipping the files it finished.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     load_dotenv()
 
     input_dir = Path("data/raw")
@@ -32,100 +448,31 @@ def main() -> None:
     if not files:
         raise FileNotFoundError("No course files found. Expected data/raw/course_*.xlsx")
 
+    metrics = RunMetrics("import_course_excel")
     with get_conn() as conn:
-        for input_path in files:
-            xls = pd.ExcelFile(input_path)
-            if not REQUIRED_SHEETS.issubset(set(xls.sheet_names)):
-                missing = REQUIRED_SHEETS - set(xls.sheet_names)
-                raise ValueError(f"{input_path.name} missing sheets: {sorted(missing)}")
-
-            course_df = pd.read_excel(xls, sheet_name="course")
-            tees_df = pd.read_excel(xls, sheet_name="tees")
-            holes_df = pd.read_excel(xls, sheet_name="holes")
-            tee_holes_df = pd.read_excel(xls, sheet_name="tee_holes")
-
-            if len(course_df) != 1:
-                raise ValueError(f"{input_path.name}: course sheet must have exactly one row")
-
-            course_row = course_df.iloc[0]
-            course_name = str(course_row["course_name"]).strip()
-            if not course_name:
-                raise ValueError(f"{input_path.name}: course_name is required")
-
-            with conn.cursor() as cur:
-                cur.execute(
-                    "select course_id from courses where course_name = %s",
-                    (course_name,),
-                )
-                if cur.fetchone():
-                    print(f"{input_path.name}: course already exists, skipping.")
-                    conn.rollback()
-                    input_path.rename(processed_dir / input_path.name)
-                    continue
-
-                cur.execute(
-                    """
-                    insert into courses (course_name, location, notes)
-                    values (%s, %s, %s)
-                    returning course_id
-                    """,
-                    (
-                        course_name,
-                        str(course_row.get("location") or "").strip() or None,
-                        str(course_row.get("notes") or "").strip() or None,
-                    ),
-                )
-                course_id = cur.fetchone()[0]
-
-                tee_id_map = {}
-                for _, row in tees_df.iterrows():
-                    tee_name = str(row.get("tee_name") or "").strip()
-                    if not tee_name:
-                        raise ValueError(f"{input_path.name}: tee_name cannot be empty")
-                    cur.execute(
-                        """
-                        insert into tees (course_id, tee_name, course_rating, slope_rating, yardage)
-                        values (%s, %s, %s, %s, %s)
-                        returning tee_id
-                        """,
-                        (
-                            course_id,
-                            tee_name,
-                            row.get("course_rating"),
-                            row.get("slope_rating"),
-                            row.get("yardage_total"),
-                        ),
-                    )
-                    tee_id_map[tee_name] = cur.fetchone()[0]
-
-                for _, row in holes_df.iterrows():
-                    cur.execute(
-                        """
-                        insert into holes (course_id, hole_number, par)
-                        values (%s, %s, %s)
-                        """,
-                        (course_id, int(row["hole_number"]), int(row["par"])),
-                    )
-
-                for _, row in tee_holes_df.iterrows():
-                    tee_name = str(row.get("tee_name") or "").strip()
-                    if tee_name not in tee_id_map:
-                        raise ValueError(f"{input_path.name}: unknown tee_name {tee_name}")
-                    cur.execute(
-                        """
-                        insert into tee_holes (tee_id, hole_number, yardage)
-                        values (%s, %s, %s)
-                        """,
-                        (
-                            tee_id_map[tee_name],
-                            int(row["hole_number"]),
-                            int(row["yardage"]),
-                        ),
-                    )
+        files = start_run(conn, metrics, files, args.resume)
+        with metrics.recorded(conn):
+            if args.bulk:
+                bulk_import(conn, files, args, metrics, processed_dir)
+            else:
+                for input_path in files:
+                    started = time.perf_counter()
+                    try:
+                        with metrics.stage("parse"):
+                            sheets = read_sheets(input_path, SHEETS)
+                        parse_seconds = time.perf_counter() - started
+                        metrics.file(input_path, parse_seconds=parse_seconds)
+                        import_course(conn, input_path, sheets, metrics, processed_dir)
+                    except ValueError as exc:
+                        # Stops the run; the file is tried again on --resume.
+                        conn.rollback()
+                        checkpoint(conn, metrics, [(input_path, "failed", str(exc))])
+                        conn.commit()
+                        raise
 
-            conn.commit()
-            print(f"Imported course: {course_name}")
-            input_path.rename(processed_dir / input_path.name)
+            with metrics.stage("refresh"):
+                print_refreshes(refresh_marts(conn))
+            print_reconciliation(conn, metrics.run_id)
 
 
 if __name__ == "__main__":
@@ -2,149 +2,1103 @@
 
 from __future__ import annotations
 
-import os
+import argparse
+import cProfile
+import itertools
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator, TypeVar
 
 import pandas as pd
 import psycopg
 from dotenv import load_dotenv
 
-ALLOWED_HOLES_PLAYED = {"Front 9", "Back 9", "18"}
-ALLOWED_ROUND_TYPE = {"Practice", "Tournament", "Casual"}
-ALLOWED_ROUND_FORMAT = {"Stroke", "Match", "Scramble", "Other"}
-ALLOWED_TEE_SHOT = {
-    "Fairway",
-    "Left",
-    "Right",
-    "Short",
-    "Long",
-    "Out Left",
-    "Out Right",
-    "Out Short",
-    "Out Long",
-    "Bunker Left",
-    "Bunker Right",
-    "Bunker Short",
-    "Bunker Long",
-    "Green",
-}
-ALLOWED_APPROACH = {
-    "Green",
-    "Left",
-    "Right",
-    "Short",
-    "Long",
-    "Out Left",
-    "Out Right",
-    "Out Short",
-    "Out Long",
-    "Bunker Left",
-    "Bunker Right",
-    "Bunker Short",
-    "Bunker Long",
-    "N/A",
-}
-
-REQUIRED_ROUNDS_COLS = {
-    "round_external_id",
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats.checkpoint import (  # noqa: E402
+    checkpoint,
+    print_reconciliation,
+    start_run,
+)
+from golf_stats.db import get_conn  # noqa: E402
+from golf_stats.handicap import update_handicaps  # noqa: E402
+from golf_stats.metrics import RunMetrics  # noqa: E402
+from golf_stats.reference import DEFAULT_PLAYER, ReferenceCache  # noqa: E402
+from golf_stats.refresh import print_refreshes, refresh_marts  # noqa: E402
+from golf_stats.xlsx import read_sheets  # noqa: E402
+from batch_validation import (  # noqa: E402
+    player_names,
+    validate_batch,
+    validate_references,
+    write_report,
+)
+from ingest_manifest import (  # noqa: E402
+    PlannedFile,
+    load_manifest,
+    plan_files,
+    record_files,
+)
+
+QUARANTINE_DIR = Path("data/quarantine")
+ROUND_SHEETS = ("rounds", "hole_stats")
+VALIDATION_KEYS = ("source", "round_external_id")
+# Columns compared by the upsert to decide whether a stored row changed.
+ROUND_CONTENT = (
+    "course_id",
+    "tee_id",
     "date_played",
-    "course_name",
-    "tee_name",
     "holes_played",
+    "conditions",
     "round_type",
     "round_format",
-}
-
-REQUIRED_HOLE_COLS = {
-    "round_external_id",
-    "hole_number",
+    "notes",
+)
+HOLE_CONTENT = (
     "strokes",
     "putts",
-}
+    "tee_shot",
+    "approach",
+    "tee_club",
+    "approach_club",
+    "bunker_found",
+    "out_of_bounds_count",
+)
 
+T = TypeVar("T")
 
-def get_conn() -> psycopg.Connection:
-    return psycopg.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "golf_stats"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "postgres"),
-    )
-
+# (path, rounds, hole_stats, parse seconds, error); frames are None on error.
+ParsedWorkbook = tuple[Path, pd.DataFrame | None, pd.DataFrame | None, float, str | None]
 
-def ensure_columns(df: pd.DataFrame, required: Iterable[str], label: str) -> None:
-    missing = [col for col in required if col not in df.columns]
-    if missing:
-        raise ValueError(f"{label} sheet missing columns: {missing}")
 
+def read_workbook(path: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    sheets = read_sheets(path, ROUND_SHEETS)
+    rounds_df, holes_df = sheets["rounds"], sheets["hole_stats"]
 
-def validate_rounds(rounds_df: pd.DataFrame) -> None:
-    ensure_columns(rounds_df, REQUIRED_ROUNDS_COLS, "rounds")
     if len(rounds_df) != 1:
         raise ValueError("rounds sheet must contain exactly 1 row per file.")
+    return rounds_df, holes_df
+
+
+def parse_workbook(path: Path) -> ParsedWorkbook:
+    """Read one workbook; unreadable files come back with an error instead.
+
+    That includes files that vanish or cannot be opened while being read.
+    """
+    started = time.perf_counter()
+    try:
+        rounds_df, holes_df = read_workbook(path)
+    except (ValueError, OSError) as exc:
+        return path, None, None, time.perf_counter() - started, str(exc)
+    return path, rounds_df, holes_df, time.perf_counter() - started, None
+
+
+def iter_parsed(
+    files: list[Path],
+    workers: int,
+    parse: Callable[[Path], T] = parse_workbook,
+    pool: Executor | None = None,
+) -> Iterator[T]:
+    """Parse workbooks in a process pool, yielding results in file order.
+
+    At most a few files per worker are in flight so memory stays bounded when
+    the single DB writer falls behind the parsers. `parse` must be a
+    module-level function so it can be sent to the workers. Long-running
+    callers pass their own `pool` to reuse it across calls.
+    """
+    if pool is None:
+        if workers <= 1:
+            yield from map(parse, files)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from iter_parsed(files, workers, parse, pool)
+        return
+
+    pending: deque[Future] = deque()
+    remaining = iter(files)
+    for path in itertools.islice(remaining, max(workers, 1) * 4):
+        pending.append(pool.submit(parse, path))
+    while pending:
+        result = pending.popleft().result()
+        for path in itertools.islice(remaining, 1):
+            pending.append(pool.submit(parse, path))
+        yield result
+
+
+def quarantine(path: Path, report_df: pd.DataFrame) -> None:
+    """Move a bad workbook aside with a CSV of its problems."""
+    QUARANTINE_DIR.mkdir(parents=True, exist_ok=True)
+    write_report(report_df, QUARANTINE_DIR / f"{path.name}.errors.csv")
+    try:
+        path.rename(QUARANTINE_DIR / path.name)
+    except FileNotFoundError:
+        pass  # deleted since it was read; the error report is still kept
+
+
+def with_player(item: ParsedWorkbook, default_player: str) -> ParsedWorkbook:
+    """Fill in player_name on a readable workbook's rounds."""
+    path, rounds_df, holes_df, seconds, error = item
+    if error is None:
+        rounds_df = rounds_df.assign(
+            player_name=player_names(rounds_df, default_player)
+        )
+    return path, rounds_df, holes_df, seconds, error
+
+
+def iter_validated(
+    parsed: Iterable[ParsedWorkbook],
+    batch_size: int,
+    reference: ReferenceCache,
+    on_invalid: Callable[[Path, pd.DataFrame, float], None],
+    metrics: RunMetrics | None = None,
+    default_player: str = DEFAULT_PLAYER,
+) -> Iterator[tuple[Path, pd.DataFrame, pd.DataFrame, float]]:
+    """Validate parsed workbooks a batch at a time, passing on the clean ones.
+
+    Rounds without a player_name get `default_player`. Each batch is
+    concatenated (tagged with a `source` column) and checked in one vectorized
+    pass, then against the player/course/tee/hole reference cache.
+    Files with problems go to `on_invalid` with their part of the error
+    report; the rest are yielded in file order. Report rows without a source
+    (a sheet missing required columns across the batch) fail every readable
+    file in the batch. Validation and reference
+    checks are timed as the "validate" and "reference" stages of `metrics`.
+    """
+    metrics = metrics or RunMetrics("ingest_excel")
+    for batch in batched(parsed, batch_size):
+        batch = [with_player(item, default_player) for item in batch]
+        reports = [
+            pd.DataFrame([{"error": error, "source": str(path)}])
+            for path, _, _, _, error in batch
+            if error is not None
+        ]
+        readable = [item for item in batch if item[4] is None]
+        if readable:
+            rounds_df = pd.concat(
+                [r.assign(source=str(p)) for p, r, _, _, _ in readable],
+                ignore_index=True,
+            )
+            holes_df = pd.concat(
+                [h.assign(source=str(p)) for p, _, h, _, _ in readable],
+                ignore_index=True,
+            )
+            with metrics.stage("validate"):
+                batch_report = validate_batch(rounds_df, holes_df, VALIDATION_KEYS)
+            reports.append(batch_report)
+            # Reference checks need well-formed files, so skip flagged ones.
+            clean_rounds = ~rounds_df["source"].isin(batch_report["source"])
+            clean_holes = ~holes_df["source"].isin(batch_report["source"])
+            if clean_rounds.any() and batch_report["source"].notna().all():
+                with metrics.stage("reference"):
+                    reports.append(
+                        validate_references(
+                            rounds_df[clean_rounds],
+                            holes_df[clean_holes],
+                            reference,
+                            VALIDATION_KEYS,
+                        )
+                    )
+        report_df = pd.concat(reports, ignore_index=True)
+
+        for path, rounds_df, holes_df, seconds, error in batch:
+            file_report = report_df[
+                (report_df["source"] == str(path))
+                | (report_df["source"].isna() & (error is None))
+            ]
+            if len(file_report):
+                on_invalid(path, file_report, seconds)
+            else:
+                yield path, rounds_df, holes_df, seconds
+
+
+def clean_value(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value
+
+
+def round_values(round_row: pd.Series) -> tuple:
+    return (
+        round_row["date_played"],
+        round_row["holes_played"],
+        clean_value(round_row.get("conditions")),
+        round_row["round_type"],
+        round_row["round_format"],
+        clean_value(round_row.get("notes")),
+        str(round_row["round_external_id"]).strip(),
+    )
+
+
+def hole_values(row: pd.Series) -> tuple:
+    return (
+        int(row["hole_number"]),
+        int(row["strokes"]),
+        int(row["putts"]),
+        clean_value(row.get("tee_shot")),
+        clean_value(row.get("approach")),
+        clean_value(row.get("tee_club")),
+        clean_value(row.get("approach_club")),
+        int(clean_value(row.get("bunker_found")) or 0),
+        int(clean_value(row.get("out_of_bounds_count")) or 0),
+    )
+
+
+def resolve_round(
+    reference: ReferenceCache, round_row: pd.Series
+) -> tuple[int, int, int]:
+    """(player_id, course_id, tee_id) for a validated round row."""
+    player_id = reference.resolve_player(
+        round_row.get("player_name", DEFAULT_PLAYER)
+    )
+    return (
+        player_id,
+        *reference.resolve(round_row["course_name"], round_row["tee_name"]),
+    )
+
+
+def insert_round_row(
+    cur: psycopg.Cursor, ids: tuple[int, int, int], round_row: pd.Series
+) -> int:
+    """Insert a round given its (player_id, course_id, tee_id)."""
+    cur.execute(
+        """
+        INSERT INTO rounds (
+            player_id, course_id, tee_id, date_played, holes_played,
+            conditions, round_type, round_format, notes,
+            round_external_id
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING round_id
+        """,
+        (*ids, *round_values(round_row)),
+    )
+    return cur.fetchone()[0]
+
+
+def insert_holes(
+    cur: psycopg.Cursor, player_id: int, round_id: int, holes_df: pd.DataFrame
+) -> None:
+    for _, row in holes_df.iterrows():
+        cur.execute(
+            """
+            INSERT INTO hole_stats (
+                player_id, round_id, hole_number, strokes, putts,
+                tee_shot, approach, tee_club, approach_club,
+                bunker_found, out_of_bounds_count
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (player_id, round_id, *hole_values(row)),
+        )
 
-    row = rounds_df.iloc[0]
-    round_external_id = str(row["round_external_id"]).strip()
-    if not round_external_id:
-        raise ValueError("rounds: round_external_id is required.")
-    if row["holes_played"] not in ALLOWED_HOLES_PLAYED:
-        raise ValueError("Invalid holes_played value.")
-    if row["round_type"] not in ALLOWED_ROUND_TYPE:
-        raise ValueError("Invalid round_type value.")
-    if row["round_format"] not in ALLOWED_ROUND_FORMAT:
-        raise ValueError("Invalid round_format value.")
-
-
-def validate_holes(holes_df: pd.DataFrame) -> None:
-    ensure_columns(holes_df, REQUIRED_HOLE_COLS, "hole_stats")
-    if holes_df.empty:
-        raise ValueError("hole_stats: at least one hole row is required.")
-    if holes_df["hole_number"].isna().any():
-        raise ValueError("hole_stats: hole_number cannot be empty.")
-    if holes_df["strokes"].isna().any():
-        raise ValueError("hole_stats: strokes cannot be empty.")
-    if holes_df["putts"].isna().any():
-        raise ValueError("hole_stats: putts cannot be empty.")
-
-    if "tee_shot" in holes_df.columns:
-        invalid = holes_df["tee_shot"].dropna().isin(ALLOWED_TEE_SHOT)
-        if not invalid.all():
-            raise ValueError("hole_stats: invalid tee_shot value.")
-    if "approach" in holes_df.columns:
-        invalid = holes_df["approach"].dropna().isin(ALLOWED_APPROACH)
-        if not invalid.all():
-            raise ValueError("hole_stats: invalid approach value.")
-
-
-def validate_round_alignment(rounds_df: pd.DataFrame, holes_df: pd.DataFrame) -> None:
+
+def insert_round(
+    conn: psycopg.Connection,
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    reference: ReferenceCache,
+) -> bool:
+    """Insert one validated round row by row. Returns False if it already exists.
+
+    Does not commit.
+    """
     round_row = rounds_df.iloc[0]
     round_external_id = str(round_row["round_external_id"]).strip()
-    hole_round_ids = holes_df["round_external_id"].fillna("").astype(str).str.strip()
-
-    if (hole_round_ids == "").any():
-        raise ValueError("hole_stats: round_external_id cannot be empty.")
-    if not hole_round_ids.eq(round_external_id).all():
-        raise ValueError("hole_stats: every row must match rounds.round_external_id.")
-
-    hole_numbers = holes_df["hole_number"].astype(int)
-    if hole_numbers.duplicated().any():
-        raise ValueError("hole_stats: hole_number must be unique within a round.")
-
-    expected_holes = {
-        "18": set(range(1, 19)),
-        "Front 9": set(range(1, 10)),
-        "Back 9": set(range(10, 19)),
-    }[round_row["holes_played"]]
-    actual_holes = set(hole_numbers.tolist())
-    if actual_holes != expected_holes:
-        raise ValueError(
-            "hole_stats: hole_number values do not match the selected holes_played."
+    ids = resolve_round(reference, round_row)
+    player_id = ids[0]
+
+    with conn.cursor() as cur:
+        # Insert round if the player does not have it yet
+        cur.execute(
+            "SELECT round_id FROM rounds "
+            "WHERE player_id = %s AND round_external_id = %s",
+            (player_id, round_external_id),
+        )
+        if cur.fetchone():
+            print(f"Round {round_external_id} already exists. Skipping.")
+            return False
+
+        round_id = insert_round_row(cur, ids, round_row)
+        insert_holes(cur, player_id, round_id, holes_df)
+    return True
+
+
+def update_round(
+    conn: psycopg.Connection,
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    reference: ReferenceCache,
+    previous_external_id: str | None = None,
+) -> None:
+    """Replace a round (and all of its holes) with a changed file. Does not commit."""
+    round_row = rounds_df.iloc[0]
+    round_external_id = str(round_row["round_external_id"]).strip()
+    ids = resolve_round(reference, round_row)
+    player_id, course_id, tee_id = ids
+
+    with conn.cursor() as cur:
+        if previous_external_id and previous_external_id != round_external_id:
+            print(f"Round {previous_external_id} renamed to {round_external_id}.")
+            cur.execute(
+                "DELETE FROM rounds WHERE player_id = %s AND round_external_id = %s",
+                (player_id, previous_external_id),
+            )
+
+        cur.execute(
+            """
+            UPDATE rounds SET
+                course_id = %s, tee_id = %s, date_played = %s, holes_played = %s,
+                conditions = %s, round_type = %s, round_format = %s, notes = %s
+            WHERE round_external_id = %s AND player_id = %s
+            RETURNING round_id
+            """,
+            (course_id, tee_id, *round_values(round_row), player_id),
         )
+        existing = cur.fetchone()
+        if existing:
+            round_id = existing[0]
+            cur.execute(
+                "DELETE FROM hole_stats WHERE player_id = %s AND round_id = %s",
+                (player_id, round_id),
+            )
+        else:
+            round_id = insert_round_row(cur, ids, round_row)
+        insert_holes(cur, player_id, round_id, holes_df)
+
+
+def write_round(
+    conn: psycopg.Connection,
+    item: PlannedFile,
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    reference: ReferenceCache,
+) -> str:
+    """Insert or replace one file's round in a savepoint; returns its status.
+
+    Nothing is committed. When the database rejects the round (a constraint
+    or data error) only the savepoint is rolled back, so rounds written
+    earlier in the transaction survive, and the error is re-raised.
+    """
+    conn.execute("SAVEPOINT ingest_file")
+    try:
+        if item.action == "changed":
+            status = apply_change(conn, item, rounds_df, holes_df, reference)
+        elif insert_round(conn, rounds_df, holes_df, reference):
+            status = "loaded"
+        else:
+            status = "skipped"
+    except (psycopg.DataError, psycopg.IntegrityError):
+        conn.execute("ROLLBACK TO SAVEPOINT ingest_file")
+        raise
+    conn.execute("RELEASE SAVEPOINT ingest_file")
+    return status
+
+
+def batch_rows(
+    batch: list[tuple[pd.DataFrame, pd.DataFrame]], reference: ReferenceCache
+) -> tuple[list[tuple], list[tuple]]:
+    """Round and hole tuples for the bulk loaders; repeated rounds are dropped.
+
+    Rounds are unique per player, so a repeat is the same player and
+    round_external_id; two players may share an id.
+    """
+    seen: set[tuple[int, str]] = set()
+    round_rows: list[tuple] = []
+    hole_rows: list[tuple] = []
+    for rounds_df, holes_df in batch:
+        round_row = rounds_df.iloc[0]
+        round_external_id = str(round_row["round_external_id"]).strip()
+        ids = resolve_round(reference, round_row)
+        player_id = ids[0]
+        if (player_id, round_external_id) in seen:
+            print(f"Round {round_external_id} appears twice in batch. Skipping.")
+            continue
+        seen.add((player_id, round_external_id))
+        round_rows.append((*ids, *round_values(round_row)))
+        hole_rows.extend(
+            (player_id, round_external_id, *hole_values(row))
+            for _, row in holes_df.iterrows()
+        )
+    return round_rows, hole_rows
+
+
+def bulk_load(
+    conn: psycopg.Connection,
+    batch: list[tuple[pd.DataFrame, pd.DataFrame]],
+    reference: ReferenceCache,
+) -> tuple[set[tuple[int, str]], int]:
+    """COPY a batch of validated rounds into staging, then insert set-based.
+
+    Returns ((player_id, round_external_id) of the rounds inserted, hole rows
+    inserted). Rounds the player already has are skipped, like the per-row
+    path.
+    Does not commit.
+    """
+    return bulk_insert_rows(conn, *batch_rows(batch, reference))
 
 
-def main() -> None:
+def stage_rows(
+    cur: psycopg.Cursor, round_rows: list[tuple], hole_rows: Iterable[tuple]
+) -> None:
+    """COPY round and hole tuples into stage_rounds / stage_hole_stats."""
+    cur.execute(
+        """
+        CREATE TEMP TABLE stage_rounds (
+            player_id INT, course_id INT, tee_id INT, date_played DATE,
+            holes_played TEXT, conditions TEXT, round_type TEXT,
+            round_format TEXT, notes TEXT, round_external_id TEXT
+        ) ON COMMIT DROP
+        """
+    )
+    cur.execute(
+        """
+        CREATE TEMP TABLE stage_hole_stats (
+            player_id INT, round_external_id TEXT,
+            hole_number INT, strokes INT, putts INT,
+            tee_shot TEXT, approach TEXT, tee_club TEXT, approach_club TEXT,
+            bunker_found INT, out_of_bounds_count INT
+        ) ON COMMIT DROP
+        """
+    )
+    with cur.copy("COPY stage_rounds FROM STDIN") as copy:
+        for row in round_rows:
+            copy.write_row(row)
+    with cur.copy("COPY stage_hole_stats FROM STDIN") as copy:
+        for row in hole_rows:
+            copy.write_row(row)
+
+
+def bulk_insert_rows(
+    conn: psycopg.Connection, round_rows: list[tuple], hole_rows: Iterable[tuple]
+) -> tuple[set[tuple[int, str]], int]:
+    """COPY staged round and hole tuples and insert them set-based.
+
+    round_rows are (player_id, course_id, tee_id, *round_values), unique on
+    (player_id, round_external_id); hole_rows are
+    (player_id, round_external_id, *hole_values). Returns the
+    (player_id, round_external_id) of the rounds inserted and the hole rows
+    inserted.
+    Does not commit: callers commit the batch together with their own
+    bookkeeping (manifest rows, checkpoints).
+    """
+    with conn.cursor() as cur:
+        stage_rows(cur, round_rows, hole_rows)
+        cur.execute(
+            """
+            CREATE TEMP TABLE loaded_rounds (
+                player_id INT, round_id INT, round_external_id TEXT
+            ) ON COMMIT DROP
+            """
+        )
+
+        cur.execute(
+            """
+            WITH inserted AS (
+                INSERT INTO rounds (
+                    player_id, course_id, tee_id, date_played, holes_played,
+                    conditions, round_type, round_format, notes,
+                    round_external_id
+                )
+                SELECT
+                    s.player_id, s.course_id, s.tee_id, s.date_played, s.holes_played,
+                    s.conditions, s.round_type, s.round_format, s.notes,
+                    s.round_external_id
+                FROM stage_rounds s
+                ON CONFLICT (player_id, round_external_id)
+                    WHERE round_external_id IS NOT NULL
+                DO NOTHING
+                RETURNING player_id, round_id, round_external_id
+            )
+            INSERT INTO loaded_rounds
+            SELECT player_id, round_id, round_external_id FROM inserted
+            """
+        )
+        cur.execute("SELECT player_id, round_external_id FROM loaded_rounds")
+        inserted = set(cur.fetchall())
+
+        cur.execute(
+            """
+            INSERT INTO hole_stats (
+                player_id, round_id, hole_number, strokes, putts,
+                tee_shot, approach, tee_club, approach_club,
+                bunker_found, out_of_bounds_count
+            )
+            SELECT
+                l.player_id, l.round_id, h.hole_number, h.strokes, h.putts,
+                h.tee_shot, h.approach, h.tee_club, h.approach_club,
+                h.bunker_found, h.out_of_bounds_count
+            FROM stage_hole_stats h
+            JOIN loaded_rounds l
+              ON l.player_id = h.player_id
+             AND l.round_external_id = h.round_external_id
+            """
+        )
+        holes_inserted = cur.rowcount
+
+    skipped = len(round_rows) - len(inserted)
+    if skipped:
+        print(f"{skipped} round(s) already exist. Skipped.")
+    return inserted, holes_inserted
+
+
+def update_if_changed(table: str, columns: tuple[str, ...]) -> str:
+    """ON CONFLICT action that only rewrites rows whose content differs."""
+    assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns)
+    current = ", ".join(f"{table}.{column}" for column in columns)
+    incoming = ", ".join(f"EXCLUDED.{column}" for column in columns)
+    return (
+        f"DO UPDATE SET {assignments} "
+        f"WHERE ({current}) IS DISTINCT FROM ({incoming})"
+    )
+
+
+def bulk_upsert_rows(
+    conn: psycopg.Connection,
+    round_rows: list[tuple],
+    hole_rows: Iterable[tuple],
+    removed: Iterable[tuple[int, str]] = (),
+) -> tuple[dict[tuple[int, str], str], int]:
+    """COPY staged rounds and holes in and merge them set-based.
+
+    Takes the same tuples as bulk_insert_rows. New rounds are inserted;
+    existing rounds (same player and round_external_id) are updated only if
+    a column changed, and their holes are merged on (round, hole_number):
+    changed holes are updated, new ones inserted and missing ones deleted.
+    A round whose holes changed gets its updated_at bumped too, so dbt and
+    the handicap recompute pick it up. Rounds in `removed`
+    ((player_id, round_external_id), e.g. renamed files) are deleted first.
+
+    Returns ({(player_id, round_external_id): "loaded" | "updated"}, hole
+    rows written); unchanged rounds are left out. Does not commit.
+    """
+    removed = list(removed)
+    with conn.cursor() as cur:
+        stage_rows(cur, round_rows, hole_rows)
+        cur.execute(
+            """
+            CREATE TEMP TABLE upserted_rounds (
+                player_id INT, round_id INT, round_external_id TEXT,
+                inserted BOOLEAN
+            ) ON COMMIT DROP
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE changed_holes (
+                player_id INT, round_id INT
+            ) ON COMMIT DROP
+            """
+        )
+        if removed:
+            cur.execute(
+                """
+                DELETE FROM rounds r
+                USING unnest(%s::int[], %s::text[]) AS d(player_id, round_external_id)
+                WHERE r.player_id = d.player_id
+                  AND r.round_external_id = d.round_external_id
+                """,
+                ([player_id for player_id, _ in removed], [id_ for _, id_ in removed]),
+            )
+
+        cur.execute(
+            """
+            CREATE TEMP TABLE existing_rounds ON COMMIT DROP AS
+            SELECT r.round_id
+            FROM stage_rounds s
+            JOIN rounds r
+              ON r.player_id = s.player_id
+             AND r.round_external_id = s.round_external_id
+            """
+        )
+        cur.execute(
+            f"""
+            WITH upserted AS (
+                INSERT INTO rounds (
+                    player_id, course_id, tee_id, date_played, holes_played,
+                    conditions, round_type, round_format, notes,
+                    round_external_id
+                )
+                SELECT
+                    s.player_id, s.course_id, s.tee_id, s.date_played, s.holes_played,
+                    s.conditions, s.round_type, s.round_format, s.notes,
+                    s.round_external_id
+                FROM stage_rounds s
+                ON CONFLICT (player_id, round_external_id)
+                    WHERE round_external_id IS NOT NULL
+                {update_if_changed("rounds", ROUND_CONTENT)}
+                RETURNING player_id, round_id, round_external_id, NOT EXISTS (
+                    SELECT 1 FROM existing_rounds e WHERE e.round_id = rounds.round_id
+                )
+            )
+            INSERT INTO upserted_rounds SELECT * FROM upserted
+            """
+        )
+        cur.execute(
+            """
+            CREATE TEMP TABLE target_rounds ON COMMIT DROP AS
+            SELECT r.player_id, r.round_id, r.round_external_id
+            FROM stage_rounds s
+            JOIN rounds r
+              ON r.player_id = s.player_id
+             AND r.round_external_id = s.round_external_id
+            """
+        )
+        cur.execute(
+            f"""
+            WITH removed AS (
+                DELETE FROM hole_stats hs
+                USING target_rounds t
+                WHERE hs.player_id = t.player_id
+                  AND hs.round_id = t.round_id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM stage_hole_stats h
+                      WHERE h.player_id = t.player_id
+                        AND h.round_external_id = t.round_external_id
+                        AND h.hole_number = hs.hole_number
+                  )
+                RETURNING hs.player_id, hs.round_id
+            ),
+            merged AS (
+                INSERT INTO hole_stats (
+                    player_id, round_id, hole_number, strokes, putts,
+                    tee_shot, approach, tee_club, approach_club,
+                    bunker_found, out_of_bounds_count
+                )
+                SELECT
+                    t.player_id, t.round_id, h.hole_number, h.strokes, h.putts,
+                    h.tee_shot, h.approach, h.tee_club, h.approach_club,
+                    h.bunker_found, h.out_of_bounds_count
+                FROM stage_hole_stats h
+                JOIN target_rounds t
+                  ON t.player_id = h.player_id
+                 AND t.round_external_id = h.round_external_id
+                ON CONFLICT (player_id, round_id, hole_number)
+                {update_if_changed("hole_stats", HOLE_CONTENT)}
+                RETURNING player_id, round_id
+            )
+            INSERT INTO changed_holes
+            SELECT * FROM removed UNION ALL SELECT * FROM merged
+            """
+        )
+        cur.execute(
+            """
+            WITH touched AS (
+                UPDATE rounds r SET updated_at = now()
+                FROM (SELECT DISTINCT player_id, round_id FROM changed_holes) c
+                WHERE r.player_id = c.player_id
+                  AND r.round_id = c.round_id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM upserted_rounds u
+                      WHERE u.player_id = c.player_id AND u.round_id = c.round_id
+                  )
+                RETURNING r.player_id, r.round_id, r.round_external_id, false
+            )
+            INSERT INTO upserted_rounds SELECT * FROM touched
+            """
+        )
+        cur.execute(
+            "SELECT player_id, round_external_id, inserted FROM upserted_rounds"
+        )
+        statuses = {
+            (player_id, round_external_id): "loaded" if inserted else "updated"
+            for player_id, round_external_id, inserted in cur.fetchall()
+        }
+        cur.execute("SELECT count(*) FROM changed_holes")
+        holes_written = cur.fetchone()[0]
+
+    unchanged = len(round_rows) - len(statuses)
+    if unchanged:
+        print(f"{unchanged} round(s) unchanged. Skipped.")
+    return statuses, holes_written
+
+
+def upsert_batch(
+    conn: psycopg.Connection,
+    batch: list[tuple[PlannedFile, pd.DataFrame, pd.DataFrame]],
+    reference: ReferenceCache,
+) -> tuple[dict[tuple[int, str], str], int]:
+    """Upsert new and changed files in one transaction (see bulk_upsert_rows).
+
+    A changed file whose round_external_id was renamed drops the old round.
+    """
+    removed = []
+    for item, rounds_df, _ in batch:
+        previous = item.previous.round_external_id if item.previous else None
+        if previous and previous != external_id(rounds_df):
+            print(f"Round {previous} renamed to {external_id(rounds_df)}.")
+            player_id = reference.resolve_player(rounds_df.iloc[0]["player_name"])
+            removed.append((player_id, previous))
+    round_rows, hole_rows = batch_rows(
+        [(rounds_df, holes_df) for _, rounds_df, holes_df in batch], reference
+    )
+    return bulk_upsert_rows(conn, round_rows, hole_rows, removed)
+
+
+def external_id(rounds_df: pd.DataFrame) -> str:
+    return str(rounds_df.iloc[0]["round_external_id"]).strip()
+
+
+def round_key(rounds_df: pd.DataFrame, reference: ReferenceCache) -> tuple[int, str]:
+    """(player_id, round_external_id), which identifies a stored round."""
+    player_id = reference.resolve_player(rounds_df.iloc[0]["player_name"])
+    return player_id, external_id(rounds_df)
+
+
+def apply_change(
+    conn: psycopg.Connection,
+    item: PlannedFile,
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    reference: ReferenceCache,
+) -> str:
+    update_round(
+        conn, rounds_df, holes_df, reference, item.previous.round_external_id
+    )
+    print(f"Updated round {external_id(rounds_df)} from changed {item.path.name}.")
+    return "updated"
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options of the load itself, shared with watch_ingest.py."""
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Stage each batch of files with COPY and insert set-based.",
+    )
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Stage each batch with COPY and merge it: new rounds are inserted, "
+        "existing ones updated where their round or hole rows changed.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Files validated together, and per transaction in --bulk and "
+        "--upsert mode (default: 500).",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=1,
+        help="Files per transaction in the row-by-row mode (default: 1). Each "
+        "file is written in its own savepoint, so one the database rejects is "
+        "rolled back and quarantined without losing the others.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to parse workbooks (default: 1, no pool).",
+    )
+    parser.add_argument(
+        "--player",
+        default=DEFAULT_PLAYER,
+        help="Player of rounds whose workbook has no player_name "
+        f"(default: {DEFAULT_PLAYER}).",
+    )
+    parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Do not refresh marts deployed as materialized views at the end.",
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_load_arguments(parser)
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="Run report JSON path (default: data/reports/ingest_excel-<time>.json).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Re-parse and validate the slowest file under cProfile and dump "
+        "the stats to this path (view with `python -m pstats`).",
+    )
+    parser.add_argument(
+        "--resume",
+        type=int,
+        metavar="RUN_ID",
+        help="Continue an interrupted run, skipping the files it finished.",
+    )
+    return parser.parse_args(argv)
+
+
+def profile_file(path: Path, out: Path) -> None:
+    """Dump a cProfile of reading and validating one workbook (no DB writes)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    rounds_df, holes_df = read_workbook(path)
+    validate_batch(rounds_df, holes_df)
+    profiler.disable()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(out)
+    print(f"Profiled {path.name} -> {out}")
+
+
+def ingest(
+    conn: psycopg.Connection,
+    files: list[Path],
+    args: argparse.Namespace,
+    metrics: RunMetrics,
+    pool: Executor | None = None,
+    resumed: bool = False,
+) -> list[PlannedFile]:
+    """Load the new and changed files; returns the files that were planned.
+
+    Workbooks are parsed in `pool` when given, else in a pool of
+    `args.workers` processes created for this call. Each file's outcome is
+    checkpointed in the transaction that commits it when the run has an ID.
+    A --bulk or --upsert batch the database rejects is rolled back and
+    written file by file, so only the offending file is quarantined.
+    A `resumed` run always finishes with the handicap update and refresh,
+    which the interrupted attempt may not have reached.
+    """
+    with metrics.stage("plan"):
+        planned = plan_files(conn, files, load_manifest(conn))
+    print(f"{len(files) - len(planned)} unchanged file(s) skipped via manifest.")
+    metrics.count("files_unchanged", len(files) - len(planned))
+    by_path = {item.path: item for item in planned}
+    if metrics.run_id is not None and len(planned) < len(files):
+        checkpoint(
+            conn,
+            metrics,
+            [(path, "unchanged", None) for path in files if path not in by_path],
+        )
+        conn.commit()
+
+    # Manifest rows of quarantined files, written with the next commit.
+    failures: list[tuple] = []
+
+    def fail(path: Path, report_df: pd.DataFrame, seconds: float) -> None:
+        reason = report_df["error"].iloc[0]
+        print(f"{path.name}: {reason} (quarantined)")
+        metrics.file(path, status="failed", reason=reason)
+        metrics.count("files_failed")
+        quarantine(path, report_df)
+        failures.append((by_path[path], None, "failed", seconds, None))
+
+    def reject(path: Path, report_df: pd.DataFrame, seconds: float) -> None:
+        metrics.add_time("parse", seconds)
+        metrics.file(path, parse_seconds=seconds)
+        fail(path, report_df, seconds)
+
+    def write_file(
+        path: Path, rounds_df: pd.DataFrame, holes_df: pd.DataFrame, seconds: float
+    ) -> str | None:
+        """write_round; a file the database rejects is quarantined (None)."""
+        try:
+            with metrics.stage("write"):
+                status = write_round(
+                    conn, by_path[path], rounds_df, holes_df, reference
+                )
+        except (psycopg.DataError, psycopg.IntegrityError) as exc:
+            error = f"database rejected the round: {exc.diag.message_primary or exc}"
+            fail(path, pd.DataFrame([{"error": error, "source": str(path)}]), seconds)
+            return None
+        if status == "loaded":
+            print(
+                f"Inserted round {external_id(rounds_df)} "
+                f"with {len(holes_df)} holes."
+            )
+        return status
+
+    def record(records: list[tuple]) -> None:
+        """Write manifest rows and checkpoints and commit, with the rounds before."""
+        rows = [*failures, *records]
+        with metrics.stage("manifest"):
+            checkpoint(
+                conn,
+                metrics,
+                [
+                    (
+                        item.path,
+                        "quarantined" if status == "failed" else status,
+                        metrics.files.get(str(item.path), {}).get("reason"),
+                    )
+                    for item, _, status, _, _ in rows
+                ],
+            )
+            record_files(conn, rows)
+        failures.clear()
+
+    def written(
+        path: Path,
+        status: str,
+        rows: int,
+        seconds: float,
+        reason: str = "round already exists",
+    ) -> None:
+        metrics.file(path, write_seconds=seconds, status=status, rows_written=rows)
+        metrics.count(f"files_{status}")
+        metrics.count("rows_written", rows)
+        if status == "skipped":
+            metrics.file(path, reason=reason)
+
+    def write_each(parsed_batch: list[tuple]) -> list[tuple]:
+        """Write files one at a time, each in its own savepoint.
+
+        The row path, and the fallback when the database rejects a bulk batch:
+        only the file it rejects is quarantined. Returns the manifest records.
+        """
+        records = []
+        for path, rounds_df, holes_df, seconds in parsed_batch:
+            write_started = time.perf_counter()
+            status = write_file(path, rounds_df, holes_df, seconds)
+            if status is None:
+                continue
+            load_seconds = time.perf_counter() - write_started
+            rows = 0 if status == "skipped" else 1 + len(holes_df)
+            written(path, status, rows, load_seconds)
+            records.append(
+                (by_path[path], external_id(rounds_df), status, seconds, load_seconds)
+            )
+        return records
+
+    def rejected_batch(exc: psycopg.Error, parsed_batch: list[tuple]) -> None:
+        """Roll back a bulk batch the database rejected and write it file by file."""
+        conn.rollback()
+        print(
+            f"Batch rejected by the database ({exc.diag.message_primary or exc}); "
+            "writing its files one at a time."
+        )
+        record(write_each(parsed_batch))
+
+    with metrics.stage("reference"):
+        reference = ReferenceCache(conn)
+    parsed = iter_validated(
+        iter_parsed(
+            [item.path for item in planned], args.workers, pool=pool
+        ),
+        args.batch_size,
+        reference,
+        reject,
+        metrics,
+        args.player,
+    )
+
+    if args.upsert:
+        for parsed_batch in batched(parsed, args.batch_size):
+            for path, _, _, seconds in parsed_batch:
+                print(f"Processing {path.name}...")
+                metrics.add_time("parse", seconds)
+                metrics.file(path, parse_seconds=seconds)
+
+            write_started = time.perf_counter()
+            try:
+                with metrics.stage("write"):
+                    statuses, holes_written = upsert_batch(
+                        conn,
+                        [(by_path[path], r, h) for path, r, h, _ in parsed_batch],
+                        reference,
+                    )
+            except (psycopg.DataError, psycopg.IntegrityError) as exc:
+                rejected_batch(exc, parsed_batch)
+                continue
+            load_seconds = (time.perf_counter() - write_started) / len(parsed_batch)
+            print(
+                f"Upserted {len(statuses)} changed rounds, "
+                f"{holes_written} hole rows written."
+            )
+
+            records = []
+            claimed = set()
+            for path, rounds_df, holes_df, seconds in parsed_batch:
+                key = round_key(rounds_df, reference)
+                if key in claimed:
+                    # Only the first file of a repeated round was written.
+                    status, reason = "skipped", "round appears twice in batch"
+                else:
+                    status, reason = statuses.get(key, "skipped"), "round unchanged"
+                claimed.add(key)
+                rows = 0 if status == "skipped" else 1 + len(holes_df)
+                written(path, status, rows, load_seconds, reason=reason)
+                records.append(
+                    (by_path[path], key[1], status, seconds, load_seconds)
+                )
+            record(records)
+    elif args.bulk:
+        for parsed_batch in batched(parsed, args.batch_size):
+            new_rounds = []
+            for path, rounds_df, holes_df, seconds in parsed_batch:
+                print(f"Processing {path.name}...")
+                metrics.add_time("parse", seconds)
+                metrics.file(path, parse_seconds=seconds)
+                if by_path[path].action == "new":
+                    new_rounds.append((rounds_df, holes_df))
+
+            write_started = time.perf_counter()
+            try:
+                with metrics.stage("write"):
+                    inserted, holes_inserted = bulk_load(conn, new_rounds, reference)
+            except (psycopg.DataError, psycopg.IntegrityError) as exc:
+                rejected_batch(exc, parsed_batch)
+                continue
+            bulk_seconds = time.perf_counter() - write_started
+            print(f"Inserted {len(inserted)} rounds with {holes_inserted} holes.")
+
+            records = []
+            for path, rounds_df, holes_df, seconds in parsed_batch:
+                item = by_path[path]
+                round_external_id = external_id(rounds_df)
+                write_started = time.perf_counter()
+                if item.action == "changed":
+                    status = write_file(path, rounds_df, holes_df, seconds)
+                    if status is None:
+                        continue
+                    load_seconds = time.perf_counter() - write_started
+                else:
+                    # Only the first file of a repeated round was inserted.
+                    key = round_key(rounds_df, reference)
+                    status = "loaded" if key in inserted else "skipped"
+                    inserted.discard(key)
+                    load_seconds = bulk_seconds / len(new_rounds)
+                rows = 0 if status == "skipped" else 1 + len(holes_df)
+                written(path, status, rows, load_seconds)
+                records.append(
+                    (item, round_external_id, status, seconds, load_seconds)
+                )
+            record(records)
+    else:
+        # Group commit: --commit-every files per transaction, one savepoint each.
+        for parsed_batch in batched(parsed, args.commit_every):
+            records = []
+            for parsed_file in parsed_batch:
+                path, _, _, seconds = parsed_file
+                print(f"Processing {path.name}...")
+                metrics.add_time("parse", seconds)
+                metrics.file(path, parse_seconds=seconds)
+                records.extend(write_each([parsed_file]))
+            record(records)
+    if failures:
+        record([])
+
+    if planned or resumed:
+        with metrics.stage("handicap"):
+            recomputed = update_handicaps(conn)
+        metrics.count("handicap_rows", recomputed)
+        print(f"Handicap history recomputed for {recomputed} round(s).")
+    if (planned or resumed) and not args.no_refresh:
+        with metrics.stage("refresh"):
+            print_refreshes(refresh_marts(conn))
+    metrics.count("reference_loads", reference.loads)
+    return planned
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
     load_dotenv()
 
     input_dir = Path("data/raw")
@@ -156,108 +1110,25 @@ def main() -> None:
     if not files:
         raise FileNotFoundError("No Excel files found in data/raw/.")
 
+    metrics = RunMetrics("ingest_excel")
     with get_conn() as conn:
-        for path in files:
-            print(f"Processing {path.name}...")
-            rounds_df = pd.read_excel(path, sheet_name="rounds")
-            holes_df = pd.read_excel(path, sheet_name="hole_stats")
-
-            validate_rounds(rounds_df)
-            validate_holes(holes_df)
-            validate_round_alignment(rounds_df, holes_df)
-
-            round_row = rounds_df.iloc[0]
-            round_external_id = str(round_row["round_external_id"]).strip()
-
-            with conn.cursor() as cur:
-                # Find course and tee
-                cur.execute(
-                    "SELECT course_id FROM courses WHERE course_name = %s",
-                    (round_row["course_name"],),
-                )
-                course = cur.fetchone()
-                if not course:
-                    raise ValueError(
-                        f"Course not found: {round_row['course_name']}"
-                    )
-                course_id = course[0]
-
-                cur.execute(
-                    """
-                    SELECT tee_id FROM tees
-                    WHERE course_id = %s AND tee_name = %s
-                    """,
-                    (course_id, round_row["tee_name"]),
-                )
-                tee = cur.fetchone()
-                if not tee:
-                    raise ValueError(
-                        f"Tee not found: {round_row['tee_name']} "
-                        f"for course {round_row['course_name']}"
-                    )
-                tee_id = tee[0]
+        files = start_run(conn, metrics, files, args.resume)
+        with metrics.recorded(conn, args.report):
+            resumed = args.resume is not None
+            planned = ingest(conn, files, args, metrics, resumed=resumed)
+            print_reconciliation(conn, metrics.run_id)
 
-                # Insert round if not already present
-                cur.execute(
-                    "SELECT round_id FROM rounds WHERE round_external_id = %s",
-                    (round_external_id,),
-                )
-                existing = cur.fetchone()
-                if existing:
-                    print(f"Round {round_external_id} already exists. Skipping.")
-                    conn.rollback()
-                    continue
-
-                cur.execute(
-                    """
-                    INSERT INTO rounds (
-                        course_id, tee_id, date_played, holes_played,
-                        conditions, round_type, round_format, notes,
-                        round_external_id
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING round_id
-                    """,
-                    (
-                        course_id,
-                        tee_id,
-                        round_row["date_played"],
-                        round_row["holes_played"],
-                        round_row.get("conditions"),
-                        round_row["round_type"],
-                        round_row["round_format"],
-                        round_row.get("notes"),
-                        round_external_id,
-                    ),
-                )
-                round_id = cur.fetchone()[0]
-
-                for _, row in holes_df.iterrows():
-                    cur.execute(
-                        """
-                        INSERT INTO hole_stats (
-                            round_id, hole_number, strokes, putts,
-                            tee_shot, approach, tee_club, approach_club,
-                            bunker_found, out_of_bounds_count
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            round_id,
-                            int(row["hole_number"]),
-                            int(row["strokes"]),
-                            int(row["putts"]),
-                            row.get("tee_shot"),
-                            row.get("approach"),
-                            row.get("tee_club"),
-                            row.get("approach_club"),
-                            int(row.get("bunker_found") or 0),
-                            int(row.get("out_of_bounds_count") or 0),
-                        ),
-                    )
+    print(
+        f"{len(planned)} of {len(files)} files "
+        f"({metrics.counters['files_failed']} quarantined), "
+        f"{metrics.counters['rows_written']} rows written, "
+        f"{metrics.counters['reference_loads']} reference cache load(s) "
+        f"(parse time summed across {args.workers} worker(s))"
+    )
 
-                conn.commit()
-                print(f"Inserted round {round_external_id} with {len(holes_df)} holes.")
+    slowest = metrics.slowest_file()
+    if args.profile and slowest and Path(slowest).exists():
+        profile_file(Path(slowest), args.profile)
 
 
 if __name__ == "__main__":
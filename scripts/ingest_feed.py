@@ -0,0 +1,368 @@
+"""Load multi-round CSV or Parquet feeds (rounds + hole_stats) into PostgreSQL.
+
+A feed is two files with the same columns as the Excel template sheets, e.g.
+`league.rounds.csv` and `league.hole_stats.csv` (or `.parquet`). Unlike the
+workbooks, a feed holds any number of rounds.
+
+The rounds file is indexed in memory (one small row per round). The
+hole_stats file is streamed in chunks and must keep each round's holes
+together; every chunk is validated as a whole and COPY-loaded through the
+same set-based loader as `ingest_excel.py --bulk`, one transaction per chunk.
+A chunk the database rejects is rolled back and loaded a round at a time, so
+only the offending rounds go to the error report.
+Rounds that already exist are skipped, or with --upsert merged in place
+(only rounds and holes whose content changed are rewritten).
+
+A feed may mix players through an optional player_name column; rounds
+without one belong to --player. round_external_id must still be unique within
+a feed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pandas as pd
+import psycopg
+from dotenv import load_dotenv
+
+# ingest_excel puts the repo root on sys.path for golf_stats.
+from ingest_excel import QUARANTINE_DIR, bulk_insert_rows, bulk_upsert_rows
+from batch_validation import (
+    REQUIRED_HOLE_COLS,
+    external_ids,
+    player_names,
+    rejected,
+    validate_holes_frame,
+    validate_references,
+    validate_rounds_frame,
+    write_report,
+)
+from golf_stats.db import get_conn
+from golf_stats.handicap import update_handicaps
+from golf_stats.reference import DEFAULT_PLAYER, ReferenceCache
+from golf_stats.refresh import print_refreshes, refresh_marts
+
+ROUND_COLUMNS = [
+    "player_id",
+    "course_id",
+    "tee_id",
+    "date_played",
+    "holes_played",
+    "conditions",
+    "round_type",
+    "round_format",
+    "notes",
+    "round_external_id",
+]
+HOLE_COLUMNS = [
+    "player_id",
+    "round_external_id",
+    "hole_number",
+    "strokes",
+    "putts",
+    "tee_shot",
+    "approach",
+    "tee_club",
+    "approach_club",
+    "bunker_found",
+    "out_of_bounds_count",
+]
+
+
+def read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield a CSV or Parquet file as DataFrames of at most chunk_size rows."""
+    if path.suffix == ".csv":
+        yield from pd.read_csv(
+            path, chunksize=chunk_size, dtype={"round_external_id": str}
+        )
+    elif path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"{path.name}: expected a .csv or .parquet file")
+
+
+def rejected_ids(report_df: pd.DataFrame, report_path: Path) -> pd.Series:
+    """Log a validation report and return the round ids it rejects."""
+    if report_df.empty:
+        return pd.Series(dtype=str)
+    write_report(report_df, report_path)
+    bad = rejected(report_df, ["round_external_id"])["round_external_id"]
+    print(
+        f"{len(bad)} round(s) rejected, e.g. {bad.iloc[0]}: "
+        f"{report_df['error'].iloc[0]} (see {report_path})"
+    )
+    return bad
+
+
+def load_rounds(
+    path: Path,
+    chunk_size: int,
+    report_path: Path,
+    default_player: str = DEFAULT_PLAYER,
+) -> pd.DataFrame:
+    rounds_df = pd.concat(read_chunks(path, chunk_size), ignore_index=True)
+    rounds_df["player_name"] = player_names(rounds_df, default_player)
+    report_df = validate_rounds_frame(rounds_df)
+    if report_df["row"].isna().any():
+        raise ValueError(report_df["error"].iloc[0])
+    ids = external_ids(rounds_df)
+    rounds_df = rounds_df.assign(round_external_id=ids)
+    rounds_df.index = ids.rename(None)
+    return rounds_df[~ids.isin(rejected_ids(report_df, report_path)).to_numpy()]
+
+
+def iter_round_chunks(
+    rounds_df: pd.DataFrame,
+    holes_path: Path,
+    chunk_size: int,
+    reference: ReferenceCache,
+    report_path: Path,
+) -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Yield validated (rounds, holes) chunks that only contain whole rounds.
+
+    The last round of every hole chunk may continue in the next one, so its
+    rows are carried over. A round whose holes reappear after it was emitted
+    means the file is not grouped by round. Rounds with problems (including
+    unknown courses, tees or holes) are dropped from the chunk and their
+    problems appended to report_path; the rest get player_id, course_id and
+    tee_id.
+    """
+    emitted: set[str] = set()
+    carry = pd.DataFrame()
+
+    def emit(holes_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+        ids = external_ids(holes_df)
+        chunk_ids = pd.Index(ids.unique())
+        repeated = chunk_ids[chunk_ids.isin(emitted)]
+        if len(repeated):
+            raise ValueError(
+                "hole_stats must keep each round's rows together "
+                f"(round {repeated[0]} appears twice)."
+            )
+        emitted.update(chunk_ids)
+        chunk_rounds = rounds_df[rounds_df.index.isin(chunk_ids)]
+        holes_df = holes_df.assign(round_external_id=ids)
+        # Reference checks expect well-formed rows, so they run second.
+        checks = (
+            validate_holes_frame,
+            partial(validate_references, reference=reference),
+        )
+        for validate in checks:
+            bad = rejected_ids(validate(chunk_rounds, holes_df), report_path)
+            chunk_rounds = chunk_rounds[~chunk_rounds.index.isin(bad)]
+            holes_df = holes_df[~holes_df["round_external_id"].isin(bad)]
+
+        resolved = [
+            reference.resolve(course_name, tee_name)
+            for course_name, tee_name in zip(
+                chunk_rounds["course_name"], chunk_rounds["tee_name"]
+            )
+        ]
+        player_ids = {
+            name: reference.resolve_player(name)
+            for name in chunk_rounds["player_name"].unique()
+        }
+        chunk_rounds = chunk_rounds.assign(
+            player_id=chunk_rounds["player_name"].map(player_ids),
+            course_id=[course_id for course_id, _ in resolved],
+            tee_id=[tee_id for _, tee_id in resolved],
+        )
+        holes_df = holes_df.assign(
+            player_id=holes_df["round_external_id"].map(chunk_rounds["player_id"])
+        )
+        return chunk_rounds, holes_df
+
+    for chunk in read_chunks(holes_path, chunk_size):
+        missing = sorted(REQUIRED_HOLE_COLS - set(chunk.columns))
+        if missing:
+            raise ValueError(f"hole_stats file missing columns: {missing}")
+        holes_df = pd.concat([carry, chunk], ignore_index=True) if len(carry) else chunk
+        ids = external_ids(holes_df)
+        last = ids.iloc[-1]
+        carry = holes_df[ids == last]
+        complete = holes_df[ids != last]
+        if len(complete):
+            yield emit(complete)
+    if len(carry):
+        yield emit(carry)
+
+    orphans = rounds_df.index[~rounds_df.index.isin(emitted)]
+    if len(orphans):
+        print(f"{len(orphans)} round(s) without hole_stats were not loaded.")
+
+
+def records(df: pd.DataFrame, columns: list[str]) -> list[tuple]:
+    frame = df.reindex(columns=columns).astype(object)
+    return list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def hole_records(holes_df: pd.DataFrame) -> list[tuple]:
+    holes_df = holes_df.reindex(columns=HOLE_COLUMNS)
+    for column in ("hole_number", "strokes", "putts"):
+        holes_df[column] = holes_df[column].astype(int)
+    for column in ("bunker_found", "out_of_bounds_count"):
+        holes_df[column] = holes_df[column].fillna(0).astype(int)
+    return records(holes_df, HOLE_COLUMNS)
+
+
+def load_each(
+    conn: psycopg.Connection,
+    load: Callable,
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    report_path: Path,
+) -> tuple[int, int]:
+    """Load a rejected chunk's rounds one transaction each.
+
+    Rounds the database still rejects are appended to report_path. Returns
+    (rounds written, hole rows written).
+    """
+    holes_by_round = dict(tuple(holes_df.groupby("round_external_id")))
+    rounds_written = holes_written = 0
+    for round_external_id in rounds_df.index:
+        try:
+            written, holes = load(
+                conn,
+                records(rounds_df.loc[[round_external_id]], ROUND_COLUMNS),
+                hole_records(holes_by_round[round_external_id]),
+            )
+            conn.commit()
+        except (psycopg.DataError, psycopg.IntegrityError) as exc:
+            conn.rollback()
+            error = f"database rejected the round: {exc.diag.message_primary or exc}"
+            write_report(
+                pd.DataFrame(
+                    [{"error": error, "round_external_id": round_external_id}]
+                ),
+                report_path,
+            )
+            print(f"Round {round_external_id} rejected: {error} (see {report_path})")
+            continue
+        rounds_written += len(written)
+        holes_written += holes
+    return rounds_written, holes_written
+
+
+def feed_files(path: Path) -> tuple[Path, Path]:
+    """Accept either file of a feed pair and return (rounds, hole_stats)."""
+    stem = path.name.split(".")[0]
+    return (
+        path.with_name(f"{stem}.rounds{path.suffix}"),
+        path.with_name(f"{stem}.hole_stats{path.suffix}"),
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "feeds",
+        nargs="*",
+        type=Path,
+        help="Feed files (default: data/raw/*.rounds.csv and *.rounds.parquet).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50_000,
+        help="hole_stats rows read per chunk and transaction (default: 50000).",
+    )
+    parser.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Update rounds that already exist where their round or hole rows "
+        "changed, instead of skipping them.",
+    )
+    parser.add_argument(
+        "--player",
+        default=DEFAULT_PLAYER,
+        help="Player of rounds without a player_name "
+        f"(default: {DEFAULT_PLAYER}).",
+    )
+    parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Do not refresh marts deployed as materialized views at the end.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+
+    input_dir = Path("data/raw")
+    feeds = args.feeds or sorted(
+        [*input_dir.glob("*.rounds.csv"), *input_dir.glob("*.rounds.parquet")]
+    )
+    if not feeds:
+        raise FileNotFoundError("No feeds found. Expected data/raw/<name>.rounds.csv")
+
+    with get_conn() as conn:
+        reference = ReferenceCache(conn)
+        for feed in feeds:
+            rounds_path, holes_path = feed_files(feed)
+            print(f"Processing {rounds_path.name} + {holes_path.name}...")
+            started = time.perf_counter()
+            read_seconds = 0.0
+            rounds_loaded = holes_loaded = 0
+
+            report_path = QUARANTINE_DIR / f"{rounds_path.name}.errors.csv"
+            rounds_df = load_rounds(
+                rounds_path, args.chunk_size, report_path, args.player
+            )
+            chunks = iter_round_chunks(
+                rounds_df, holes_path, args.chunk_size, reference, report_path
+            )
+            while True:
+                read_started = time.perf_counter()
+                chunk = next(chunks, None)
+                read_seconds += time.perf_counter() - read_started
+                if chunk is None:
+                    break
+                chunk_rounds, chunk_holes = chunk
+                load = bulk_upsert_rows if args.upsert else bulk_insert_rows
+                try:
+                    written, holes_written = load(
+                        conn,
+                        records(chunk_rounds, ROUND_COLUMNS),
+                        hole_records(chunk_holes),
+                    )
+                    conn.commit()
+                    rounds_written = len(written)
+                except (psycopg.DataError, psycopg.IntegrityError) as exc:
+                    conn.rollback()
+                    print(
+                        "Chunk rejected by the database "
+                        f"({exc.diag.message_primary or exc}); "
+                        "loading its rounds one at a time."
+                    )
+                    rounds_written, holes_written = load_each(
+                        conn, load, chunk_rounds, chunk_holes, report_path
+                    )
+                rounds_loaded += rounds_written
+                holes_loaded += holes_written
+
+            total_seconds = time.perf_counter() - started
+            print(
+                f"{'Upserted' if args.upsert else 'Inserted'} {rounds_loaded} rounds "
+                f"with {holes_loaded} holes in "
+                f"{total_seconds:.2f}s (read+validate {read_seconds:.2f}s, "
+                f"{holes_loaded / max(total_seconds, 1e-9):,.0f} holes/s)."
+            )
+
+        recomputed = update_handicaps(conn)
+        print(f"Handicap history recomputed for {recomputed} round(s).")
+        if not args.no_refresh:
+            print_refreshes(refresh_marts(conn))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Ingestion manifest: decide which workbooks need (re-)loading."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import psycopg
+
+SETTLED_STATUSES = {"loaded", "updated", "skipped"}
+
+
+@dataclass
+class ManifestEntry:
+    file_size: int
+    file_mtime: float
+    sha256: str
+    round_external_id: str | None
+    status: str
+
+
+@dataclass
+class PlannedFile:
+    path: Path
+    action: str  # "new" or "changed"
+    file_size: int
+    file_mtime: float
+    sha256: str
+    previous: ManifestEntry | None
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(conn: psycopg.Connection) -> dict[str, ManifestEntry]:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT file_path, file_size, file_mtime, sha256, round_external_id, status
+            FROM ingest_manifest
+            """
+        )
+        return {row[0]: ManifestEntry(*row[1:]) for row in cur.fetchall()}
+
+
+def plan_files(
+    conn: psycopg.Connection,
+    files: list[Path],
+    manifest: dict[str, ManifestEntry],
+) -> list[PlannedFile]:
+    """Drop files the manifest says are already loaded and unchanged.
+
+    A matching size and mtime is trusted without reading the file. When the
+    stat differs the file is hashed; identical content only refreshes the
+    stored stat, different content is planned as a change.
+    """
+    planned = []
+    touched = []
+    for path in files:
+        stat = path.stat()
+        entry = manifest.get(str(path))
+        settled = entry is not None and entry.status in SETTLED_STATUSES
+        if (
+            settled
+            and entry.file_size == stat.st_size
+            and entry.file_mtime == stat.st_mtime
+        ):
+            continue
+
+        sha256 = sha256_file(path)
+        if settled and entry.sha256 == sha256:
+            touched.append((stat.st_size, stat.st_mtime, str(path)))
+            continue
+
+        planned.append(
+            PlannedFile(
+                path=path,
+                action="changed" if settled else "new",
+                file_size=stat.st_size,
+                file_mtime=stat.st_mtime,
+                sha256=sha256,
+                previous=entry,
+            )
+        )
+
+    if touched:
+        with conn.cursor() as cur:
+            cur.executemany(
+                """
+                UPDATE ingest_manifest
+                SET file_size = %s, file_mtime = %s
+                WHERE file_path = %s
+                """,
+                touched,
+            )
+        conn.commit()
+    return planned
+
+
+def record_files(
+    conn: psycopg.Connection,
+    records: list[tuple[PlannedFile, str | None, str, float | None, float | None]],
+) -> None:
+    """Upsert manifest rows of (file, round_external_id, status, parse, load)."""
+    with conn.cursor() as cur:
+        cur.executemany(
+            """
+            INSERT INTO ingest_manifest (
+                file_path, file_size, file_mtime, sha256,
+                round_external_id, status, parse_seconds, load_seconds
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (file_path) DO UPDATE SET
+                file_size = excluded.file_size,
+                file_mtime = excluded.file_mtime,
+                sha256 = excluded.sha256,
+                round_external_id = excluded.round_external_id,
+                status = excluded.status,
+                parse_seconds = excluded.parse_seconds,
+                load_seconds = excluded.load_seconds,
+                manifest_seq = nextval('ingest_manifest_seq'),
+                recorded_at = now()
+            """,
+            [
+                (
+                    str(planned.path),
+                    planned.file_size,
+                    planned.file_mtime,
+                    planned.sha256,
+                    round_external_id,
+                    status,
+                    parse_seconds,
+                    load_seconds,
+                )
+                for planned, round_external_id, status, parse_seconds, load_seconds in records
+            ],
+        )
+    conn.commit()
@@ -0,0 +1,46 @@
+"""Refresh the marts deployed as materialized views, once or on a schedule."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats.db import get_conn  # noqa: E402
+from golf_stats.refresh import print_refreshes, refresh_marts  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Seconds between refreshes; 0 refreshes once and exits (default).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+
+    while True:
+        with get_conn() as conn:
+            results = refresh_marts(conn)
+        if not results:
+            print("No marts are deployed as materialized views; nothing to refresh.")
+            return
+        print_refreshes(results)
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
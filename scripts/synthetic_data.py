@@ -0,0 +1,422 @@
+"""Generate synthetic courses and rounds for benchmarks and local testing.
+
+Courses get three tees with ratings, 18 holes with par and handicap index
+(odd indexes on the front nine, even on the back) and per-tee yardages.
+Rounds are spread over those courses and tees; hole scores follow each hole's
+par and a per-round skill level, so the marts and dashboard show realistic
+shapes rather than uniform noise.
+
+Output formats:
+- xlsx: `course_*.xlsx` import workbooks plus one round workbook per round,
+  as `import_course_excel.py` and `ingest_excel.py` expect them in data/raw/
+- csv / parquet: one `<name>.rounds.*` + `<name>.hole_stats.*` feed pair
+  for `ingest_feed.py`
+- db: courses and rounds written straight to the database set-based
+
+With --players N the rounds are spread over N players named after
+PLAYER_PREFIX (created in the database by the db format; register them with
+the Players page or `--format db` before ingesting files that name them).
+Otherwise the rounds have no player_name and load for the default player.
+
+Round ids start with `<prefix>-`, course names with COURSE_PREFIX and player
+names with PLAYER_PREFIX, which is how `delete_synthetic` finds them again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psycopg
+from dotenv import load_dotenv
+
+# ingest_excel puts the repo root on sys.path for golf_stats.
+from ingest_excel import bulk_insert_rows
+from ingest_feed import ROUND_COLUMNS, hole_records, records
+from golf_stats.db import get_conn
+from golf_stats.reference import DEFAULT_PLAYER, ReferenceCache
+from golf_stats.repository import TeeInput, save_course, save_player
+
+COURSE_PREFIX = "Synthetic Course"
+PLAYER_PREFIX = "Synthetic Player"
+FIRST_DATE = date(2015, 1, 1)
+DAYS = 3650
+
+# (tee_name, share of the back tee's yardage)
+TEES = [("Blue", 1.0), ("White", 0.92), ("Red", 0.82)]
+# Back-tee yardage range by par.
+YARDAGE = {3: (140, 225), 4: (330, 460), 5: (480, 590)}
+HOLES_PLAYED = ["18", "Front 9", "Back 9"]
+HOLES_PLAYED_P = [0.8, 0.1, 0.1]
+ROUND_TYPES = ["Casual", "Practice", "Tournament"]
+ROUND_TYPES_P = [0.6, 0.3, 0.1]
+TEE_SHOTS = ["Fairway", "Left", "Right", "Bunker Left", "Bunker Right", "Out Left", "Out Right"]
+TEE_SHOTS_P = [0.5, 0.18, 0.18, 0.04, 0.04, 0.03, 0.03]
+PAR3_TEE_SHOTS = ["Green", "Short", "Long", "Left", "Right", "Bunker Short"]
+PAR3_TEE_SHOTS_P = [0.45, 0.15, 0.1, 0.12, 0.12, 0.06]
+APPROACHES = ["Green", "Short", "Long", "Left", "Right", "Bunker Short", "Bunker Left"]
+APPROACHES_P = [0.45, 0.18, 0.08, 0.1, 0.1, 0.05, 0.04]
+IRONS = ["5i", "6i", "7i", "8i", "9i", "PW"]
+
+
+@dataclass
+class SyntheticCourse:
+    course_name: str
+    tees: pd.DataFrame  # tee_name, course_rating, slope_rating, yardage_total
+    holes: pd.DataFrame  # hole_number, par, hole_handicap_index
+    tee_holes: pd.DataFrame  # tee_name, hole_number, yardage
+
+    def sheets(self) -> dict[str, pd.DataFrame]:
+        """The four sheets of the course import template."""
+        course = pd.DataFrame(
+            [{"course_name": self.course_name, "location": None, "notes": "Synthetic"}]
+        )
+        return {
+            "course": course,
+            "tees": self.tees,
+            "holes": self.holes,
+            "tee_holes": self.tee_holes,
+        }
+
+
+def synthetic_course(number: int, rng: np.random.Generator) -> SyntheticCourse:
+    pars = rng.permutation([3] * 4 + [4] * 10 + [5] * 4)
+    handicap = np.empty(18, dtype=int)
+    handicap[:9] = rng.permutation(np.arange(1, 18, 2))
+    handicap[9:] = rng.permutation(np.arange(2, 19, 2))
+    holes = pd.DataFrame(
+        {"hole_number": np.arange(1, 19), "par": pars, "hole_handicap_index": handicap}
+    )
+
+    back_tee = np.array([rng.integers(*YARDAGE[par]) for par in pars])
+    tee_holes = []
+    tees = []
+    for tee_name, share in TEES:
+        yardages = np.round(back_tee * share).astype(int)
+        total = int(yardages.sum())
+        rating = round(72 + (total - 6500) / 220, 1)
+        tees.append(
+            {
+                "tee_name": tee_name,
+                "course_rating": rating,
+                "slope_rating": float(np.clip(round(113 + (rating - 67) * 4.5), 55, 155)),
+                "yardage_total": total,
+            }
+        )
+        tee_holes.append(
+            pd.DataFrame(
+                {"tee_name": tee_name, "hole_number": np.arange(1, 19), "yardage": yardages}
+            )
+        )
+    return SyntheticCourse(
+        course_name=f"{COURSE_PREFIX} {number:02d}",
+        tees=pd.DataFrame(tees),
+        holes=holes,
+        tee_holes=pd.concat(tee_holes, ignore_index=True),
+    )
+
+
+def synthetic_courses(n_courses: int, seed: int) -> list[SyntheticCourse]:
+    rng = np.random.default_rng(seed)
+    return [synthetic_course(number, rng) for number in range(1, n_courses + 1)]
+
+
+def synthetic_players(n_players: int) -> list[str]:
+    return [f"{PLAYER_PREFIX} {number:03d}" for number in range(1, n_players + 1)]
+
+
+def synthetic_rounds(
+    courses: list[SyntheticCourse],
+    n_rounds: int,
+    seed: int,
+    prefix: str = "synth",
+    players: list[str] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """N rounds over the given courses (and players) as (rounds, hole_stats) frames."""
+    rng = np.random.default_rng(seed)
+    course_idx = rng.integers(len(courses), size=n_rounds)
+    tee_idx = rng.integers(len(TEES), size=n_rounds)
+    holes_played = rng.choice(HOLES_PLAYED, size=n_rounds, p=HOLES_PLAYED_P)
+    days = np.sort(rng.integers(DAYS, size=n_rounds))
+    rounds_df = pd.DataFrame(
+        {
+            "round_external_id": [f"{prefix}-{i:07d}" for i in range(n_rounds)],
+            "date_played": pd.Timestamp(FIRST_DATE) + pd.to_timedelta(days, unit="D"),
+            "course_name": [courses[i].course_name for i in course_idx],
+            "tee_name": [TEES[i][0] for i in tee_idx],
+            "holes_played": holes_played,
+            "conditions": None,
+            "round_type": rng.choice(ROUND_TYPES, size=n_rounds, p=ROUND_TYPES_P),
+            "round_format": "Stroke",
+            "notes": None,
+        }
+    )
+    rounds_df["date_played"] = rounds_df["date_played"].dt.date
+    if players:
+        rounds_df.insert(1, "player_name", rng.choice(players, size=n_rounds))
+
+    # One row per hole played: 18 or 9 per round, starting at hole 1 or 10.
+    counts = np.where(holes_played == "18", 18, 9)
+    first_hole = np.where(holes_played == "Back 9", 10, 1)
+    round_of_row = np.repeat(np.arange(n_rounds), counts)
+    offsets = np.arange(len(round_of_row)) - np.repeat(np.cumsum(counts) - counts, counts)
+    hole_number = first_hole[round_of_row] + offsets
+
+    pars = np.stack([course.holes["par"].to_numpy() for course in courses])
+    par = pars[course_idx[round_of_row], hole_number - 1]
+    # Average strokes over par per hole, from scratch (~0.2) to high handicap.
+    skill = rng.uniform(0.2, 1.6, size=n_rounds)[round_of_row]
+    birdie = rng.random(len(par)) < 0.06
+    strokes = np.clip(par + rng.poisson(skill) - birdie, 1, 15)
+    putts = rng.choice([0, 1, 2, 3], size=len(par), p=[0.04, 0.33, 0.53, 0.1])
+    putts = np.minimum(putts, strokes - 1).clip(0, 6)
+
+    tee_shot = np.where(
+        par == 3,
+        rng.choice(PAR3_TEE_SHOTS, size=len(par), p=PAR3_TEE_SHOTS_P),
+        rng.choice(TEE_SHOTS, size=len(par), p=TEE_SHOTS_P),
+    )
+    approach = np.where(
+        par == 3, "N/A", rng.choice(APPROACHES, size=len(par), p=APPROACHES_P)
+    )
+    holes_df = pd.DataFrame(
+        {
+            "round_external_id": rounds_df["round_external_id"].to_numpy()[round_of_row],
+            "hole_number": hole_number,
+            "strokes": strokes,
+            "putts": putts,
+            "tee_shot": tee_shot,
+            "approach": approach,
+            "tee_club": np.where(par == 3, rng.choice(IRONS, size=len(par)), "Driver"),
+            "approach_club": np.where(par == 3, None, rng.choice(IRONS, size=len(par))),
+            "bunker_found": (
+                pd.Series(tee_shot).str.startswith("Bunker").astype(int)
+                + pd.Series(approach).str.startswith("Bunker").astype(int)
+            ),
+            "out_of_bounds_count": pd.Series(tee_shot).str.startswith("Out").astype(int),
+        }
+    )
+    return rounds_df, holes_df
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def write_course_workbooks(courses: list[SyntheticCourse], out_dir: Path) -> list[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for course in courses:
+        path = out_dir / f"course_{slug(course.course_name)}.xlsx"
+        with pd.ExcelWriter(path) as writer:
+            for sheet, df in course.sheets().items():
+                df.to_excel(writer, sheet_name=sheet, index=False)
+        paths.append(path)
+    return paths
+
+
+def write_round_workbooks(
+    rounds_df: pd.DataFrame, holes_df: pd.DataFrame, out_dir: Path
+) -> list[Path]:
+    """One template workbook (rounds + hole_stats sheets) per round."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    holes_by_round = dict(iter(holes_df.groupby("round_external_id", sort=False)))
+    paths = []
+    for i in range(len(rounds_df)):
+        round_df = rounds_df.iloc[[i]]
+        round_external_id = round_df["round_external_id"].iloc[0]
+        path = out_dir / f"{round_external_id}.xlsx"
+        with pd.ExcelWriter(path) as writer:
+            round_df.to_excel(writer, sheet_name="rounds", index=False)
+            holes_by_round[round_external_id].to_excel(
+                writer, sheet_name="hole_stats", index=False
+            )
+        paths.append(path)
+    return paths
+
+
+def write_feed(
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    out_dir: Path,
+    name: str,
+    fmt: str = "csv",
+) -> tuple[Path, Path]:
+    """Write a `<name>.rounds.<fmt>` + `<name>.hole_stats.<fmt>` feed pair."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rounds_path = out_dir / f"{name}.rounds.{fmt}"
+    holes_path = out_dir / f"{name}.hole_stats.{fmt}"
+    if fmt == "csv":
+        rounds_df.to_csv(rounds_path, index=False)
+        holes_df.to_csv(holes_path, index=False)
+    elif fmt == "parquet":
+        rounds_df.to_parquet(rounds_path, index=False)
+        holes_df.to_parquet(holes_path, index=False)
+    else:
+        raise ValueError(f"Unknown feed format: {fmt}")
+    return rounds_path, holes_path
+
+
+def load_courses(conn: psycopg.Connection, courses: list[SyntheticCourse]) -> int:
+    """Save courses (skipping existing names) with their handicap indexes."""
+    saved = 0
+    for course in courses:
+        result = save_course(
+            conn,
+            course.course_name,
+            None,
+            "Synthetic",
+            [
+                TeeInput(row.tee_name, row.course_rating, row.slope_rating, row.yardage_total)
+                for row in course.tees.itertuples()
+            ],
+            dict(zip(course.holes["hole_number"].tolist(), course.holes["par"].tolist())),
+            list(course.tee_holes.itertuples(index=False, name=None)),
+        )
+        if result.row_id is None:
+            continue
+        saved += 1
+        conn.execute(
+            """
+            update holes h set hole_handicap_index = u.hole_handicap_index
+            from unnest(%s::int[], %s::int[]) as u(hole_number, hole_handicap_index)
+            where h.course_id = %s and h.hole_number = u.hole_number
+            """,
+            (
+                course.holes["hole_number"].tolist(),
+                course.holes["hole_handicap_index"].tolist(),
+                result.row_id,
+            ),
+        )
+        conn.commit()
+    return saved
+
+
+def load_players(conn: psycopg.Connection, players: list[str]) -> int:
+    """Register players (skipping existing names); returns how many were new."""
+    return sum(save_player(conn, name).row_id is not None for name in players)
+
+
+def load_rounds(
+    conn: psycopg.Connection,
+    rounds_df: pd.DataFrame,
+    holes_df: pd.DataFrame,
+    chunk_rounds: int = 5000,
+) -> int:
+    """COPY rounds and hole_stats in through the bulk loader; returns rounds inserted."""
+    reference = ReferenceCache(conn)
+    pairs = list(zip(rounds_df["course_name"], rounds_df["tee_name"]))
+    resolved = {pair: reference.resolve(*pair) for pair in set(pairs)}
+    names = rounds_df.get("player_name", pd.Series(DEFAULT_PLAYER, rounds_df.index))
+    player_ids = {name: reference.resolve_player(name) for name in names.unique()}
+    rounds_df = rounds_df.assign(
+        player_id=names.map(player_ids),
+        course_id=[resolved[pair][0] for pair in pairs],
+        tee_id=[resolved[pair][1] for pair in pairs],
+    )
+    inserted = 0
+    for start in range(0, len(rounds_df), chunk_rounds):
+        chunk = rounds_df.iloc[start : start + chunk_rounds]
+        chunk_holes = holes_df[
+            holes_df["round_external_id"].isin(chunk["round_external_id"])
+        ]
+        player_ids = chunk.set_index("round_external_id")["player_id"]
+        chunk_holes = chunk_holes.assign(
+            player_id=chunk_holes["round_external_id"].map(player_ids)
+        )
+        loaded, _ = bulk_insert_rows(
+            conn, records(chunk, ROUND_COLUMNS), hole_records(chunk_holes)
+        )
+        conn.commit()
+        inserted += len(loaded)
+    return inserted
+
+
+def delete_synthetic(conn: psycopg.Connection, prefix: str) -> None:
+    """Remove rounds, manifest rows, courses and players created by this module."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "delete from rounds where round_external_id like %s", (f"{prefix}-%",)
+        )
+        cur.execute(
+            "delete from ingest_manifest where file_path like %s",
+            (f"%{prefix}-%.xlsx",),
+        )
+        cur.execute(
+            "delete from courses c where course_name like %s "
+            "and not exists (select 1 from rounds r where r.course_id = c.course_id)",
+            (f"{COURSE_PREFIX} %",),
+        )
+        cur.execute(
+            "delete from players p where player_name like %s "
+            "and not exists (select 1 from rounds r where r.player_id = p.player_id)",
+            (f"{PLAYER_PREFIX} %",),
+        )
+    conn.commit()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument(
+        "--players",
+        type=int,
+        default=0,
+        help="Spread rounds over this many synthetic players (default: 0, "
+        "all rounds for the default player).",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--prefix", default="synth", help="round_external_id prefix.")
+    parser.add_argument(
+        "--format",
+        choices=["xlsx", "csv", "parquet", "db"],
+        default="xlsx",
+        help="Write workbooks, a feed pair, or load straight into the database.",
+    )
+    parser.add_argument("--out", type=Path, default=Path("data/raw"))
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Delete synthetic rounds and courses from the database and exit.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+
+    if args.delete:
+        with get_conn() as conn:
+            delete_synthetic(conn, args.prefix)
+        return
+
+    courses = synthetic_courses(args.courses, args.seed)
+    players = synthetic_players(args.players)
+    rounds_df, holes_df = synthetic_rounds(
+        courses, args.rounds, args.seed, args.prefix, players
+    )
+    if args.format == "db":
+        with get_conn() as conn:
+            load_players(conn, players)
+            saved = load_courses(conn, courses)
+            inserted = load_rounds(conn, rounds_df, holes_df)
+        print(f"Loaded {saved} courses and {inserted} rounds.")
+    elif args.format == "xlsx":
+        write_course_workbooks(courses, args.out)
+        write_round_workbooks(rounds_df, holes_df, args.out)
+        print(f"Wrote {len(courses)} course and {len(rounds_df)} round workbooks to {args.out}.")
+    else:
+        paths = write_feed(rounds_df, holes_df, args.out, args.prefix, args.format)
+        write_course_workbooks(courses, args.out)
+        print(f"Wrote {paths[0]} and {paths[1]} ({len(holes_df)} hole rows).")
+
+
+if __name__ == "__main__":
+    main()
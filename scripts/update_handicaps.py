@@ -0,0 +1,49 @@
+"""Bring handicap_history up to date with the rounds table."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats.db import get_conn  # noqa: E402
+from golf_stats.handicap import current_index, update_handicaps  # noqa: E402
+from golf_stats.reference import DEFAULT_PLAYER, ReferenceCache  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recompute every round, e.g. after editing tee ratings, pars or "
+        "stroke indexes (default: only from the earliest changed round).",
+    )
+    parser.add_argument(
+        "--player",
+        default=DEFAULT_PLAYER,
+        help=f"Player whose current index is printed (default: {DEFAULT_PLAYER}).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+
+    with get_conn() as conn:
+        recomputed = update_handicaps(conn, full=args.full)
+        index = current_index(conn, ReferenceCache(conn).resolve_player(args.player))
+    print(f"Handicap history recomputed for {recomputed} round(s).")
+    print(
+        f"Current handicap index for {args.player}: "
+        f"{'none yet' if index is None else index}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""Watch data/raw/ and load round workbooks as they arrive.
+
+A long-running alternative to running ingest_excel.py by hand. Every
+--interval seconds the folder is listed and each workbook's size and mtime
+are compared with the previous poll. A file is picked up once they have not
+changed for --settle seconds and it ends in a complete zip directory, so
+workbooks that are still being copied or saved are left alone.
+
+Settled files queue for the writer, which takes everything queued (up to
+--batch-size files) as one cycle and runs it through `ingest_excel.ingest` on
+a single connection: manifest check, parsing in a process pool kept for the
+whole run, batch validation and quarantine, the write mode picked with
+--bulk/--upsert, handicaps and the mart refresh. Loaded, updated and skipped
+files then move to data/processed/; quarantined ones are already in
+data/quarantine/. Dropping an edited copy of a processed file back into
+data/raw/ updates its round.
+
+A cycle that raises anything but a database error is logged with its files,
+which are then loaded one per cycle; a file that still fails is quarantined
+(or, if it cannot be moved, skipped until it changes) and watching goes on.
+
+Queue depth and latency to visible (from the poll that first saw a file's
+final size and mtime to the end of the cycle that committed it and refreshed
+the marts) are printed when they change and written to
+data/reports/watch_ingest-status.json. Each cycle is recorded in etl_runs and
+its run report overwrites data/reports/watch_ingest-last.json. Course
+workbooks (course_*.xlsx) are left for import_course_excel.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import signal
+import time
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import psycopg
+from dotenv import load_dotenv
+
+# ingest_excel puts the repo root on sys.path for golf_stats.
+from ingest_excel import add_load_arguments, ingest, quarantine
+from golf_stats.db import get_conn
+from golf_stats.metrics import REPORT_DIR, RunMetrics
+
+INPUT_DIR = Path("data/raw")
+PROCESSED_DIR = Path("data/processed")
+STATUS_PATH = REPORT_DIR / "watch_ingest-status.json"
+CYCLE_REPORT = REPORT_DIR / "watch_ingest-last.json"
+# Most recent loads kept for the latency percentiles.
+LATENCY_WINDOW = 1000
+
+
+@dataclass
+class Sighting:
+    """A file's size and mtime, and when a poll first saw them."""
+
+    size: int
+    mtime: float
+    first_seen: float
+
+
+def watched_files(directory: Path) -> list[Path]:
+    """Round workbooks, without course workbooks and Excel's ~$ lock files."""
+    return sorted(
+        path
+        for path in directory.glob("*.xlsx")
+        if not path.name.startswith(("course_", "~$", "."))
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def write_status(status: dict, path: Path = STATUS_PATH) -> None:
+    """Replace the status file atomically so readers never see half of it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(".json.tmp")
+    temp.write_text(json.dumps(status, indent=2))
+    os.replace(temp, path)
+
+
+def status_line(status: dict) -> str:
+    queue = status["queue"]
+    line = (
+        f"Queue: {queue['settling']} settling, {queue['queued']} queued, "
+        f"{queue['in_flight']} loading"
+    )
+    if status["files"]:
+        line += "; files " + ", ".join(
+            f"{name} {count}" for name, count in sorted(status["files"].items())
+        )
+    latency = status["latency_to_visible_seconds"]
+    if latency:
+        line += (
+            f"; latency to visible p50 {latency['p50']:.1f}s, "
+            f"p95 {latency['p95']:.1f}s"
+        )
+    return line
+
+
+class Watcher:
+    """Poll, queue and load state shared by the daemon's tasks.
+
+    Everything except `load` runs on the event loop; `load` runs in a thread
+    and hands its results back instead of touching this state.
+    """
+
+    def __init__(self, args: argparse.Namespace, pool: Executor) -> None:
+        self.args = args
+        self.pool = pool
+        self.conn: psycopg.Connection | None = None
+        self.started_at = datetime.now(timezone.utc)
+        self.settling: dict[Path, Sighting] = {}
+        self.queue: asyncio.Queue[tuple[Path, Sighting]] = asyncio.Queue()
+        self.queued: dict[Path, Sighting] = {}
+        self.in_flight: dict[Path, Sighting] = {}
+        # Files a cycle finished but could not move, with the stat it loaded.
+        self.done: dict[Path, tuple[int, float]] = {}
+        self.statuses: Counter[str] = Counter()
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.cycles = 0
+
+    def scan(self) -> None:
+        """One poll: note stat changes and queue the files that settled."""
+        now = time.time()
+        present = set()
+        for path in watched_files(INPUT_DIR):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # moved or deleted since the listing
+            present.add(path)
+            current = (stat.st_size, stat.st_mtime)
+            if (
+                path in self.queued
+                or path in self.in_flight
+                or self.done.get(path) == current
+            ):
+                continue
+            seen = self.settling.get(path)
+            if seen is None or (seen.size, seen.mtime) != current:
+                self.settling[path] = Sighting(*current, first_seen=now)
+            elif now - seen.first_seen >= self.args.settle and zipfile.is_zipfile(
+                path
+            ):
+                del self.settling[path]
+                self.queued[path] = seen
+                self.queue.put_nowait((path, seen))
+        for tracked in (self.settling, self.done):
+            for path in set(tracked) - present:
+                del tracked[path]
+
+    def load(
+        self, batch: dict[Path, Sighting]
+    ) -> tuple[dict[Path, str], dict[Path, tuple[int, float]]]:
+        """One cycle: ingest the files, then move the finished ones aside.
+
+        Returns each file's status (files the manifest showed unchanged have
+        none) and the files that could not be moved, with their stat.
+        """
+        if self.conn is None or self.conn.closed:
+            self.conn = get_conn()
+        files = [path for path in batch if path.exists()]
+        metrics = RunMetrics("watch_ingest")
+        with metrics.recorded(self.conn, CYCLE_REPORT):
+            ingest(self.conn, files, self.args, metrics, self.pool)
+
+        statuses = {}
+        stuck = {}
+        PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+        for path in files:
+            status = metrics.files.get(str(path), {}).get("status")
+            if status:
+                statuses[path] = status
+            if status == "failed":
+                continue  # already quarantined
+            seen = batch[path]
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if (stat.st_size, stat.st_mtime) != (seen.size, seen.mtime):
+                continue  # rewritten while loading; the next polls pick it up
+            try:
+                path.rename(PROCESSED_DIR / path.name)
+            except OSError as exc:
+                print(f"Could not move {path.name} to {PROCESSED_DIR}/: {exc}")
+                stuck[path] = (seen.size, seen.mtime)
+        return statuses, stuck
+
+    def set_aside(self, path: Path, seen: Sighting, exc: Exception) -> str:
+        """Quarantine a file whose cycle raised, or skip it until it changes."""
+        error = f"load failed: {exc!r}"
+        print(f"{path.name}: {error} (quarantined)")
+        try:
+            quarantine(path, pd.DataFrame([{"error": error, "source": str(path)}]))
+        except OSError as move_exc:
+            print(f"Could not quarantine {path.name}, skipping it: {move_exc}")
+            self.done[path] = (seen.size, seen.mtime)
+        return "failed"
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def status(self) -> dict:
+        now = time.time()
+        waiting = [*self.queued.values(), *self.in_flight.values()]
+        latencies = list(self.latencies)
+        return {
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "started_at": self.started_at.isoformat(),
+            "queue": {
+                "settling": len(self.settling),
+                "queued": len(self.queued),
+                "in_flight": len(self.in_flight),
+                "oldest_waiting_seconds": round(
+                    now - min(seen.first_seen for seen in waiting), 3
+                )
+                if waiting
+                else 0.0,
+            },
+            "cycles": self.cycles,
+            "files": dict(self.statuses),
+            "latency_to_visible_seconds": {
+                "files": len(latencies),
+                "p50": round(percentile(latencies, 0.5), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "max": round(max(latencies), 3),
+            }
+            if latencies
+            else None,
+        }
+
+    async def poll(self) -> None:
+        while True:
+            self.scan()
+            await asyncio.sleep(self.args.interval)
+
+    async def cycle(
+        self, batch: dict[Path, Sighting]
+    ) -> tuple[dict[Path, str], dict[Path, tuple[int, float]]]:
+        """Run `load` in a thread."""
+        cycle = asyncio.ensure_future(asyncio.to_thread(self.load, batch))
+        try:
+            return await asyncio.shield(cycle)
+        except asyncio.CancelledError:
+            # Let the thread finish with the connection before it closes.
+            print("Stopping after the current cycle...")
+            with contextlib.suppress(Exception):
+                await cycle
+            raise
+
+    async def load_each(
+        self, batch: dict[Path, Sighting]
+    ) -> tuple[dict[Path, str], dict[Path, tuple[int, float]]]:
+        """Load a failed cycle's files one per cycle, setting aside any that fail."""
+        statuses = {}
+        stuck = {}
+        for path, seen in batch.items():
+            try:
+                file_statuses, file_stuck = await self.cycle({path: seen})
+            except psycopg.Error as exc:
+                print(f"{path.name}: {exc}. Retrying once it settles again.")
+                self.close()
+                del self.in_flight[path]
+                continue
+            except Exception as exc:
+                self.close()
+                statuses[path] = self.set_aside(path, seen, exc)
+                continue
+            statuses.update(file_statuses)
+            stuck.update(file_stuck)
+        return statuses, stuck
+
+    async def write(self) -> None:
+        """Load queued files a cycle at a time, in the order they settled."""
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.args.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self.in_flight = dict(batch)
+            for path in self.in_flight:
+                del self.queued[path]
+
+            try:
+                statuses, stuck = await self.cycle(self.in_flight)
+            except psycopg.Error as exc:
+                print(f"Cycle failed: {exc}. Retrying in {self.args.retry:g}s.")
+                self.close()
+                # Forgotten files are picked up again once they settle.
+                self.in_flight = {}
+                await asyncio.sleep(self.args.retry)
+                continue
+            except Exception as exc:
+                names = ", ".join(path.name for path in self.in_flight)
+                print(f"Cycle failed on {names}: {exc!r}")
+                self.close()
+                if len(self.in_flight) == 1:
+                    [(path, seen)] = self.in_flight.items()
+                    statuses, stuck = {path: self.set_aside(path, seen, exc)}, {}
+                else:
+                    statuses, stuck = await self.load_each(dict(self.in_flight))
+
+            visible = time.time()
+            self.cycles += 1
+            for path, seen in self.in_flight.items():
+                status = statuses.get(path, "unchanged")
+                self.statuses[status] += 1
+                if status in ("loaded", "updated"):
+                    self.latencies.append(visible - seen.first_seen)
+            self.done.update(stuck)
+            self.in_flight = {}
+
+    async def report(self) -> None:
+        """Write the status file every --status-interval seconds."""
+        last_line = None
+        while True:
+            status = self.status()
+            write_status(status)
+            line = status_line(status)
+            if line != last_line:
+                print(line)
+                last_line = line
+            await asyncio.sleep(self.args.status_interval)
+
+
+async def watch(args: argparse.Namespace) -> None:
+    # Stop like Ctrl-C on SIGTERM (e.g. from a service manager).
+    with contextlib.suppress(NotImplementedError):
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel
+        )
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        watcher = Watcher(args, pool)
+        try:
+            await asyncio.gather(watcher.poll(), watcher.write(), watcher.report())
+        finally:
+            write_status(watcher.status())
+            watcher.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_load_arguments(parser)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2,
+        help="Seconds between polls of data/raw/ (default: 2).",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=5,
+        help="Seconds a file's size and mtime must stay unchanged before it "
+        "is loaded (default: 5).",
+    )
+    parser.add_argument(
+        "--status-interval",
+        type=float,
+        default=10,
+        help="Seconds between status file updates (default: 10).",
+    )
+    parser.add_argument(
+        "--retry",
+        type=float,
+        default=30,
+        help="Seconds to wait after a database error before retrying (default: 30).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    load_dotenv()
+
+    INPUT_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"Watching {INPUT_DIR}/ every {args.interval:g}s (Ctrl-C to stop).")
+    try:
+        asyncio.run(watch(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("Stopped.")
+
+
+if __name__ == "__main__":
+    main()
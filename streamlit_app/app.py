@@ -2,7 +2,12 @@
 
 import streamlit as st
 
+from db_pool import pool_stats
+
 st.set_page_config(page_title="Golf Stats", layout="wide")
 
 st.title("Golf Statistics")
 st.write("Use the page navigation to add a course or explore analytics.")
+
+with st.expander("Connection pool"):
+    st.json(pool_stats())
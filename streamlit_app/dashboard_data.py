@@ -0,0 +1,426 @@
+"""Cached, filtered queries backing the analytics dashboard.
+
+Every query takes a data-version token as its first argument. The token is
+cheap to compute and changes whenever the marts change, so cached results are
+reused across reruns until new data lands (or the TTL expires). Player, date,
+course and tee filters are pushed into SQL so only the selected slice is
+fetched; every mart is indexed with player_id first, so a query reads one
+player's rows however many players share the deployment.
+
+With DASHBOARD_SNAPSHOT_DIR set, the same loaders read the Parquet snapshot
+written by scripts/export_snapshot.py (see dashboard_snapshot) instead, and
+the version token names the snapshot. They fall back to live queries when
+there is no snapshot or it is older than DASHBOARD_SNAPSHOT_MAX_AGE seconds
+(0 never treats it as stale, so no database is needed).
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+# db_pool puts the repo root on sys.path for golf_stats.
+from db_pool import connection
+import dashboard_snapshot
+from golf_stats.refresh import freshness
+from golf_stats.snapshot import read_manifest, snapshot_age_seconds
+from golf_stats.strokes_gained import by_category, per_round, strokes_gained
+
+CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_CACHE_TTL", "600"))
+VERSION_TTL_SECONDS = int(os.getenv("DASHBOARD_VERSION_TTL", "30"))
+HISTORY_PAGE_SIZE = int(os.getenv("HOLE_HISTORY_PAGE_SIZE", "100"))
+SNAPSHOT_DIR = os.getenv("DASHBOARD_SNAPSHOT_DIR")
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("DASHBOARD_SNAPSHOT_MAX_AGE", "86400"))
+
+
+def round_filter(
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None,
+    tee_name: str | None,
+    alias: str = "r",
+) -> tuple[str, list]:
+    clauses = [
+        f"{alias}.player_id = %s",
+        f"{alias}.date_played between %s and %s",
+    ]
+    params: list = [player_id, start_date, end_date]
+    if course_name is not None:
+        clauses.append(f"{alias}.course_name = %s")
+        params.append(course_name)
+    if tee_name is not None:
+        clauses.append(f"{alias}.tee_name = %s")
+        params.append(tee_name)
+    return " and ".join(clauses), params
+
+
+@st.cache_data(ttl=VERSION_TTL_SECONDS, show_spinner=False)
+def load_snapshot() -> dict | None:
+    """The snapshot manifest if dashboards should read from it, else None."""
+    if not SNAPSHOT_DIR:
+        return None
+    manifest = read_manifest(Path(SNAPSHOT_DIR))
+    if manifest is None:
+        return None
+    if SNAPSHOT_MAX_AGE_SECONDS and (
+        snapshot_age_seconds(manifest) > SNAPSHOT_MAX_AGE_SECONDS
+    ):
+        return None
+    return manifest
+
+
+@st.cache_data(ttl=VERSION_TTL_SECONDS, show_spinner=False)
+def data_version() -> tuple:
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return ("snapshot", snapshot["folder"])
+    with connection() as conn:
+        return conn.execute(
+            "select count(*), max(updated_at) from agg_round_kpis"
+        ).fetchone()
+
+
+@st.cache_data(ttl=VERSION_TTL_SECONDS, show_spinner=False)
+def load_freshness() -> dict | None:
+    if load_snapshot() is not None:
+        return None
+    with connection() as conn:
+        return freshness(conn)
+
+
+@st.cache_data(ttl=VERSION_TTL_SECONDS, show_spinner=False)
+def load_players() -> pd.DataFrame:
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return dashboard_snapshot.players(snapshot)
+    with connection() as conn:
+        return pd.read_sql(
+            "select player_id, player_name from players order by player_name", conn
+        )
+
+
+@st.cache_data(ttl=VERSION_TTL_SECONDS, show_spinner=False)
+def load_handicap_history(
+    player_id: int, start_date: date, end_date: date
+) -> pd.DataFrame:
+    """Handicap index and differentials per round (kept current at ingest).
+
+    Not keyed on the marts' version: handicap_history is updated when rounds
+    are ingested, before dbt runs.
+    """
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return dashboard_snapshot.handicap_history(
+            snapshot, player_id, start_date, end_date
+        )
+    with connection() as conn:
+        return pd.read_sql(
+            """
+            select date_played, gross_score, net_score, score_differential,
+                   handicap_index
+            from handicap_history
+            where player_id = %s and date_played between %s and %s
+            order by date_played, round_id
+            """,
+            conn,
+            params=[player_id, start_date, end_date],
+        )
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_filter_options(version: tuple, player_id: int) -> dict:
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return dashboard_snapshot.filter_options(snapshot, player_id)
+    with connection() as conn:
+        min_date, max_date = conn.execute(
+            "select min(date_played), max(date_played) from agg_round_kpis "
+            "where player_id = %s",
+            (player_id,),
+        ).fetchone()
+        courses = [
+            row[0]
+            for row in conn.execute(
+                "select distinct course_name from agg_round_kpis "
+                "where player_id = %s order by 1",
+                (player_id,),
+            )
+        ]
+        tees = [
+            row[0]
+            for row in conn.execute(
+                "select distinct tee_name from agg_round_kpis "
+                "where player_id = %s and tee_name is not null order by 1",
+                (player_id,),
+            )
+        ]
+    return {
+        "min_date": min_date,
+        "max_date": max_date,
+        "courses": courses,
+        "tees": tees,
+    }
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_round_kpis(
+    version: tuple,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None = None,
+    tee_name: str | None = None,
+) -> pd.DataFrame:
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return dashboard_snapshot.round_kpis(
+            snapshot, player_id, start_date, end_date, course_name, tee_name
+        )
+    where, params = round_filter(
+        player_id, start_date, end_date, course_name, tee_name
+    )
+    with connection() as conn:
+        return pd.read_sql(
+            f"select * from agg_round_kpis r where {where} order by date_played desc",
+            conn,
+            params=params,
+        )
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def whole_months(start_date: date, end_date: date) -> tuple[date, date]:
+    """[first, stop) month starts lying entirely inside start_date..end_date.
+
+    Empty (first >= stop) when the range does not cover a whole month.
+    """
+    first = start_date.replace(day=1)
+    if first < start_date:
+        first = _next_month(first)
+    stop = end_date.replace(day=1)
+    if end_date.month != (end_date + timedelta(days=1)).month:
+        stop = _next_month(stop)
+    return first, stop
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_hole_summary(
+    version: tuple,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None = None,
+    tee_name: str | None = None,
+) -> pd.DataFrame:
+    """Per-hole averages re-aggregated from the monthly partials.
+
+    Whole months come from agg_hole_by_course_tee_month. Only days in a
+    partially selected first or last month are read from fact_hole_stats, so
+    the cost stays bounded by two months of rounds however long the history is.
+    """
+    first_month, stop_month = whole_months(start_date, end_date)
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return dashboard_snapshot.hole_summary(
+            snapshot,
+            player_id,
+            start_date,
+            end_date,
+            course_name,
+            tee_name,
+            first_month,
+            stop_month,
+        )
+    month_clauses = ["m.player_id = %s", "m.month >= %s", "m.month < %s"]
+    month_params: list = [player_id, first_month, stop_month]
+    if course_name is not None:
+        month_clauses.append("m.course_name = %s")
+        month_params.append(course_name)
+    if tee_name is not None:
+        month_clauses.append("m.tee_name = %s")
+        month_params.append(tee_name)
+    where, params = round_filter(
+        player_id, start_date, end_date, course_name, tee_name
+    )
+    with connection() as conn:
+        return pd.read_sql(
+            f"""
+            with partials as (
+              select m.hole_number, m.holes_tracked, m.total_strokes, m.total_putts
+              from agg_hole_by_course_tee_month m
+              where {" and ".join(month_clauses)}
+              union all
+              select hs.hole_number, count(*), sum(hs.strokes), sum(hs.putts)
+              from fact_hole_stats hs
+              join fact_rounds r
+                on r.player_id = hs.player_id and r.round_id = hs.round_id
+              where {where}
+                and not (r.date_played >= %s and r.date_played < %s)
+              group by hs.hole_number
+            )
+            select
+              hole_number,
+              sum(total_strokes)::numeric / sum(holes_tracked) as avg_strokes,
+              sum(total_putts)::numeric / sum(holes_tracked) as avg_putts,
+              sum(holes_tracked) as count
+            from partials
+            group by hole_number
+            order by hole_number
+            """,
+            conn,
+            params=[*month_params, *params, first_month, stop_month],
+        )
+
+
+def read_copy(conn, query: str, params: list) -> pd.DataFrame:
+    """Run a query through COPY ... TO STDOUT (CSV) and parse it with pandas.
+
+    Much faster than row-by-row fetching for the few hundred thousand hole
+    rows the strokes-gained view reads.
+    """
+    buffer = io.BytesIO()
+    statement = f"copy ({query}) to stdout with (format csv, header)"
+    with conn.cursor() as cur, cur.copy(statement, params) as copy:
+        for data in copy:
+            buffer.write(data)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_strokes_gained(
+    version: tuple,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None = None,
+    tee_name: str | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Strokes-gained averages per round and by outcome category.
+
+    Only the aggregates are cached; the hole frame is dropped after use.
+    """
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        holes = dashboard_snapshot.strokes_gained_holes(
+            snapshot, player_id, start_date, end_date, course_name, tee_name
+        )
+    else:
+        where, params = round_filter(
+            player_id, start_date, end_date, course_name, tee_name
+        )
+        with connection() as conn:
+            holes = read_copy(
+                conn,
+                f"""
+                select hs.round_id, hs.par, hs.yardage, hs.strokes, hs.putts,
+                       hs.tee_shot, hs.approach
+                from fact_hole_stats hs
+                join fact_rounds r
+                  on r.player_id = hs.player_id and r.round_id = hs.round_id
+                where {where} and hs.par is not null
+                """,
+                params,
+            )
+    sg = strokes_gained(holes)
+    return {
+        "per_round": per_round(sg).mean().rename("avg_per_round").to_frame(),
+        "tee_shot": by_category(sg, "tee_shot", "sg_off_tee"),
+        "into_green": by_category(sg, "into_green", "sg_approach"),
+    }
+
+
+# Keyset order for the hole history; always fetched.
+HISTORY_KEY = ["date_played", "round_id", "hole_number"]
+# Columns the hole history may show, and the SQL that selects each one.
+HISTORY_COLUMNS = {
+    "course_name": "r.course_name",
+    "tee_name": "r.tee_name",
+    "round_external_id": "hs.round_external_id",
+    "par": "hs.par",
+    "yardage": "hs.yardage",
+    "strokes": "hs.strokes",
+    "putts": "hs.putts",
+    "tee_shot": "hs.tee_shot",
+    "approach": "hs.approach",
+    "tee_club": "hs.tee_club",
+    "approach_club": "hs.approach_club",
+    "bunker_found": "hs.bunker_found",
+    "out_of_bounds_count": "hs.out_of_bounds_count",
+}
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def load_hole_page(
+    version: tuple,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None,
+    tee_name: str | None,
+    columns: tuple[str, ...],
+    after: tuple | None = None,
+    page_size: int = HISTORY_PAGE_SIZE,
+) -> pd.DataFrame:
+    """One player's page of hole rows in (date_played, round_id, hole_number) order.
+
+    `after` is the key of the last row of the previous page; the page starts
+    right after it, so every page costs an index range scan regardless of how
+    deep it is. Up to page_size + 1 rows come back, the extra one only telling
+    the caller there is a next page. Rows are read through a named
+    (server-side) cursor and only the requested columns are selected.
+    """
+    unknown = set(columns) - HISTORY_COLUMNS.keys()
+    if unknown:
+        raise ValueError(f"Unknown hole history columns: {sorted(unknown)}")
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        return dashboard_snapshot.hole_page(
+            snapshot,
+            player_id,
+            start_date,
+            end_date,
+            course_name,
+            tee_name,
+            HISTORY_KEY,
+            columns,
+            after,
+            page_size,
+        )
+    select = [f"hs.{key}" for key in HISTORY_KEY]
+    select += [f"{HISTORY_COLUMNS[column]} as {column}" for column in columns]
+
+    clauses = ["hs.player_id = %s", "hs.date_played between %s and %s"]
+    params: list = [player_id, start_date, end_date]
+    if course_name is not None:
+        clauses.append("r.course_name = %s")
+        params.append(course_name)
+    if tee_name is not None:
+        clauses.append("r.tee_name = %s")
+        params.append(tee_name)
+    if after is not None:
+        clauses.append("(hs.date_played, hs.round_id, hs.hole_number) > (%s, %s, %s)")
+        params.extend(after)
+
+    query = f"""
+        select {", ".join(select)}
+        from fact_hole_stats hs
+        join fact_rounds r on r.player_id = hs.player_id and r.round_id = hs.round_id
+        where {" and ".join(clauses)}
+        order by hs.date_played, hs.round_id, hs.hole_number
+        limit %s
+    """
+    with connection() as conn, conn.cursor(name="hole_history") as cur:
+        cur.itersize = page_size + 1
+        cur.execute(query, [*params, page_size + 1])
+        rows = cur.fetchall()
+        names = [column.name for column in cur.description]
+    return pd.DataFrame(rows, columns=names)
@@ -0,0 +1,198 @@
+"""Dashboard queries answered from a Parquet snapshot instead of PostgreSQL.
+
+Each function mirrors the live query of the same name in dashboard_data and
+returns the same columns. Filters are pushed into the Parquet reader as
+Arrow expressions, so only the matching row groups are decoded; the
+snapshot files are memory-mapped rather than read into buffers.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+import pyarrow.compute as pc
+
+# dashboard_data imports db_pool first, which puts the repo root on sys.path.
+from golf_stats.snapshot import read_table
+
+
+def round_filter(
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None,
+    tee_name: str | None,
+) -> pc.Expression:
+    expression = (
+        (pc.field("player_id") == player_id)
+        & (pc.field("date_played") >= start_date)
+        & (pc.field("date_played") <= end_date)
+    )
+    if course_name is not None:
+        expression &= pc.field("course_name") == course_name
+    if tee_name is not None:
+        expression &= pc.field("tee_name") == tee_name
+    return expression
+
+
+def players(snapshot: dict) -> pd.DataFrame:
+    return (
+        read_table(snapshot, "players")
+        .sort_values("player_name")
+        .reset_index(drop=True)
+    )
+
+
+def handicap_history(
+    snapshot: dict, player_id: int, start_date: date, end_date: date
+) -> pd.DataFrame:
+    history = read_table(
+        snapshot,
+        "handicap_history",
+        round_filter(player_id, start_date, end_date, None, None),
+    )
+    return (
+        history.sort_values(["date_played", "round_id"])
+        .reset_index(drop=True)[
+            [
+                "date_played",
+                "gross_score",
+                "net_score",
+                "score_differential",
+                "handicap_index",
+            ]
+        ]
+    )
+
+
+def filter_options(snapshot: dict, player_id: int) -> dict:
+    rounds = read_table(
+        snapshot,
+        "round_kpis",
+        pc.field("player_id") == player_id,
+        columns=["date_played", "course_name", "tee_name"],
+    )
+    return {
+        "min_date": rounds["date_played"].min() if len(rounds) else None,
+        "max_date": rounds["date_played"].max() if len(rounds) else None,
+        "courses": sorted(rounds["course_name"].dropna().unique()),
+        "tees": sorted(rounds["tee_name"].dropna().unique()),
+    }
+
+
+def round_kpis(
+    snapshot: dict,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None = None,
+    tee_name: str | None = None,
+) -> pd.DataFrame:
+    kpis = read_table(
+        snapshot,
+        "round_kpis",
+        round_filter(player_id, start_date, end_date, course_name, tee_name),
+    )
+    return kpis.sort_values("date_played", ascending=False).reset_index(drop=True)
+
+
+def hole_summary(
+    snapshot: dict,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None,
+    tee_name: str | None,
+    first_month: date,
+    stop_month: date,
+) -> pd.DataFrame:
+    """Monthly partials for whole months plus hole rows for the partial ones."""
+    month_filter = (
+        (pc.field("player_id") == player_id)
+        & (pc.field("month") >= first_month)
+        & (pc.field("month") < stop_month)
+    )
+    if course_name is not None:
+        month_filter &= pc.field("course_name") == course_name
+    if tee_name is not None:
+        month_filter &= pc.field("tee_name") == tee_name
+    months = read_table(
+        snapshot,
+        "hole_months",
+        month_filter,
+        columns=["hole_number", "holes_tracked", "total_strokes", "total_putts"],
+    )
+
+    in_months = (pc.field("date_played") >= first_month) & (
+        pc.field("date_played") < stop_month
+    )
+    days = (
+        read_table(
+            snapshot,
+            "hole_stats",
+            round_filter(player_id, start_date, end_date, course_name, tee_name)
+            & ~in_months,
+            columns=["hole_number", "strokes", "putts"],
+        )
+        .groupby("hole_number")
+        .agg(
+            holes_tracked=("hole_number", "size"),
+            total_strokes=("strokes", "sum"),
+            total_putts=("putts", "sum"),
+        )
+        .reset_index()
+    )
+
+    totals = pd.concat([months, days]).groupby("hole_number").sum()
+    return pd.DataFrame(
+        {
+            "avg_strokes": totals["total_strokes"] / totals["holes_tracked"],
+            "avg_putts": totals["total_putts"] / totals["holes_tracked"],
+            "count": totals["holes_tracked"],
+        }
+    ).reset_index()
+
+
+def strokes_gained_holes(
+    snapshot: dict,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None = None,
+    tee_name: str | None = None,
+) -> pd.DataFrame:
+    return read_table(
+        snapshot,
+        "hole_stats",
+        round_filter(player_id, start_date, end_date, course_name, tee_name)
+        & pc.field("par").is_valid(),
+        columns=[
+            "round_id", "par", "yardage", "strokes", "putts", "tee_shot", "approach"
+        ],
+    )
+
+
+def hole_page(
+    snapshot: dict,
+    player_id: int,
+    start_date: date,
+    end_date: date,
+    course_name: str | None,
+    tee_name: str | None,
+    key: list[str],
+    columns: tuple[str, ...],
+    after: tuple | None,
+    page_size: int,
+) -> pd.DataFrame:
+    """Up to page_size + 1 rows after the `after` key, in key order."""
+    expression = round_filter(player_id, start_date, end_date, course_name, tee_name)
+    if after is not None:
+        day, round_id, hole = (pc.field(column) for column in key)
+        after_day, after_round, after_hole = after
+        later_in_round = (round_id == after_round) & (hole > after_hole)
+        expression &= (day > after_day) | (
+            (day == after_day) & ((round_id > after_round) | later_in_round)
+        )
+    page = read_table(snapshot, "hole_stats", expression, columns=[*key, *columns])
+    return page.sort_values(key).head(page_size + 1).reset_index(drop=True)
@@ -0,0 +1,28 @@
+"""Connection pool shared by every Streamlit page and session."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import streamlit as st
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from golf_stats import db  # noqa: E402
+
+load_dotenv()
+
+
+@st.cache_resource
+def get_pool():
+    return db.create_pool()
+
+
+def connection():
+    return db.connection(get_pool())
+
+
+def pool_stats() -> dict:
+    return db.pool_stats(get_pool())
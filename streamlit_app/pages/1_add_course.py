@@ -2,25 +2,11 @@
 
 from __future__ import annotations
 
-import os
-from typing import List
-
 import pandas as pd
-import psycopg
 import streamlit as st
-from dotenv import load_dotenv
-
-load_dotenv()
 
-
-def get_conn() -> psycopg.Connection:
-    return psycopg.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "golf_stats"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "postgres"),
-    )
+from db_pool import connection
+from golf_stats.repository import TeeInput, save_course
 
 
 st.set_page_config(page_title="Add Course", layout="wide")
@@ -98,73 +84,49 @@ if submitted:
         st.error("Each hole needs a par value.")
         st.stop()
 
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "select 1 from courses where course_name = %s",
-                (course_name.strip(),),
-            )
-            if cur.fetchone():
-                st.error("A course with that name already exists.")
-                st.stop()
-
-            # Insert course
-            cur.execute(
-                """
-                INSERT INTO courses (course_name, location, notes)
-                VALUES (%s, %s, %s)
-                RETURNING course_id
-                """,
-                (course_name.strip(), location.strip() or None, notes.strip() or None),
-            )
-            course_id = cur.fetchone()[0]
-
-            # Insert tees
-            tee_ids: List[int] = []
-            for _, row in tees_df.iterrows():
-                cur.execute(
-                    """
-                    INSERT INTO tees (course_id, tee_name, course_rating, slope_rating, yardage)
-                    VALUES (%s, %s, %s, %s, %s)
-                    RETURNING tee_id
-                    """,
-                    (
-                        course_id,
-                        str(row["tee_name"]).strip(),
-                        row.get("course_rating"),
-                        row.get("slope_rating"),
-                        row.get("yardage_total"),
-                    ),
-                )
-                tee_ids.append(cur.fetchone()[0])
-
-            # Insert holes (pars)
-            for _, row in holes_df.iterrows():
-                cur.execute(
-                    """
-                    INSERT INTO holes (course_id, hole_number, par)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (course_id, int(row["hole_number"]), int(row["par"])),
-                )
-
-            # Insert per-tee yardages
-            for tee_index, tee_id in enumerate(tee_ids):
-                yardage_col = f"tee_{tee_index + 1}_yardage"
-                if yardage_col not in holes_df.columns:
-                    continue
-                for _, row in holes_df.iterrows():
-                    yardage_val = row.get(yardage_col)
-                    if pd.isna(yardage_val):
-                        continue
-                    cur.execute(
-                        """
-                        INSERT INTO tee_holes (tee_id, hole_number, yardage)
-                        VALUES (%s, %s, %s)
-                        """,
-                        (tee_id, int(row["hole_number"]), int(yardage_val)),
-                    )
-
-        conn.commit()
+    def clean(value, cast=float):
+        return None if pd.isna(value) else cast(value)
+
+    tees = [
+        TeeInput(
+            tee_name=str(row["tee_name"]).strip(),
+            course_rating=clean(row.get("course_rating")),
+            slope_rating=clean(row.get("slope_rating")),
+            yardage=clean(row.get("yardage_total"), int),
+        )
+        for _, row in tees_df.iterrows()
+    ]
+    pars = {int(row["hole_number"]): int(row["par"]) for _, row in holes_df.iterrows()}
+
+    # Per-tee yardages as (tee_name, hole_number, yardage)
+    yardages = []
+    for tee_index, tee in enumerate(tees):
+        yardage_col = f"tee_{tee_index + 1}_yardage"
+        if yardage_col not in holes_df.columns:
+            continue
+        for hole_number, yardage_val in zip(holes_df["hole_number"], holes_df[yardage_col]):
+            if not pd.isna(yardage_val):
+                yardages.append((tee.tee_name, int(hole_number), int(yardage_val)))
+
+    with connection() as conn:
+        result = save_course(
+            conn,
+            course_name.strip(),
+            location.strip() or None,
+            notes.strip() or None,
+            tees,
+            pars,
+            yardages,
+        )
+
+    if result.row_id is None:
+        st.error("A course with that name already exists.")
+        st.stop()
 
     st.success("Course saved successfully.")
+    with st.expander("Debug"):
+        st.write(
+            f"Saved {len(tees)} tees, {len(pars)} holes and {len(yardages)} "
+            f"yardages in {result.round_trips} round trips "
+            f"({result.elapsed_ms:.1f} ms)."
+        )
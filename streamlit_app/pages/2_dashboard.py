@@ -2,55 +2,44 @@
 
 from __future__ import annotations
 
-import os
+from datetime import datetime
 
 import pandas as pd
 import plotly.express as px
-import psycopg
 import streamlit as st
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-def get_conn() -> psycopg.Connection:
-    return psycopg.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "golf_stats"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "postgres"),
-    )
-
-
-def load_round_kpis(conn: psycopg.Connection) -> pd.DataFrame:
-    return pd.read_sql("select * from agg_round_kpis order by date_played desc", conn)
-
-
-def load_hole_stats(conn: psycopg.Connection) -> pd.DataFrame:
-    return pd.read_sql(
-        "select * from fact_hole_stats order by date_played desc, hole_number asc",
-        conn,
-    )
 
+from dashboard_data import (
+    data_version,
+    load_filter_options,
+    load_freshness,
+    load_handicap_history,
+    load_hole_summary,
+    load_players,
+    load_round_kpis,
+    load_snapshot,
+    load_strokes_gained,
+)
 
 st.set_page_config(page_title="Dashboard", layout="wide")
 
 st.title("Golf Performance Dashboard")
 st.caption("KPIs and trends from your tracked rounds.")
 
-with get_conn() as conn:
-    kpis = load_round_kpis(conn)
-    holes = load_hole_stats(conn)
+version = data_version()
+players = load_players()
+player_name = st.selectbox("Player", players["player_name"].tolist())
+player_id = int(
+    players.loc[players["player_name"] == player_name, "player_id"].iloc[0]
+)
+options = load_filter_options(version, player_id)
 
-if kpis.empty:
-    st.info("No data yet. Add a course and ingest a round to see analytics.")
+if options["min_date"] is None:
+    st.info(f"No rounds for {player_name} yet. Ingest a round to see analytics.")
     st.stop()
 
 # Filters
-kpis["date_played"] = pd.to_datetime(kpis["date_played"]).dt.date
-min_date = kpis["date_played"].min()
-max_date = kpis["date_played"].max()
+min_date = options["min_date"]
+max_date = options["max_date"]
 
 col1, col2, col3 = st.columns(3)
 with col1:
@@ -61,22 +50,25 @@ with col1:
         max_value=max_date,
     )
 with col2:
-    courses = ["All"] + sorted(kpis["course_name"].dropna().unique().tolist())
+    courses = ["All"] + options["courses"]
     course_choice = st.selectbox("Course", courses)
 with col3:
-    tees = ["All"] + sorted(kpis["tee_name"].dropna().unique().tolist())
+    tees = ["All"] + options["tees"]
     tee_choice = st.selectbox("Tee", tees)
 
 start_date, end_date = date_range
+filters = (
+    player_id,
+    start_date,
+    end_date,
+    None if course_choice == "All" else course_choice,
+    None if tee_choice == "All" else tee_choice,
+)
 
-filtered = kpis[
-    (kpis["date_played"] >= start_date)
-    & (kpis["date_played"] <= end_date)
-]
-if course_choice != "All":
-    filtered = filtered[filtered["course_name"] == course_choice]
-if tee_choice != "All":
-    filtered = filtered[filtered["tee_name"] == tee_choice]
+filtered = load_round_kpis(version, *filters)
+if filtered.empty:
+    st.info("No rounds match the selected filters.")
+    st.stop()
 
 # KPI cards
 c1, c2, c3, c4 = st.columns(4)
@@ -126,19 +118,30 @@ st.plotly_chart(fig_putts, use_container_width=True)
 
 st.divider()
 
-# Hole-level breakdown
-holes_filtered = holes.copy()
-holes_filtered = holes_filtered[holes_filtered["round_id"].isin(filtered["round_id"].unique())]
-
-hole_summary = (
-    holes_filtered.groupby("hole_number")
-    .agg(
-        avg_strokes=("strokes", "mean"),
-        avg_putts=("putts", "mean"),
-        count=("hole_stat_id", "count"),
+# Handicap (all rounds in the date range; course and tee filters do not apply)
+handicap = load_handicap_history(player_id, start_date, end_date)
+indexed = handicap.dropna(subset=["handicap_index"])
+if indexed.empty:
+    st.caption("Handicap index: needs three rounds with a rated tee.")
+else:
+    h1, h2 = st.columns([1, 3])
+    h1.metric("Handicap Index", f"{indexed['handicap_index'].iloc[-1]:.1f}")
+    latest_net = handicap["net_score"].dropna()
+    if not latest_net.empty:
+        h1.metric("Last Net Score", f"{latest_net.iloc[-1]:.0f}")
+    fig_handicap = px.line(
+        indexed,
+        x="date_played",
+        y=["handicap_index", "score_differential"],
+        title="Handicap Index and Score Differentials",
+        markers=True,
     )
-    .reset_index()
-)
+    h2.plotly_chart(fig_handicap, use_container_width=True)
+
+st.divider()
+
+# Hole-level breakdown
+hole_summary = load_hole_summary(version, *filters)
 
 fig_holes = px.bar(
     hole_summary,
@@ -148,4 +151,68 @@ fig_holes = px.bar(
 )
 st.plotly_chart(fig_holes, use_container_width=True)
 
-st.caption("Data source: dbt models (agg_round_kpis, fact_hole_stats)")
+st.divider()
+
+# Strokes gained against a scratch baseline
+sg = load_strokes_gained(version, *filters)
+per_round = sg["per_round"]["avg_per_round"]
+s1, s2, s3, s4, s5 = st.columns(5)
+for column, (label, key) in zip(
+    (s1, s2, s3, s4, s5),
+    [
+        ("SG Total", "sg_total"),
+        ("SG Off Tee", "sg_off_tee"),
+        ("SG Approach", "sg_approach"),
+        ("SG Around Green", "sg_around_green"),
+        ("SG Putting", "sg_putting"),
+    ],
+):
+    value = per_round.get(key)
+    column.metric(label, "-" if pd.isna(value) else f"{value:+.2f}")
+st.caption(
+    "Average strokes gained per round against a scratch baseline, "
+    "estimated from hole yardages and shot outcome categories."
+)
+
+sg1, sg2 = st.columns(2)
+with sg1:
+    st.plotly_chart(
+        px.bar(
+            sg["tee_shot"],
+            x="tee_shot",
+            y="avg_strokes_gained",
+            hover_data=["holes"],
+            title="Strokes Gained Off the Tee by Result (par 4/5)",
+        ),
+        use_container_width=True,
+    )
+with sg2:
+    st.plotly_chart(
+        px.bar(
+            sg["into_green"],
+            x="into_green",
+            y="avg_strokes_gained",
+            hover_data=["holes"],
+            title="Strokes Gained Approaching by Result",
+        ),
+        use_container_width=True,
+    )
+
+st.caption("Data source: dbt models (agg_round_kpis, agg_hole_by_course_tee_month)")
+
+snapshot = load_snapshot()
+if snapshot is not None:
+    exported_at = datetime.fromisoformat(snapshot["exported_at"])
+    st.caption(f"Served from the snapshot exported {exported_at:%Y-%m-%d %H:%M} UTC.")
+
+fresh = load_freshness()
+if fresh is not None:
+    lag = (
+        "up to date"
+        if fresh["stale_seconds"] == 0
+        else f"{fresh['stale_seconds'] / 60:.0f} min behind the latest ingest"
+    )
+    st.caption(
+        f"Materialized views refreshed {fresh['refreshed_at']:%Y-%m-%d %H:%M} "
+        f"in {fresh['duration_ms']:.0f} ms ({lag})."
+    )
@@ -2,24 +2,20 @@
 
 from __future__ import annotations
 
-import os
 from datetime import date
 
 import pandas as pd
 import psycopg
 import streamlit as st
-from dotenv import load_dotenv
 
-load_dotenv()
+from db_pool import connection
+from golf_stats.handicap import update_handicaps
+from golf_stats.repository import HoleStatInput, save_round
 
 
-def get_conn() -> psycopg.Connection:
-    return psycopg.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "golf_stats"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "postgres"),
+def fetch_players(conn: psycopg.Connection) -> pd.DataFrame:
+    return pd.read_sql(
+        "select player_id, player_name from players order by player_name", conn
     )
 
 
@@ -47,17 +43,23 @@ st.set_page_config(page_title="Add Round", layout="wide")
 st.title("Add a Round")
 st.caption("Enter round details and hole-by-hole stats.")
 
-with get_conn() as conn:
+with connection() as conn:
+    players_df = fetch_players(conn)
     courses_df = fetch_courses(conn)
 
 if courses_df.empty:
     st.warning("Add a course first before entering rounds.")
     st.stop()
 
+player_name = st.selectbox("Player", players_df["player_name"].tolist())
+player_id = int(
+    players_df.loc[players_df["player_name"] == player_name, "player_id"].iloc[0]
+)
+
 course_name = st.selectbox("Course", courses_df["course_name"].tolist())
 course_id = int(courses_df.loc[courses_df["course_name"] == course_name, "course_id"].iloc[0])
 
-with get_conn() as conn:
+with connection() as conn:
     tees_df = fetch_tees(conn, course_id)
 
 if tees_df.empty:
@@ -157,9 +159,9 @@ holes_df = st.data_editor(
     },
 )
 
-save_round = st.button("Save round")
+save_clicked = st.button("Save round")
 
-if save_round:
+if save_clicked:
     if not round_external_id.strip():
         st.error("Round external ID is required.")
         st.stop()
@@ -168,64 +170,49 @@ if save_round:
         st.error("Please fill strokes and putts for each hole.")
         st.stop()
 
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "select 1 from rounds where round_external_id = %s",
-                (round_external_id.strip(),),
-            )
-            if cur.fetchone():
-                st.error("That round_external_id already exists.")
-                st.stop()
-
-            cur.execute(
-                """
-                insert into rounds (
-                    course_id, tee_id, date_played, holes_played,
-                    conditions, round_type, round_format, notes,
-                    round_external_id
-                )
-                values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                returning round_id
-                """,
-                (
-                    course_id,
-                    tee_id,
-                    date_played,
-                    holes_played,
-                    conditions.strip() or None,
-                    round_type,
-                    round_format,
-                    notes.strip() or None,
-                    round_external_id.strip(),
-                ),
-            )
-            round_id = cur.fetchone()[0]
-
-            for _, row in holes_df.iterrows():
-                cur.execute(
-                    """
-                    insert into hole_stats (
-                        round_id, hole_number, strokes, putts,
-                        tee_shot, approach, tee_club, approach_club,
-                        bunker_found, out_of_bounds_count
-                    )
-                    values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        round_id,
-                        int(row["hole_number"]),
-                        int(row["strokes"]),
-                        int(row["putts"]),
-                        row.get("tee_shot"),
-                        row.get("approach"),
-                        row.get("tee_club"),
-                        row.get("approach_club"),
-                        int(row.get("bunker_found") or 0),
-                        int(row.get("out_of_bounds_count") or 0),
-                    ),
-                )
-
-        conn.commit()
+    def clean(value):
+        return None if pd.isna(value) else value
+
+    holes = [
+        HoleStatInput(
+            hole_number=int(row["hole_number"]),
+            strokes=int(row["strokes"]),
+            putts=int(row["putts"]),
+            tee_shot=clean(row.get("tee_shot")),
+            approach=clean(row.get("approach")),
+            tee_club=clean(row.get("tee_club")),
+            approach_club=clean(row.get("approach_club")),
+            bunker_found=int(clean(row.get("bunker_found")) or 0),
+            out_of_bounds_count=int(clean(row.get("out_of_bounds_count")) or 0),
+        )
+        for _, row in holes_df.iterrows()
+    ]
+
+    with connection() as conn:
+        result = save_round(
+            conn,
+            player_id,
+            course_id,
+            tee_id,
+            date_played,
+            holes_played,
+            round_type,
+            round_format,
+            round_external_id.strip(),
+            holes,
+            conditions=conditions.strip() or None,
+            notes=notes.strip() or None,
+        )
+        if result.row_id is not None:
+            update_handicaps(conn)
+
+    if result.row_id is None:
+        st.error(f"{player_name} already has a round with that round_external_id.")
+        st.stop()
 
     st.success("Round saved successfully.")
+    with st.expander("Debug"):
+        st.write(
+            f"Saved {len(holes)} holes in {result.round_trips} round trips "
+            f"({result.elapsed_ms:.1f} ms)."
+        )
@@ -0,0 +1,93 @@
+"""Hole-by-hole history, paged through fact_hole_stats."""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from dashboard_data import (
+    HISTORY_COLUMNS,
+    HISTORY_KEY,
+    HISTORY_PAGE_SIZE,
+    data_version,
+    load_filter_options,
+    load_hole_page,
+    load_players,
+)
+
+DEFAULT_COLUMNS = ["course_name", "round_external_id", "par", "strokes", "putts"]
+
+st.set_page_config(page_title="Hole History", layout="wide")
+
+st.title("Hole History")
+st.caption("Every tracked hole, oldest first, one page at a time.")
+
+version = data_version()
+players = load_players()
+player_name = st.selectbox("Player", players["player_name"].tolist())
+player_id = int(
+    players.loc[players["player_name"] == player_name, "player_id"].iloc[0]
+)
+options = load_filter_options(version, player_id)
+
+if options["min_date"] is None:
+    st.info(f"No rounds for {player_name} yet. Ingest a round to see hole history.")
+    st.stop()
+
+min_date = options["min_date"]
+max_date = options["max_date"]
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    date_range = st.date_input(
+        "Date range",
+        (min_date, max_date),
+        min_value=min_date,
+        max_value=max_date,
+    )
+with col2:
+    course_choice = st.selectbox("Course", ["All"] + options["courses"])
+with col3:
+    tee_choice = st.selectbox("Tee", ["All"] + options["tees"])
+
+columns = st.multiselect("Columns", list(HISTORY_COLUMNS), default=DEFAULT_COLUMNS)
+
+if len(date_range) != 2:
+    st.stop()
+start_date, end_date = date_range
+filters = (
+    player_id,
+    start_date,
+    end_date,
+    None if course_choice == "All" else course_choice,
+    None if tee_choice == "All" else tee_choice,
+    tuple(columns),
+)
+
+# The key each visited page starts after; reset whenever the query changes.
+if st.session_state.get("hole_history_filters") != (version, filters):
+    st.session_state["hole_history_filters"] = (version, filters)
+    st.session_state["hole_history_pages"] = [None]
+pages = st.session_state["hole_history_pages"]
+
+page = load_hole_page(version, *filters, pages[-1])
+if page.empty:
+    st.info("No holes match the selected filters.")
+    st.stop()
+
+# load_hole_page returns one extra row when there is a next page.
+has_next = len(page) > HISTORY_PAGE_SIZE
+rows = page.head(HISTORY_PAGE_SIZE)
+st.dataframe(rows, use_container_width=True, hide_index=True)
+
+prev_col, info_col, next_col = st.columns([1, 4, 1])
+with prev_col:
+    if st.button("Previous", disabled=len(pages) == 1):
+        pages.pop()
+        st.rerun()
+with info_col:
+    st.caption(f"Page {len(pages)}")
+with next_col:
+    if st.button("Next", disabled=not has_next):
+        last_key = rows[HISTORY_KEY].tail(1).itertuples(index=False, name=None)
+        pages.append(next(last_key))
+        st.rerun()
@@ -0,0 +1,52 @@
+"""Mini Streamlit page to list players and add new ones."""
+
+from __future__ import annotations
+
+import pandas as pd
+import psycopg
+import streamlit as st
+
+from db_pool import connection
+from golf_stats.repository import save_player
+
+
+def fetch_players(conn: psycopg.Connection) -> pd.DataFrame:
+    return pd.read_sql(
+        """
+        select p.player_name, count(r.round_id) as rounds,
+               max(r.date_played) as last_played, p.created_at
+        from players p
+        left join rounds r on r.player_id = p.player_id
+        group by p.player_id
+        order by p.player_name
+        """,
+        conn,
+    )
+
+
+st.set_page_config(page_title="Players", layout="wide")
+
+st.title("Players")
+st.caption(
+    "Rounds belong to a player. Ingested files name theirs in a player_name "
+    "column; files without one load for the Default player."
+)
+
+with st.form("player_form"):
+    player_name = st.text_input("Player name", placeholder="Jane Doe")
+    submitted = st.form_submit_button("Add player")
+
+if submitted:
+    if not player_name.strip():
+        st.error("Player name is required.")
+        st.stop()
+    with connection() as conn:
+        result = save_player(conn, " ".join(player_name.split()))
+    if result.row_id is None:
+        st.error("A player with that name already exists.")
+    else:
+        st.success("Player added.")
+
+with connection() as conn:
+    players_df = fetch_players(conn)
+st.dataframe(players_df, use_container_width=True, hide_index=True)